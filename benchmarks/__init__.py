@@ -0,0 +1,4 @@
+"""
+A self-contained benchmark suite for wagtailmodeladmin's views. See
+`benchmarks/run.py` for usage.
+"""
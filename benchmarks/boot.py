@@ -0,0 +1,116 @@
+"""
+Measures how long a fresh worker process takes to start with many registered
+ModelAdmins (100 by default), split into three stages:
+
+setup
+    `django.setup()`, which imports every app's models
+hooks
+    Importing every app's `wagtail_hooks` module, which is where ModelAdmin
+    classes are registered
+urls
+    Loading the URL configuration, which calls the 'register_admin_urls'
+    hook for every registered ModelAdmin
+
+Each run happens in a new Python process, so nothing is shared between runs.
+Run from the repository root, with Wagtail installed:
+
+    python -m benchmarks.boot --modeladmins 100 --repeat 10
+
+To compare before and after a change, run the script on both revisions.
+Nothing is written to the database, so it doesn't need to exist.
+"""
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+STAGES = ('setup', 'hooks', 'urls')
+
+# Modules whose import is worth knowing about when looking at boot time
+WATCHED_MODULES = (
+    'wagtailmodeladmin.views',
+    'wagtail.wagtailadmin.edit_handlers',
+    'wagtail.wagtailimages.models',
+    'wagtail.wagtaildocs.models',
+)
+
+
+def boot():
+    """
+    Start Django and Wagtail in this process, returning a dictionary of
+    timings (in seconds) for each stage, along with the watched modules
+    that had been imported by the end of each stage
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+    results = {}
+
+    def finish_stage(name, started):
+        results[name] = time.time() - started
+        results['%s_modules' % name] = [
+            module for module in WATCHED_MODULES if module in sys.modules]
+
+    started = time.time()
+    import django
+    django.setup()
+    finish_stage('setup', started)
+
+    started = time.time()
+    from wagtail.wagtailcore import hooks
+    hooks.get_hooks('register_admin_urls')
+    finish_stage('hooks', started)
+
+    started = time.time()
+    from django.core.urlresolvers import get_resolver
+    get_resolver(None).resolve('/admin/')
+    finish_stage('urls', started)
+    return results
+
+
+def run_boot(modeladmins):
+    env = dict(os.environ, BENCHMARK_BOOT_MODELS=str(modeladmins))
+    output = subprocess.check_output(
+        [sys.executable, '-m', 'benchmarks.boot', '--child'], env=env)
+    return json.loads(output.decode('utf-8').strip().splitlines()[-1])
+
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument(
+        '--modeladmins', type=int, default=100,
+        help="Number of extra models to register ModelAdmins for")
+    parser.add_argument(
+        '--repeat', type=int, default=10,
+        help="Number of processes to start")
+    parser.add_argument(
+        '--child', action='store_true', default=False,
+        help=argparse.SUPPRESS)
+    options = parser.parse_args(argv)
+
+    if options.child:
+        print(json.dumps(boot()))
+        return 0
+
+    runs = [run_boot(options.modeladmins)
+            for i in range(max(1, options.repeat))]
+    print("Median boot time with %s extra ModelAdmins, over %s runs:" % (
+        options.modeladmins, len(runs)))
+    for stage in STAGES:
+        print("  %-6s %8.1fms   imported: %s" % (
+            stage, median(run[stage] for run in runs) * 1000,
+            ', '.join(runs[-1]['%s_modules' % stage]) or '-'))
+    print("  %-6s %8.1fms" % ('total', median(
+        sum(run[stage] for stage in STAGES) for run in runs) * 1000))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,143 @@
+"""
+Functions for quickly filling the benchmark database with large numbers of
+rows. Everything is created with `bulk_create()` (or, for the tables of
+Page subclasses, which `bulk_create()` doesn't support, `executemany()`),
+with tree paths worked out in advance, so that creating a million rows
+takes minutes rather than hours.
+"""
+import datetime
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, transaction
+from django.db.models import F
+
+from wagtail.wagtailcore.models import Page
+
+from .models import Author, Category, EventIndexPage, EventPage
+
+BATCH_SIZE = 5000
+
+
+def create_categories(count, fanout=10):
+    """
+    Create a balanced tree of `count` categories, where every node (apart
+    from those on the bottom level) has `fanout` children
+    """
+    paths = []
+
+    def iter_categories():
+        for i in range(count):
+            if i < fanout:
+                path = Category._get_path(None, 1, i + 1)
+            else:
+                parent_path = paths[(i - fanout) // fanout]
+                path = Category._get_path(
+                    parent_path, len(parent_path) // Category.steplen + 1,
+                    (i - fanout) % fanout + 1)
+            paths.append(path)
+            first_child = fanout * (i + 1)
+            numchild = max(0, min(count, first_child + fanout) - first_child)
+            yield Category(
+                name='Category %s' % i, path=path,
+                depth=len(path) // Category.steplen, numchild=numchild)
+
+    bulk_create(Category, iter_categories())
+
+
+def create_authors(count):
+    category_ids = list(
+        Category.objects.values_list('pk', flat=True)[:1000]) or [None]
+    start_date = datetime.date(2000, 1, 1)
+
+    def iter_authors():
+        for i in range(count):
+            yield Author(
+                name='Author %s' % i,
+                email='author%s@example.com' % i,
+                status=Author.STATUS_CHOICES[i % 2][0],
+                category_id=category_ids[i % len(category_ids)],
+                joined=start_date + datetime.timedelta(days=i % 3650),
+            )
+
+    bulk_create(Author, iter_authors())
+
+
+def create_event_pages(count, per_index=1000):
+    """
+    Create `count` event pages, split between as many event index pages as
+    are needed to keep `per_index` events on each, beneath the site's home
+    page
+    """
+    home = Page.objects.get(depth=2)
+    index_count = max(1, (count + per_index - 1) // per_index)
+    index_paths = create_pages(
+        EventIndexPage, home, [
+            ('Events %s' % i, 'events-%s' % i, {})
+            for i in range(index_count)
+        ])
+
+    start_date = datetime.date(2016, 1, 1)
+    for n, index_path in enumerate(index_paths):
+        parent = Page.objects.get(path=index_path)
+        first = n * per_index
+        create_pages(EventPage, parent, (
+            ('Event %s' % i, 'event-%s' % i,
+             {'date': start_date + datetime.timedelta(days=i % 365)})
+            for i in range(first, min(count, first + per_index))
+        ))
+
+
+def create_pages(model, parent, items):
+    """
+    Create a page of type `model` beneath `parent` for each (title, slug,
+    field_values) tuple in `items`. Returns the new pages' paths.
+    """
+    content_type = ContentType.objects.get_for_model(model)
+    depth = parent.depth + 1
+    paths = []
+
+    def iter_pages():
+        for i, (title, slug, field_values) in enumerate(items):
+            path = model._get_path(parent.path, depth, parent.numchild + i + 1)
+            paths.append((path, field_values))
+            yield Page(
+                title=title, slug=slug, content_type=content_type,
+                path=path, depth=depth, numchild=0, live=True,
+                url_path='%s%s/' % (parent.url_path, slug))
+
+    with transaction.atomic():
+        bulk_create(Page, iter_pages())
+        Page.objects.filter(pk=parent.pk).update(
+            numchild=F('numchild') + len(paths))
+        parent.numchild += len(paths)
+
+        # Add rows to the subclass's own table
+        field_names = list(paths[0][1]) if paths else []
+        columns = ['page_ptr_id'] + [
+            model._meta.get_field(name).column for name in field_names]
+        sql = 'INSERT INTO %s (%s) VALUES (%s)' % (
+            connection.ops.quote_name(model._meta.db_table),
+            ', '.join(connection.ops.quote_name(c) for c in columns),
+            ', '.join(['%s'] * len(columns)))
+        for i in range(0, len(paths), BATCH_SIZE):
+            batch = paths[i:i + BATCH_SIZE]
+            ids = dict(Page.objects.filter(
+                path__in=[path for path, field_values in batch]
+            ).values_list('path', 'pk'))
+            with connection.cursor() as cursor:
+                cursor.executemany(sql, [
+                    [ids[path]] + [field_values[n] for n in field_names]
+                    for path, field_values in batch
+                ])
+    return [path for path, field_values in paths]
+
+
+def bulk_create(model, objects):
+    batch = []
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) == BATCH_SIZE:
+            model.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        model.objects.bulk_create(batch)
@@ -0,0 +1,79 @@
+import os
+
+from django.db import models
+from django.utils.encoding import python_2_unicode_compatible
+
+from treebeard.mp_tree import MP_Node
+from wagtail.wagtailadmin.edit_handlers import FieldPanel
+from wagtail.wagtailcore.models import Page
+
+
+@python_2_unicode_compatible
+class Author(models.Model):
+    """
+    A plain model, with a foreign key and a choices field, so that the
+    index view has something to filter and select_related() on
+    """
+    STATUS_CHOICES = (
+        ('active', 'Active'),
+        ('retired', 'Retired'),
+    )
+    name = models.CharField(max_length=255)
+    email = models.EmailField(blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES,
+                              default='active')
+    category = models.ForeignKey('benchmarks.Category', null=True,
+                                 blank=True, on_delete=models.SET_NULL)
+    joined = models.DateField()
+
+    panels = [
+        FieldPanel('name'),
+        FieldPanel('email'),
+        FieldPanel('status'),
+        FieldPanel('category'),
+        FieldPanel('joined'),
+    ]
+
+    def __str__(self):
+        return self.name
+
+
+@python_2_unicode_compatible
+class Category(MP_Node):
+    name = models.CharField(max_length=255)
+
+    panels = [
+        FieldPanel('name'),
+    ]
+
+    def __str__(self):
+        return self.name
+
+
+class EventIndexPage(Page):
+    subpage_types = ['benchmarks.EventPage']
+
+
+class EventPage(Page):
+    date = models.DateField()
+
+    content_panels = Page.content_panels + [
+        FieldPanel('date'),
+    ]
+
+    parent_page_types = ['benchmarks.EventIndexPage']
+
+
+# Extra models, each registered with its own ModelAdmin, for measuring boot
+# time (see `benchmarks.boot`). They're never queried, so have no tables.
+BOOT_MODEL_COUNT = int(os.environ.get('BENCHMARK_BOOT_MODELS', 0))
+
+boot_models = [
+    type(str('BootModel%s' % i), (models.Model,), {
+        '__module__': __name__,
+        'name': models.CharField(max_length=255),
+        'status': models.CharField(
+            max_length=20, choices=Author.STATUS_CHOICES),
+    })
+    for i in range(BOOT_MODEL_COUNT)
+]
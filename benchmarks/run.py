@@ -0,0 +1,266 @@
+"""
+Times requests to wagtailmodeladmin's index, inspect, create, edit and
+choose-parent views (for a plain model, a Page model and a Treebeard model),
+and records the number of database queries each one makes.
+
+Run from the repository root, with Wagtail installed:
+
+    python -m benchmarks.run --rows 10000
+
+To record the results as a baseline (results for each value of `--rows` are
+stored separately, so one file can hold several):
+
+    python -m benchmarks.run --rows 10000 --save-baseline benchmarks/baseline.json
+
+To compare against a baseline (for example, in CI):
+
+    python -m benchmarks.run --rows 10000 --baseline benchmarks/baseline.json
+
+The script exits with a non-zero status if any benchmark makes more queries
+than it did in the baseline, or if its median time exceeds the baseline's
+by more than `--tolerance`. Because timings depend on the machine, baselines
+should be recorded on the same kind of machine that they're compared on.
+"""
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+
+import django  # noqa: E402
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.core.urlresolvers import reverse  # noqa: E402
+from django.db import connection, connections  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+
+from wagtailmodeladmin.counters import (  # noqa: E402
+    get_counted_models, reconcile)
+from wagtailmodeladmin.helpers import get_url_name  # noqa: E402
+
+from . import factories  # noqa: E402
+from .models import Author, Category, EventPage  # noqa: E402
+
+
+def url_for(model, action='index', *args):
+    return reverse(get_url_name(model._meta, action), args=args)
+
+
+def get_benchmarks():
+    """
+    Return a list of (name, method, url, data) tuples, describing the
+    requests to time
+    """
+    author_count = Author.objects.count()
+    author = Author.objects.order_by('pk')[author_count // 2]
+    root_category = Category.get_first_root_node()
+    edit_data = {
+        'name': 'Benchmark author',
+        'email': 'benchmark@example.com',
+        'status': 'active',
+        'category': author.category_id or '',
+        'joined': '2016-01-01',
+    }
+    return [
+        ('author-index', 'get', url_for(Author), None),
+        ('author-index-search', 'get',
+         url_for(Author) + '?q=Author+5', None),
+        ('author-index-filtered', 'get',
+         url_for(Author) + '?status__exact=retired&o=1.-4', None),
+        ('author-index-last-page', 'get',
+         url_for(Author) + '?p=%s' % max(0, author_count // 100 - 1), None),
+        ('author-inspect', 'get', url_for(Author, 'inspect', author.pk), None),
+        ('author-create', 'get', url_for(Author, 'create'), None),
+        ('author-create-post', 'post', url_for(Author, 'create'), edit_data),
+        ('author-edit', 'get', url_for(Author, 'edit', author.pk), None),
+        ('author-edit-post', 'post', url_for(Author, 'edit', author.pk),
+         edit_data),
+        ('category-index', 'get', url_for(Category), None),
+        ('category-index-search', 'get',
+         url_for(Category) + '?q=Category+5', None),
+        ('category-children', 'get',
+         url_for(Category, 'children', root_category.pk), None),
+        ('event-index', 'get', url_for(EventPage), None),
+        ('event-index-search', 'get', url_for(EventPage) + '?q=Event+5',
+         None),
+        ('event-choose-parent', 'get', url_for(EventPage, 'choose_parent'),
+         None),
+        ('event-choose-parent-search', 'get',
+         url_for(EventPage, 'choose_parent') + '?q=Events+1', None),
+    ]
+
+
+def setup_database(rows, keep):
+    db_name = settings.DATABASES['default']['NAME']
+    if keep and os.path.exists(db_name):
+        try:
+            # Authors are added by the benchmarks themselves, but categories
+            # aren't
+            if Category.objects.count() == rows:
+                print("Reusing %s" % db_name)
+                copy_to_replica()
+                return
+        except Exception:
+            pass
+        connection.close()
+    if os.path.exists(db_name):
+        os.remove(db_name)
+
+    print("Creating %s with %s rows per model..." % (db_name, rows))
+    started = time.time()
+    call_command('migrate', run_syncdb=True, interactive=False, verbosity=0)
+    factories.create_categories(rows)
+    factories.create_authors(rows)
+    factories.create_event_pages(rows)
+    # Rows created with bulk_create() aren't counted by row counters
+    for model in get_counted_models():
+        reconcile(model)
+    print("Created in %.1f seconds" % (time.time() - started))
+    copy_to_replica()
+
+
+def copy_to_replica():
+    """
+    Copy the default database to the 'replica' database, if one is
+    configured (see `benchmarks.settings`)
+    """
+    if 'replica' not in settings.DATABASES:
+        return
+    replica_name = settings.DATABASES['replica']['NAME']
+    print("Copying to %s" % replica_name)
+    for conn in connections.all():
+        conn.close()
+    shutil.copyfile(settings.DATABASES['default']['NAME'], replica_name)
+
+
+def get_client():
+    User = get_user_model()
+    user = User.objects.filter(is_superuser=True).first()
+    if user is None:
+        user = User.objects.create_superuser(
+            'benchmark', 'benchmark@example.com', 'benchmark')
+    client = Client()
+    client.force_login(user)
+    return client
+
+
+def run_benchmark(client, method, url, data, repeat):
+    """
+    Make the request `repeat` times (after an initial, untimed request to
+    warm caches), returning the median time in seconds, and the number of
+    queries made by the final request
+    """
+    request = getattr(client, method)
+    args = (url, data) if data is not None else (url,)
+    response = request(*args)
+    if response.status_code not in (200, 302):
+        raise RuntimeError("%s %s returned a %s response" % (
+            method.upper(), url, response.status_code))
+
+    times = []
+    for i in range(repeat):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.time()
+            request(*args)
+            times.append(time.time() - started)
+    times.sort()
+    return times[len(times) // 2], len(queries.captured_queries)
+
+
+def compare(results, baseline, tolerance):
+    """
+    Return a list of messages describing any results that are worse than
+    those in `baseline`
+    """
+    regressions = []
+    for name, result in sorted(results.items()):
+        if name not in baseline:
+            continue
+        expected = baseline[name]
+        if result['queries'] > expected['queries']:
+            regressions.append("%s: %s queries (baseline: %s)" % (
+                name, result['queries'], expected['queries']))
+        if result['time'] > expected['time'] * (1 + tolerance):
+            regressions.append("%s: %.1fms (baseline: %.1fms)" % (
+                name, result['time'] * 1000, expected['time'] * 1000))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument(
+        '--rows', type=int, default=10000,
+        help="Number of rows to create for each model (e.g. 10000, 100000 "
+             "or 1000000)")
+    parser.add_argument(
+        '--repeat', type=int, default=5,
+        help="Number of times to time each request")
+    parser.add_argument(
+        '--keep-db', action='store_true', default=False,
+        help="Reuse the existing database, if it has the right number of "
+             "rows")
+    parser.add_argument(
+        '--only', default=None,
+        help="Only run benchmarks whose names start with this value")
+    parser.add_argument(
+        '--baseline', default=None,
+        help="A baseline file to compare the results with")
+    parser.add_argument(
+        '--save-baseline', default=None,
+        help="A file to record the results in, as a baseline")
+    parser.add_argument(
+        '--tolerance', type=float, default=0.25,
+        help="How much slower (as a fraction of the baseline) a benchmark "
+             "can be before it is considered a regression")
+    options = parser.parse_args(argv)
+
+    setup_database(options.rows, options.keep_db)
+    client = get_client()
+
+    results = {}
+    for name, method, url, data in get_benchmarks():
+        if options.only and not name.startswith(options.only):
+            continue
+        median, queries = run_benchmark(client, method, url, data,
+                                        max(1, options.repeat))
+        results[name] = {'time': median, 'queries': queries}
+        print("%-30s %8.1fms %6s queries" % (name, median * 1000, queries))
+
+    key = str(options.rows)
+    if options.save_baseline:
+        baselines = {}
+        if os.path.exists(options.save_baseline):
+            with open(options.save_baseline) as f:
+                baselines = json.load(f)
+        baselines[key] = results
+        with open(options.save_baseline, 'w') as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+        print("Saved baseline to %s" % options.save_baseline)
+
+    if options.baseline:
+        with open(options.baseline) as f:
+            baseline = json.load(f).get(key, {})
+        if not baseline:
+            print("No baseline recorded for %s rows" % key)
+            return 0
+        regressions = compare(results, baseline, options.tolerance)
+        if regressions:
+            print("\nRegressions:")
+            for message in regressions:
+                print("  %s" % message)
+            return 1
+        print("\nNo regressions")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""
+Minimal Wagtail settings for running the benchmarks against a SQLite
+database. The database file can be changed using the `BENCHMARK_DB`
+environment variable.
+
+If `BENCHMARK_REPLICA_DB` is set, a second SQLite database is configured at
+that path (as the 'replica' alias), for the read-only views of `AuthorAdmin`
+to read from (see `wagtailmodeladmin.routers`). `benchmarks.run` copies the
+default database to it after filling it.
+
+If `BENCHMARK_ROW_COUNTERS` is set, `AuthorAdmin` gets the number of authors
+from a counter (see `wagtailmodeladmin.counters`).
+"""
+import os
+import tempfile
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SECRET_KEY = 'wagtailmodeladmin-benchmarks'
+
+DEBUG = False
+
+ALLOWED_HOSTS = ['*']
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('BENCHMARK_DB', os.path.join(
+            tempfile.gettempdir(), 'wagtailmodeladmin-benchmarks.sqlite3')),
+    }
+}
+
+if os.environ.get('BENCHMARK_REPLICA_DB'):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ['BENCHMARK_REPLICA_DB'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_ROUTERS = ['wagtailmodeladmin.routers.ModelAdminReadRouter']
+
+if os.environ.get('BENCHMARK_ROW_COUNTERS'):
+    WAGTAILMODELADMIN_ROW_COUNTERS = ['benchmarks.Author']
+
+INSTALLED_APPS = [
+    'benchmarks',
+    'wagtailmodeladmin.recipes.treebeard',
+    'wagtailmodeladmin',
+
+    'wagtail.wagtailusers',
+    'wagtail.wagtailsnippets',
+    'wagtail.wagtaildocs',
+    'wagtail.wagtailimages',
+    'wagtail.wagtailembeds',
+    'wagtail.wagtailsearch',
+    'wagtail.wagtailadmin',
+    'wagtail.wagtailcore',
+
+    'modelcluster',
+    'taggit',
+
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+]
+
+MIDDLEWARE_CLASSES = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'wagtail.wagtailcore.middleware.SiteMiddleware',
+]
+
+ROOT_URLCONF = 'benchmarks.urls'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+            ],
+        },
+    },
+]
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Creating users should be quick
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+STATIC_URL = '/static/'
+MEDIA_ROOT = os.path.join(tempfile.gettempdir(), 'wagtailmodeladmin-media')
+MEDIA_URL = '/media/'
+
+USE_TZ = True
+
+WAGTAIL_SITE_NAME = 'wagtailmodeladmin benchmarks'
+
+# Rows are created with bulk_create(), so nothing is indexed, and searches
+# should go straight to the database
+WAGTAILSEARCH_BACKENDS = {
+    'default': {
+        'BACKEND': 'wagtail.wagtailsearch.backends.db',
+    }
+}
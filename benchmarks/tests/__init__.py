@@ -0,0 +1,6 @@
+"""
+Tests for wagtailmodeladmin, using the benchmark models and settings. Run
+from the repository root, with Wagtail installed:
+
+    django-admin test benchmarks --settings=benchmarks.settings
+"""
@@ -0,0 +1,123 @@
+import datetime
+
+from django.core.paginator import EmptyPage
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from wagtailmodeladmin import counters
+from wagtailmodeladmin.counters import (
+    CountedPaginator, create_counter, get_counters, get_model_label,
+    get_row_count, is_counted, reconcile, setup_counters)
+from wagtailmodeladmin.models import RowCount
+
+from benchmarks import factories
+from benchmarks.models import Author
+
+
+def create_author(name='Author'):
+    return Author.objects.create(name=name, joined=datetime.date(2016, 1, 1))
+
+
+class CountedAuthorsMixin(object):
+    """
+    Counts Author rows for the duration of the test case, unless they're
+    already counted (i.e. `BENCHMARK_ROW_COUNTERS` is set)
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super(CountedAuthorsMixin, cls).setUpClass()
+        cls.counted_already = is_counted(Author)
+        if not cls.counted_already:
+            with override_settings(
+                    WAGTAILMODELADMIN_ROW_COUNTERS=['benchmarks.Author']):
+                setup_counters()
+
+    @classmethod
+    def tearDownClass(cls):
+        if not cls.counted_already:
+            uid = 'wagtailmodeladmin_counter_%s' % get_model_label(Author)
+            post_save.disconnect(sender=Author, dispatch_uid=uid)
+            post_delete.disconnect(sender=Author, dispatch_uid=uid)
+            counters._counted_models.discard(Author)
+        super(CountedAuthorsMixin, cls).tearDownClass()
+
+
+class TestRowCounters(CountedAuthorsMixin, TestCase):
+
+    def test_counter_is_created_when_first_needed(self):
+        # bulk_create() doesn't send signals, so these are only counted when
+        # the counter is created
+        factories.create_authors(3)
+        self.assertFalse(get_counters(Author, None).exists())
+        self.assertEqual(get_row_count(Author), 3)
+        self.assertEqual(get_counters(Author, None).get().count, 3)
+
+    def test_creating_rows_increments_counter(self):
+        reconcile(Author)
+        create_author()
+        create_author()
+        self.assertEqual(get_row_count(Author), 2)
+
+    def test_saving_existing_rows_doesnt_change_counter(self):
+        author = create_author()
+        reconcile(Author)
+        author.name = 'Renamed'
+        author.save()
+        self.assertEqual(get_row_count(Author), 1)
+
+    def test_deleting_rows_decrements_counter(self):
+        author = create_author()
+        create_author()
+        reconcile(Author)
+        author.delete()
+        self.assertEqual(get_row_count(Author), 1)
+
+    def test_counter_isnt_created_by_signals(self):
+        create_author()
+        self.assertFalse(get_counters(Author, None).exists())
+
+
+class TestReconcile(CountedAuthorsMixin, TestCase):
+
+    def test_new_counter(self):
+        factories.create_authors(2)
+        self.assertEqual(reconcile(Author), (None, 2))
+
+    def test_corrects_counter(self):
+        factories.create_authors(2)
+        reconcile(Author)
+        get_counters(Author, None).update(count=10)
+        self.assertEqual(reconcile(Author), (10, 2))
+        self.assertEqual(get_row_count(Author), 2)
+        self.assertIsNotNone(get_counters(Author, None).get().reconciled_at)
+
+    def test_create_counter_returns_existing_counter(self):
+        # As happens when two requests create a missing counter together
+        existing = RowCount.objects.create(
+            app_label='benchmarks', model_name='author', count=5)
+        with transaction.atomic():
+            counter, created = create_counter(Author, 'default')
+        self.assertFalse(created)
+        self.assertEqual(counter.pk, existing.pk)
+        self.assertEqual(RowCount.objects.count(), 1)
+
+
+class TestCountedPaginator(TestCase):
+
+    def test_uses_supplied_count(self):
+        factories.create_authors(5)
+        paginator = CountedPaginator(Author.objects.order_by('pk'), 2, 5)
+        with self.assertNumQueries(0):
+            self.assertEqual(paginator.count, 5)
+            self.assertEqual(paginator.num_pages, 3)
+        self.assertEqual(len(paginator.page(3).object_list), 1)
+
+    def test_pages_beyond_count_are_invalid(self):
+        factories.create_authors(5)
+        paginator = CountedPaginator(Author.objects.order_by('pk'), 2, 2)
+        self.assertEqual(paginator.num_pages, 1)
+        with self.assertRaises(EmptyPage):
+            paginator.page(2)
@@ -0,0 +1,56 @@
+from django.test import TestCase
+
+from wagtail.wagtailcore.models import Page, Site
+
+from wagtailmodeladmin.deletion import CountingCollector, get_model_key
+
+from benchmarks import factories
+from benchmarks.models import Author, Category, EventPage
+
+
+def count(queryset, max_depth=None):
+    collector = CountingCollector(queryset.db)
+    if max_depth is not None:
+        collector.max_depth = max_depth
+    return collector.count(queryset).as_dict()
+
+
+class TestCountingCollector(TestCase):
+
+    def test_nothing_affected(self):
+        factories.create_categories(2)
+        self.assertEqual(count(Category.objects.all()), {
+            'deleted': [], 'updated': [], 'protected': [], 'truncated': False,
+        })
+
+    def test_set_null_relations_are_updated(self):
+        factories.create_categories(2)
+        factories.create_authors(5)
+        category = Category.objects.order_by('pk').first()
+        authors = Author.objects.filter(category=category).count()
+        self.assertEqual(count(Category.objects.filter(pk=category.pk)), {
+            'deleted': [],
+            'updated': [(get_model_key(Author), authors)],
+            'protected': [],
+            'truncated': False,
+        })
+
+    def test_parent_rows_are_deleted(self):
+        factories.create_event_pages(3)
+        result = count(EventPage.objects.all())
+        self.assertEqual(result['deleted'], [(get_model_key(Page), 3)])
+        self.assertFalse(result['truncated'])
+
+    def test_cascades_are_followed(self):
+        root = Page.get_first_root_node()
+        Site.objects.create(hostname='example.com', root_page=root)
+        result = count(Page.objects.filter(pk=root.pk))
+        self.assertIn((get_model_key(Site), 1), result['deleted'])
+        self.assertFalse(result['truncated'])
+
+    def test_truncated_beyond_max_depth(self):
+        root = Page.get_first_root_node()
+        Site.objects.create(hostname='example.com', root_page=root)
+        result = count(Page.objects.filter(pk=root.pk), max_depth=0)
+        self.assertIn((get_model_key(Site), 1), result['deleted'])
+        self.assertTrue(result['truncated'])
@@ -0,0 +1,73 @@
+from django.core.urlresolvers import resolve, reverse
+from django.http import Http404
+from django.test import SimpleTestCase
+from django.test.client import RequestFactory
+
+from wagtailmodeladmin.dispatch import (
+    ModelAdminURLDispatcher, ReverseOnlyURLPattern, dispatch, get_pattern)
+from wagtailmodeladmin.helpers import get_url_name
+
+from benchmarks.models import Author
+
+
+def view(request):
+    pass
+
+
+class TestModelAdminURLDispatcher(SimpleTestCase):
+
+    def setUp(self):
+        # ModelAdmin patterns are registered when the admin URLs are loaded
+        reverse('wagtailadmin_home')
+        self.dispatcher = ModelAdminURLDispatcher()
+
+    def test_resolves_index_url(self):
+        match = resolve('/admin/modeladmin/benchmarks/author/')
+        pattern = get_pattern('benchmarks', 'author', None, None)
+        self.assertEqual(match.func, pattern.callback)
+        self.assertEqual(match.url_name, get_url_name(Author._meta))
+        self.assertEqual(match.kwargs, {})
+
+    def test_resolves_action_url(self):
+        match = resolve('/admin/modeladmin/benchmarks/author/create/')
+        pattern = get_pattern('benchmarks', 'author', 'create', None)
+        self.assertEqual(match.func, pattern.callback)
+        self.assertEqual(match.url_name, get_url_name(Author._meta, 'create'))
+
+    def test_resolves_object_specific_url(self):
+        match = resolve('/admin/modeladmin/benchmarks/author/edit/12/')
+        pattern = get_pattern('benchmarks', 'author', 'edit', '12')
+        self.assertEqual(match.func, pattern.callback)
+        self.assertEqual(match.url_name, get_url_name(Author._meta, 'edit'))
+        self.assertEqual(match.kwargs, {'object_id': '12'})
+
+    def test_unregistered_urls_dont_match(self):
+        for path in ('modeladmin/benchmarks/unknown/',
+                     'modeladmin/benchmarks/author/unknown/',
+                     'modeladmin/benchmarks/author/edit/',
+                     'modeladmin/benchmarks/author/create/12/',
+                     'modeladmin/benchmarks/author/edit/12/extra/'):
+            self.assertIsNone(self.dispatcher.resolve(path), path)
+
+    def test_urls_can_be_reversed(self):
+        self.assertEqual(
+            reverse(get_url_name(Author._meta)),
+            '/admin/modeladmin/benchmarks/author/')
+        self.assertEqual(
+            reverse(get_url_name(Author._meta, 'edit'),
+                    kwargs={'object_id': 12}),
+            '/admin/modeladmin/benchmarks/author/edit/12/')
+
+    def test_dispatch_unregistered_url(self):
+        request = RequestFactory().get('/')
+        with self.assertRaises(Http404):
+            dispatch(request, 'benchmarks', 'unknown')
+        with self.assertRaises(Http404):
+            dispatch(request, 'benchmarks', 'author', 'edit')
+
+
+class TestReverseOnlyURLPattern(SimpleTestCase):
+
+    def test_never_resolves(self):
+        pattern = ReverseOnlyURLPattern(r'^path/$', view, name='path')
+        self.assertIsNone(pattern.resolve('path/'))
@@ -0,0 +1,138 @@
+import io
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from django.test.client import RequestFactory
+
+from wagtailmodeladmin.options import get_registered_modeladmin
+from wagtailmodeladmin.recipes.treebeard.importer import (
+    TreeImporter, iter_csv_nodes, iter_json_nodes)
+
+from benchmarks.models import Category
+
+
+def text_file(value):
+    return io.StringIO(u'%s' % value)
+
+
+class TestIterJSONNodes(TestCase):
+
+    def test_nodes(self):
+        nodes = list(iter_json_nodes(text_file(json.dumps([
+            {'data': {'name': 'A'}, 'children': [{'data': {'name': 'A1'}}]},
+            {'name': 'B'},
+        ]))))
+        self.assertEqual(nodes, [
+            {'data': {'name': 'A'}, 'children': [{'data': {'name': 'A1'}}]},
+            {'name': 'B'},
+        ])
+
+    def test_items_larger_than_read_size(self):
+        name = 'x' * 200000
+        nodes = list(iter_json_nodes(text_file(json.dumps([
+            {'name': name}, {'name': 'B'}]))))
+        self.assertEqual(nodes, [{'name': name}, {'name': 'B'}])
+
+    def test_empty_list(self):
+        self.assertEqual(list(iter_json_nodes(text_file(' [ ] '))), [])
+
+    def test_not_a_list(self):
+        with self.assertRaises(ValidationError):
+            list(iter_json_nodes(text_file('{"name": "A"}')))
+
+    def test_truncated(self):
+        with self.assertRaises(ValidationError):
+            list(iter_json_nodes(text_file('[{"name": "A"}, ')))
+
+    def test_invalid(self):
+        with self.assertRaises(ValidationError):
+            list(iter_json_nodes(text_file('[{"name": A}]')))
+
+
+class TestIterCSVNodes(TestCase):
+
+    def test_nodes(self):
+        nodes = list(iter_csv_nodes(text_file(
+            'name,depth\r\nA,1\r\nA1,2\r\nA1a,3\r\nA2,2\r\nB,1\r\n')))
+        self.assertEqual(nodes, [
+            {'data': {'name': 'A'}, 'children': [
+                {'data': {'name': 'A1'}, 'children': [
+                    {'data': {'name': 'A1a'}, 'children': []},
+                ]},
+                {'data': {'name': 'A2'}, 'children': []},
+            ]},
+            {'data': {'name': 'B'}, 'children': []},
+        ])
+
+    def test_depth_column_required(self):
+        with self.assertRaises(ValidationError):
+            list(iter_csv_nodes(text_file('name\r\nA\r\n')))
+
+    def test_invalid_depth(self):
+        with self.assertRaises(ValidationError):
+            list(iter_csv_nodes(text_file('name,depth\r\nA,1\r\nA1,3\r\n')))
+
+
+class TestTreeImporter(TestCase):
+
+    def setUp(self):
+        self.model_admin = get_registered_modeladmin('benchmarks', 'category')
+        self.request = RequestFactory().get('/')
+        self.request.user = get_user_model().objects.create_superuser(
+            'admin', 'admin@example.com', 'password')
+
+    def get_importer(self, **kwargs):
+        return TreeImporter(self.model_admin, self.request, **kwargs)
+
+    def test_import(self):
+        importer = self.get_importer(batch_size=2)
+        count = importer.run([
+            {'data': {'name': 'A'}, 'children': [
+                {'data': {'name': 'A1'}},
+                {'data': {'name': 'A2'}},
+            ]},
+            {'name': 'B'},
+        ])
+        self.assertEqual(count, 4)
+        self.assertEqual(
+            [node.name for node in Category.get_root_nodes()], ['A', 'B'])
+        self.assertEqual(
+            [node.name for node in
+             Category.objects.get(name='A').get_children()], ['A1', 'A2'])
+        self.assertEqual(Category.find_problems(), ([], [], [], [], []))
+
+    def test_import_beneath_parent(self):
+        parent = Category.add_root(name='Parent')
+        self.get_importer(parent=parent).run([{'name': 'A'}])
+        self.assertEqual(
+            [node.name for node in
+             Category.objects.get(name='Parent').get_children()], ['A'])
+
+    def test_tree_fields_ignored(self):
+        self.get_importer().run([{'name': 'A', 'path': 'ZZZZ', 'depth': 5}])
+        node = Category.objects.get(name='A')
+        self.assertEqual(node.depth, 1)
+        self.assertNotEqual(node.path, 'ZZZZ')
+
+    def test_invalid_node_stops_its_batch(self):
+        importer = self.get_importer(batch_size=2)
+        with self.assertRaises(ValidationError):
+            importer.run([
+                {'name': 'A'}, {'name': 'B'},
+                {'name': 'C'}, {'name': ''},
+            ])
+        # The first batch was imported, but not the one with the invalid node
+        self.assertEqual(importer.count, 2)
+        self.assertEqual(
+            sorted(Category.objects.values_list('name', flat=True)),
+            ['A', 'B'])
+
+    def test_progress_callback(self):
+        progress = []
+        self.get_importer(
+            batch_size=1,
+            progress_callback=lambda count, elapsed: progress.append(count)
+        ).run([{'name': 'A'}, {'name': 'B'}])
+        self.assertEqual(progress, [1, 2, 2])
@@ -0,0 +1,47 @@
+from django.contrib.auth import get_user_model
+from django.core.urlresolvers import reverse
+from django.test import TestCase
+
+from wagtailmodeladmin.helpers import get_url_name
+from wagtailmodeladmin.options import get_registered_modeladmin
+
+from benchmarks import factories
+from benchmarks.models import Category
+
+
+class TestTreeListingPagination(TestCase):
+
+    def setUp(self):
+        # 3 root nodes, 2 of which have 3 children each
+        factories.create_categories(9, fanout=3)
+        self.model_admin = get_registered_modeladmin('benchmarks', 'category')
+        self.model_admin.list_per_page = 2
+        get_user_model().objects.create_superuser(
+            'admin', 'admin@example.com', 'password')
+        self.client.login(username='admin', password='password')
+
+    def tearDown(self):
+        del self.model_admin.list_per_page
+
+    def get(self, params=None):
+        return self.client.get(
+            reverse(get_url_name(Category._meta, 'index')), params or {})
+
+    def test_pages_are_counted_from_root_nodes(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['all_count'], 9)
+        self.assertEqual(response.context['result_count'], 3)
+        self.assertEqual(response.context['paginator'].num_pages, 2)
+
+    def test_last_page_lists_remaining_root_nodes(self):
+        response = self.get({'p': 1})
+        self.assertEqual(
+            [c.name for c in response.context['object_list']],
+            ['Category 2'])
+
+    def test_pages_beyond_root_nodes_show_first_page(self):
+        response = self.get({'p': 3})
+        self.assertEqual(
+            [c.name for c in response.context['object_list']],
+            ['Category 0', 'Category 1'])
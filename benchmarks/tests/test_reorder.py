@@ -0,0 +1,82 @@
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+
+from wagtailmodeladmin.recipes.treebeard.reorder import TreeReorder
+
+from benchmarks.models import Category
+
+
+def get_names(nodes):
+    return [node.name for node in nodes]
+
+
+class TestTreeReorder(TestCase):
+
+    def setUp(self):
+        self.a = Category.add_root(name='A')
+        self.b = Category.add_root(name='B')
+        self.c = Category.add_root(name='C')
+        self.a1 = self.get('A').add_child(name='A1')
+        self.a2 = self.get('A').add_child(name='A2')
+        self.a1.add_child(name='A1a')
+
+    def get(self, name):
+        return Category.objects.get(name=name)
+
+    def reorder(self, orders):
+        return TreeReorder(Category, orders).apply()
+
+    def assertTreeValid(self):
+        self.assertEqual(Category.find_problems(), ([], [], [], [], []))
+
+    def test_reorder_roots(self):
+        paths = self.reorder([(None, [self.c.pk, self.a.pk, self.b.pk])])
+        self.assertEqual(get_names(Category.get_root_nodes()),
+                         ['C', 'A', 'B'])
+        # Descendants move with their ancestors
+        self.assertEqual(get_names(self.get('A').get_children()),
+                         ['A1', 'A2'])
+        self.assertEqual(get_names(self.get('A1').get_children()), ['A1a'])
+        self.assertEqual(paths[self.c.pk], self.get('C').path)
+        self.assertTreeValid()
+
+    def test_unchanged_order_changes_nothing(self):
+        paths = self.reorder([(None, [self.a.pk, self.b.pk, self.c.pk])])
+        self.assertEqual(paths, {})
+
+    def test_move_between_parents(self):
+        self.reorder([
+            (self.a.pk, [self.a2.pk]),
+            (self.b.pk, [self.a1.pk]),
+        ])
+        self.assertEqual(get_names(self.get('A').get_children()), ['A2'])
+        self.assertEqual(get_names(self.get('B').get_children()), ['A1'])
+        self.assertEqual(get_names(self.get('A1').get_children()), ['A1a'])
+        self.assertEqual(self.get('A').numchild, 1)
+        self.assertEqual(self.get('B').numchild, 1)
+        self.assertEqual(self.get('A1a').depth, 3)
+        self.assertTreeValid()
+
+    def test_parent_that_only_loses_children(self):
+        self.reorder([(self.b.pk, [self.a1.pk, self.a2.pk])])
+        self.assertEqual(self.get('A').numchild, 0)
+        self.assertEqual(get_names(self.get('B').get_children()),
+                         ['A1', 'A2'])
+        self.assertTreeValid()
+
+    def test_every_existing_child_required(self):
+        with self.assertRaises(ValidationError):
+            self.reorder([(self.a.pk, [self.a2.pk])])
+
+    def test_items_positioned_once(self):
+        with self.assertRaises(ValidationError):
+            self.reorder([(self.a.pk, [self.a1.pk, self.a1.pk, self.a2.pk])])
+
+    def test_cannot_move_beneath_self(self):
+        with self.assertRaises(ValidationError):
+            self.reorder([(self.a1.pk, [self.get('A1a').pk, self.a.pk])])
+        self.assertTreeValid()
+
+    def test_missing_nodes(self):
+        with self.assertRaises(ValidationError):
+            self.reorder([(None, [self.a.pk, self.b.pk, self.c.pk, 0])])
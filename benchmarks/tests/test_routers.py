@@ -0,0 +1,65 @@
+from django.db import DEFAULT_DB_ALIAS
+from django.test import SimpleTestCase
+
+from wagtailmodeladmin.routers import (
+    ModelAdminReadRouter, get_read_db_alias, read_from)
+
+from benchmarks.models import Author, Category
+
+
+def get_instance(model, alias):
+    obj = model()
+    obj._state.db = alias
+    return obj
+
+
+class TestModelAdminReadRouter(SimpleTestCase):
+
+    def setUp(self):
+        self.router = ModelAdminReadRouter()
+
+    def test_read_from_sets_alias_for_block(self):
+        self.assertIsNone(get_read_db_alias())
+        with read_from('replica'):
+            self.assertEqual(get_read_db_alias(), 'replica')
+            with read_from(DEFAULT_DB_ALIAS):
+                self.assertEqual(get_read_db_alias(), DEFAULT_DB_ALIAS)
+            self.assertEqual(get_read_db_alias(), 'replica')
+        self.assertIsNone(get_read_db_alias())
+
+    def test_reads_are_only_routed_in_block(self):
+        self.assertIsNone(self.router.db_for_read(Author))
+        with read_from('replica'):
+            self.assertEqual(self.router.db_for_read(Author), 'replica')
+
+    def test_writes_in_block_go_to_default(self):
+        with read_from('replica'):
+            self.assertEqual(self.router.db_for_write(Author),
+                             DEFAULT_DB_ALIAS)
+            self.assertEqual(
+                self.router.db_for_write(
+                    Author, instance=get_instance(Author, 'replica')),
+                DEFAULT_DB_ALIAS)
+
+    def test_writes_of_replica_objects_go_to_default(self):
+        with read_from('replica'):
+            instance = get_instance(Author, 'replica')
+        self.assertEqual(
+            self.router.db_for_write(Author, instance=instance),
+            DEFAULT_DB_ALIAS)
+
+    def test_other_writes_are_left_to_other_routers(self):
+        self.assertIsNone(self.router.db_for_write(Author))
+        self.assertIsNone(self.router.db_for_write(
+            Author, instance=get_instance(Author, 'other')))
+        self.assertIsNone(self.router.db_for_write(
+            Author, instance=get_instance(Author, DEFAULT_DB_ALIAS)))
+
+    def test_relations_between_default_and_replica_allowed_in_block(self):
+        author = get_instance(Author, DEFAULT_DB_ALIAS)
+        category = get_instance(Category, 'replica')
+        with read_from('replica'):
+            self.assertTrue(self.router.allow_relation(author, category))
+            self.assertIsNone(self.router.allow_relation(
+                author, get_instance(Category, 'other')))
+        self.assertIsNone(self.router.allow_relation(author, category))
@@ -0,0 +1,44 @@
+from django.conf import settings
+
+from wagtailmodeladmin.options import ModelAdmin, wagtailmodeladmin_register
+from wagtailmodeladmin.recipes.treebeard.options import TreebeardModelAdmin
+
+from .models import Author, Category, EventPage, boot_models
+
+
+class AuthorAdmin(ModelAdmin):
+    model = Author
+    list_display = ('name', 'email', 'status', 'category', 'joined')
+    list_filter = ('status', 'joined')
+    list_select_related = ('category',)
+    search_fields = ('name', 'email')
+    inspect_view_enabled = True
+    read_db_alias = 'replica' if 'replica' in settings.DATABASES else None
+    use_row_counter = bool(
+        getattr(settings, 'WAGTAILMODELADMIN_ROW_COUNTERS', None))
+
+
+class CategoryAdmin(TreebeardModelAdmin):
+    model = Category
+    list_display = ('name',)
+
+
+class EventPageAdmin(ModelAdmin):
+    model = EventPage
+    list_display = ('title', 'date', 'live')
+    list_filter = ('live',)
+    search_fields = ('title',)
+
+
+wagtailmodeladmin_register(AuthorAdmin)
+wagtailmodeladmin_register(CategoryAdmin)
+wagtailmodeladmin_register(EventPageAdmin)
+
+for boot_model in boot_models:
+    wagtailmodeladmin_register(type(
+        str('%sAdmin' % boot_model.__name__), (ModelAdmin,), {
+            'model': boot_model,
+            'list_display': ('name', 'status'),
+            'list_filter': ('status',),
+            'search_fields': ('name',),
+        }))
@@ -15,7 +15,7 @@ setup(
     author_email="ababic@rkh.co.uk",
     description="Customisable 'django-admin' style listing pages for Wagtail",
     long_description=README,
-    packages=find_packages(),
+    packages=find_packages(exclude=['benchmarks', 'benchmarks.*']),
     license="MIT",
     keywords="wagtail cms model utility",
     download_url="https://github.com/rkhleics/wagtailmodeladmin/tarball/0.1",
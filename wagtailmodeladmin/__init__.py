@@ -1 +1,3 @@
 __version__ = '2.5.6'
+
+default_app_config = 'wagtailmodeladmin.apps.WagtailModelAdminAppConfig'
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class WagtailModelAdminAppConfig(AppConfig):
+    name = 'wagtailmodeladmin'
+
+    def ready(self):
+        from .counters import setup_counters
+        setup_counters()
@@ -0,0 +1,138 @@
+"""
+Query budgets for ModelAdmin views. A budget is declared on a `ModelAdmin`
+class using a `<action>_view_max_queries` attribute, as either a number of
+queries, or a `(base, per_row)` tuple, where `per_row` is multiplied by the
+number of rows the view can display (e.g. `list_per_page` for `index_view`):
+
+    class BookAdmin(ModelAdmin):
+        model = Book
+        list_display = ('title', 'author', 'get_reviews_count')
+        index_view_max_queries = (12, 0)
+        inspect_view_max_queries = 10
+
+Queries are counted from the moment a view method is called until its
+response has been rendered (including any queries made by the template).
+How a view exceeding its budget is reported depends on the
+`WAGTAILMODELADMIN_QUERY_BUDGET_ACTION` setting:
+
+'raise'
+    Raise `QueryBudgetExceeded` (the default when running tests)
+
+'warn'
+    Issue a `QueryBudgetWarning` (the default when `DEBUG` is `True`)
+
+'log'
+    Log a warning, including the SQL for every query, to the
+    'wagtailmodeladmin.budgets' logger (the default otherwise)
+
+Views without a budget are not affected in any way.
+"""
+import logging
+import warnings
+from collections import deque
+from functools import wraps
+
+from django.conf import settings
+from django.core import mail
+from django.db import connections
+
+logger = logging.getLogger('wagtailmodeladmin.budgets')
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryBudgetWarning(RuntimeWarning):
+    pass
+
+
+class QueryCounter(object):
+    """
+    A context manager that records the queries made using any database
+    connection while it is active.
+
+    Each connection's `queries_log` is a deque that only keeps the last
+    9000 queries, so once it is full, counting the entries added to it would
+    miss queries. Instead, while the block runs, queries are logged to a new
+    deque with no limit, and are added to the original afterwards (so that
+    anything else reading the log, such as `CaptureQueriesContext` or an
+    enclosing `QueryCounter`, still sees them).
+    """
+
+    def __enter__(self):
+        self.states = []
+        for connection in connections.all():
+            self.states.append((
+                connection, connection.force_debug_cursor,
+                connection.queries_log))
+            connection.force_debug_cursor = True
+            connection.queries_log = deque()
+        self.queries = []
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        for connection, force_debug_cursor, queries_log in self.states:
+            log = connection.queries_log
+            queries_log.extend(log)
+            connection.queries_log = queries_log
+            connection.force_debug_cursor = force_debug_cursor
+            self.queries.extend(
+                dict(query, alias=connection.alias) for query in log)
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+
+def get_budget_action():
+    action = getattr(settings, 'WAGTAILMODELADMIN_QUERY_BUDGET_ACTION', None)
+    if action:
+        return action
+    # Django's test runner replaces the email backend with one that stores
+    # messages in `mail.outbox`
+    if hasattr(mail, 'outbox'):
+        return 'raise'
+    if settings.DEBUG:
+        return 'warn'
+    return 'log'
+
+
+def report_exceeded(model_admin, action, request, max_queries, queries):
+    message = (
+        "%s's %s_view made %s queries for %s, exceeding its budget of %s" % (
+            model_admin.__class__.__name__, action, len(queries),
+            request.get_full_path(), max_queries))
+    budget_action = get_budget_action()
+    if budget_action == 'raise':
+        raise QueryBudgetExceeded(message)
+    if budget_action == 'warn':
+        warnings.warn(message, QueryBudgetWarning)
+        return
+    logger.warning(
+        "%s:\n%s", message,
+        '\n'.join('[%s] %s' % (q['alias'], q['sql']) for q in queries))
+
+
+def enforce_query_budget(action):
+    """
+    A decorator for `ModelAdmin` view methods that checks the queries made
+    by the view (and when its response is rendered) against the budget
+    returned by `ModelAdmin.get_max_queries(action)`
+    """
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(model_admin, request, *args, **kwargs):
+            max_queries = model_admin.get_max_queries(action)
+            if max_queries is None:
+                return view_method(model_admin, request, *args, **kwargs)
+            with QueryCounter() as counter:
+                response = view_method(model_admin, request, *args, **kwargs)
+                if callable(getattr(response, 'render', None)):
+                    response = response.render()
+            if counter.count > max_queries:
+                report_exceeded(model_admin, action, request, max_queries,
+                                counter.queries)
+            return response
+        return wrapper
+    return decorator
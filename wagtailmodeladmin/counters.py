@@ -0,0 +1,184 @@
+"""
+Exact row counts for ModelAdmin listings, kept in a table (`RowCount`) that is
+updated as rows are created and deleted, so that the index view doesn't need
+to count every row for each request. To use a counter, list the model in
+your settings, and set `use_row_counter` on your ModelAdmin:
+
+    WAGTAILMODELADMIN_ROW_COUNTERS = ['books.Book']
+
+    class BookAdmin(ModelAdmin):
+        model = Book
+        use_row_counter = True
+
+Counters are updated by `post_save` and `post_delete` signal handlers, in the
+same transaction as the change. They count the rows returned by the model's
+default manager, so they should only be used where `ModelAdmin.get_queryset`
+isn't filtered (e.g. by user), and where the default manager returns every
+row.
+
+Changes that don't send signals (e.g. `bulk_create()`, `update()` or raw
+SQL) aren't counted, so the `wagtailmodeladmin_reconcile_counts` management
+command should be run periodically (or after bulk changes) to recount rows.
+A counter that doesn't exist yet is created (by counting rows) when first
+needed.
+"""
+from django.apps import apps
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from .models import RowCount
+
+# Concrete models with counters
+_counted_models = set()
+
+
+def get_model_label(model):
+    return '%s.%s' % (model._meta.app_label, model._meta.object_name)
+
+
+def get_counter_model_labels():
+    return getattr(settings, 'WAGTAILMODELADMIN_ROW_COUNTERS', [])
+
+
+def get_counted_models():
+    return sorted(_counted_models, key=get_model_label)
+
+
+def is_counted(model):
+    return model._meta.concrete_model in _counted_models
+
+
+def check_counted(model):
+    if not is_counted(model):
+        raise ImproperlyConfigured(
+            "ModelAdmin.use_row_counter is set for %s, but it isn't in your "
+            "WAGTAILMODELADMIN_ROW_COUNTERS setting." % (
+                get_model_label(model),))
+
+
+def get_counters(model, using):
+    opts = model._meta
+    return RowCount._default_manager.using(using).filter(
+        app_label=opts.app_label, model_name=opts.model_name)
+
+
+def add_to_counts(models, delta, using):
+    for model in models:
+        get_counters(model, using).update(count=F('count') + delta)
+
+
+def row_created(sender, created, using, **kwargs):
+    # Creating a row for a model with multi-table inheritance creates a row
+    # for each of its parents too, but signals are only sent for the model
+    # itself
+    if created:
+        concrete_model = sender._meta.concrete_model
+        add_to_counts([
+            model for model in
+            [concrete_model] + list(concrete_model._meta.get_parent_list())
+            if model in _counted_models
+        ], 1, using)
+
+
+def row_deleted(sender, using, **kwargs):
+    # Deleting a row for a model with multi-table inheritance also deletes
+    # the parents' rows, and signals are sent for each of them
+    concrete_model = sender._meta.concrete_model
+    if concrete_model in _counted_models:
+        add_to_counts([concrete_model], -1, using)
+
+
+def setup_counters():
+    """
+    Connect signal handlers for the models in the
+    `WAGTAILMODELADMIN_ROW_COUNTERS` setting, along with any models that
+    inherit from them. Called when Django starts.
+    """
+    for label in get_counter_model_labels():
+        try:
+            model = apps.get_model(label)
+        except (LookupError, ValueError):
+            raise ImproperlyConfigured(
+                "'%s' in the WAGTAILMODELADMIN_ROW_COUNTERS setting isn't an "
+                "installed model." % label)
+        _counted_models.add(model._meta.concrete_model)
+
+    # Handlers are only connected for these models (rather than for every
+    # model), because Django can't delete rows without fetching them first
+    # if there are any post_delete handlers for their model
+    counted = tuple(_counted_models)
+    for model in apps.get_models():
+        if counted and issubclass(model, counted):
+            uid = 'wagtailmodeladmin_counter_%s' % get_model_label(model)
+            post_save.connect(row_created, sender=model, dispatch_uid=uid)
+            post_delete.connect(row_deleted, sender=model, dispatch_uid=uid)
+
+
+def create_counter(model, using):
+    """
+    Create a counter for `model`, returning a tuple of the counter and a
+    boolean indicating whether it was created. If another request created
+    it first, that counter is returned (locked, like a new one) instead.
+    Must be called in a transaction.
+    """
+    opts = model._meta
+    try:
+        with transaction.atomic(using=using):
+            return RowCount._default_manager.using(using).create(
+                app_label=opts.app_label, model_name=opts.model_name), True
+    except IntegrityError:
+        return get_counters(model, using).select_for_update().get(), False
+
+
+def reconcile(model, using=DEFAULT_DB_ALIAS):
+    """
+    Count the rows for `model`, and save the result to its counter, creating
+    it if necessary. Returns a tuple of the counter's previous value (`None`
+    if it didn't exist) and its new value.
+    """
+    model = model._meta.concrete_model
+    with transaction.atomic(using=using):
+        # Locking the counter first makes changes committed while rows are
+        # being counted wait, then update the new count
+        counter = get_counters(model, using).select_for_update().first()
+        if counter is None:
+            counter, created = create_counter(model, using)
+        else:
+            created = False
+        previous = None if created else counter.count
+        counter.count = model._default_manager.using(using).count()
+        counter.reconciled_at = timezone.now()
+        counter.save(using=using)
+    return previous, counter.count
+
+
+def get_row_count(model, using=None):
+    """
+    Return the number of rows for `model`, according to its counter. The
+    database is chosen by the project's routers unless `using` is supplied.
+    """
+    model = model._meta.concrete_model
+    count = get_counters(model, using).values_list('count', flat=True).first()
+    if count is None:
+        count = reconcile(model)[1]
+    return count
+
+
+class CountedPaginator(Paginator):
+    """
+    A paginator for results that have already been counted (or whose number
+    is known from a counter), so that they aren't counted again
+    """
+
+    def __init__(self, object_list, per_page, count, **kwargs):
+        super(CountedPaginator, self).__init__(object_list, per_page, **kwargs)
+        self._known_count = count
+
+    @property
+    def count(self):
+        return self._known_count
@@ -0,0 +1,87 @@
+from collections import OrderedDict
+
+from django.db import models
+from django.db.models.deletion import (
+    Collector, get_candidate_relations_to_delete)
+
+
+def get_model_key(model):
+    return '%s.%s' % (model._meta.app_label, model._meta.model_name)
+
+
+class CountingCollector(Collector):
+    """
+    A variation of Django's deletion `Collector` that counts the objects that
+    would be affected by a deletion, rather than collecting them. Related
+    objects are identified using subqueries, and counted with aggregate
+    queries (one per relation), so none of them are loaded into memory.
+
+    Because objects aren't collected, an object reachable through more than
+    one cascade path is counted more than once, so counts should be treated
+    as an upper limit. Cascades are followed to a depth of `max_depth`, after
+    which `truncated` is set to `True`.
+    """
+    max_depth = 10
+
+    def __init__(self, using):
+        super(CountingCollector, self).__init__(using)
+        self.deleted_counts = OrderedDict()
+        self.updated_counts = OrderedDict()
+        self.protected_counts = OrderedDict()
+        self.truncated = False
+
+    def add_count(self, counts, model, count):
+        counts[model] = counts.get(model, 0) + count
+
+    def count(self, queryset):
+        """
+        Count the objects affected by deleting the objects in `queryset`
+        (which aren't included in the counts themselves)
+        """
+        self.count_related(queryset.model, queryset, queryset.count(), 0)
+        return self
+
+    def count_related(self, model, queryset, count, depth):
+        # With multi-table inheritance, a row is deleted for each parent model
+        for parent_model in model._meta.get_parent_list():
+            self.add_count(self.deleted_counts, parent_model, count)
+
+        for related in get_candidate_relations_to_delete(model._meta):
+            if related.parent_link and issubclass(model,
+                                                  related.related_model):
+                # Links from our parents back to 'model' itself
+                continue
+            on_delete = related.on_delete
+            if on_delete == models.DO_NOTHING:
+                continue
+            sub_objs = self.related_objects(related, queryset)
+            sub_count = sub_objs.count()
+            if not sub_count:
+                continue
+            related_model = related.related_model
+            if on_delete == models.CASCADE:
+                self.add_count(self.deleted_counts, related_model, sub_count)
+                if depth < self.max_depth:
+                    self.count_related(related_model, sub_objs, sub_count,
+                                       depth + 1)
+                else:
+                    self.truncated = True
+            elif on_delete == models.PROTECT:
+                self.add_count(self.protected_counts, related_model,
+                               sub_count)
+            else:
+                # SET_NULL, SET_DEFAULT or SET()
+                self.add_count(self.updated_counts, related_model, sub_count)
+
+    def as_dict(self):
+        """
+        Return the counts in a form that can be safely cached
+        """
+        def serialise(counts):
+            return [(get_model_key(m), n) for m, n in counts.items()]
+        return {
+            'deleted': serialise(self.deleted_counts),
+            'updated': serialise(self.updated_counts),
+            'protected': serialise(self.protected_counts),
+            'truncated': self.truncated,
+        }
@@ -0,0 +1,118 @@
+"""
+Routes requests for the views of every registered ModelAdmin through a single
+URL pattern, so that Django doesn't need to try every ModelAdmin's patterns in
+turn when resolving admin URLs.
+
+The patterns returned by `get_admin_urls_for_registration` are still added to
+Wagtail's admin URLs, so URL names can be reversed as before. But those in
+the standard form (see `helpers.get_url_pattern` and
+`helpers.get_object_specific_url_pattern`) are replaced with
+`ReverseOnlyURLPattern` objects, which never match when resolving. Instead,
+`ModelAdminURLDispatcher` matches any URL in the standard form, and finds
+the pattern (and view) for it with a dictionary lookup. Patterns in any other
+form are left as they are.
+"""
+import re
+
+from django.core.urlresolvers import RegexURLPattern, ResolverMatch
+from django.http import Http404
+
+DISPATCH_URL_PATTERN = (
+    r'^modeladmin/(?P<app_label>\w+)/(?P<model_name>\w+)/'
+    r'(?:(?P<action>\w+)/(?:(?P<object_id>[-\w]+)/)?)?$'
+)
+
+# Matches the regular expressions returned by `get_url_pattern` and
+# `get_object_specific_url_pattern`
+standard_pattern_re = re.compile(
+    r'^\^modeladmin/(?P<app_label>\w+)/(?P<model_name>\w+)/'
+    r'(?:(?P<action>\w+)/)?(?P<object_id>\(\?P<object_id>\[-\\w\]\+\)/)?\$$'
+)
+
+# `ReverseOnlyURLPattern` objects for the views of registered ModelAdmins,
+# keyed by (app_label, model_name, action, is_object_specific). `action` is
+# `None` for index views.
+_patterns = {}
+
+
+class ReverseOnlyURLPattern(RegexURLPattern):
+    """
+    A URL pattern that can be reversed, but never matches when resolving
+    URLs. Requests are routed to its view by `ModelAdminURLDispatcher`.
+    """
+
+    def resolve(self, path):
+        return None
+
+
+def get_pattern(app_label, model_name, action, object_id):
+    key = (app_label, model_name, action, object_id is not None)
+    return _patterns.get(key)
+
+
+def dispatch(request, app_label, model_name, action=None, object_id=None):
+    """
+    Call the view for the ModelAdmin URL matched by `DISPATCH_URL_PATTERN`.
+    Only used if the view function is called directly, because
+    `ModelAdminURLDispatcher.resolve` resolves URLs to the views themselves.
+    """
+    pattern = get_pattern(app_label, model_name, action, object_id)
+    if pattern is None:
+        raise Http404
+    kwargs = dict(pattern.default_args)
+    if object_id is not None:
+        kwargs['object_id'] = object_id
+    return pattern.callback(request, **kwargs)
+
+
+class ModelAdminURLDispatcher(RegexURLPattern):
+    """
+    A single URL pattern that matches the standard URLs for the views of every
+    registered ModelAdmin. URLs are resolved to the registered pattern's view
+    and name (so `request.resolver_match` is the same as if the pattern had
+    matched). URLs without a registered pattern don't match, and are left for
+    any patterns that follow.
+    """
+
+    def __init__(self):
+        super(ModelAdminURLDispatcher, self).__init__(
+            DISPATCH_URL_PATTERN, dispatch)
+
+    def resolve(self, path):
+        match = self.regex.search(path)
+        if not match:
+            return None
+        pattern = get_pattern(*match.group(
+            'app_label', 'model_name', 'action', 'object_id'))
+        if pattern is None:
+            return None
+        kwargs = dict(pattern.default_args)
+        if match.group('object_id') is not None:
+            kwargs['object_id'] = match.group('object_id')
+        # Wagtail can decorate the callbacks of admin URL patterns (e.g. to
+        # check the user can access the admin) after they're registered, so
+        # the view must be read from the pattern
+        return ResolverMatch(pattern.callback, (), kwargs, pattern.name)
+
+
+def register_urls(urls):
+    """
+    Register the standard patterns in `urls` (URL patterns for ModelAdmin
+    views, as returned by `get_admin_urls_for_registration`) with the
+    dispatcher, returning a new list, in which they're replaced with
+    `ReverseOnlyURLPattern` objects
+    """
+    registered = []
+    for pattern in urls:
+        match = None
+        if isinstance(pattern, RegexURLPattern):
+            match = standard_pattern_re.match(pattern.regex.pattern)
+        if match is not None:
+            pattern = ReverseOnlyURLPattern(
+                pattern.regex.pattern, pattern.callback, pattern.default_args,
+                pattern.name)
+            key = match.group('app_label', 'model_name', 'action') + (
+                match.group('object_id') is not None,)
+            _patterns[key] = pattern
+        registered.append(pattern)
+    return registered
@@ -1,14 +1,78 @@
 from django import forms
+from django.forms.models import ModelChoiceIterator
 from django.utils.translation import ugettext as _
+from django.utils.html import conditional_escape
 from wagtail.wagtailcore.models import Page
 from django.utils.safestring import mark_safe
 
+# Keeps the number of parameters in each ancestor query within the limits of
+# all supported databases
+ANCESTOR_QUERY_BATCH_SIZE = 500
+
+
+class PageChoiceIterator(ModelChoiceIterator):
+    """
+    Evaluates the field's queryset once, and fetches the titles of all
+    ancestors of the pages it contains before generating choices, so that
+    labels can be generated without further queries.
+    """
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        pages = list(self.queryset.all())
+        self.field.prefetch_ancestor_titles(pages)
+        for obj in pages:
+            yield self.choice(obj)
+
 
 class CustomModelChoiceField(forms.ModelChoiceField):
+    iterator = PageChoiceIterator
+    ancestor_titles = None
+
+    def _get_choices(self):
+        if hasattr(self, '_choices'):
+            return self._choices
+        return self.iterator(self)
+
+    choices = property(_get_choices, forms.ChoiceField._set_choices)
+
+    def get_ancestor_paths(self, page):
+        """
+        Return the materialized paths of the ancestors of `page` (including
+        the page itself, but excluding the root page), from the top down
+        """
+        steplen = page.steplen
+        return [
+            page.path[:steplen * depth]
+            for depth in range(2, page.depth + 1)
+        ]
+
+    def prefetch_ancestor_titles(self, pages):
+        """
+        Fetch the titles of all ancestors of `pages`, storing them in a
+        dictionary keyed by path, for use by `label_from_instance`
+        """
+        paths = set()
+        for page in pages:
+            paths.update(self.get_ancestor_paths(page))
+        paths = sorted(paths)
+        titles = {}
+        for i in range(0, len(paths), ANCESTOR_QUERY_BATCH_SIZE):
+            batch = paths[i:i + ANCESTOR_QUERY_BATCH_SIZE]
+            titles.update(Page.objects.filter(path__in=batch).values_list(
+                'path', 'title'))
+        self.ancestor_titles = titles
+
     def label_from_instance(self, obj):
-        bits = []
-        for ancestor in obj.get_ancestors(inclusive=True).exclude(depth=1):
-            bits.append(ancestor.title)
+        titles = self.ancestor_titles
+        if titles is None:
+            titles = dict(
+                obj.get_ancestors(inclusive=True).exclude(depth=1)
+                .values_list('path', 'title'))
+        bits = [
+            conditional_escape(titles[path])
+            for path in self.get_ancestor_paths(obj) if path in titles
+        ]
         return mark_safe('<span class="icon icon-arrow-right"></span>'.join(bits))
 
 
@@ -25,3 +89,27 @@ class ParentChooserForm(forms.Form):
         self.valid_parents_qs = valid_parents_qs
         super(ParentChooserForm, self).__init__(*args, **kwargs)
         self.fields['parent_page'].queryset = self.valid_parents_qs
+
+
+class ParentChooserFilterForm(forms.Form):
+    """
+    Allows the candidates listed by `ParentChooserForm` to be narrowed down
+    by title, or to a single section of the tree
+    """
+    q = forms.CharField(label=_('Search'), required=False)
+    section = forms.ModelChoiceField(
+        label=_('Section'),
+        required=False,
+        empty_label=_('All sections'),
+        queryset=Page.objects.filter(depth=2).order_by('title'),
+    )
+
+    def filter_queryset(self, queryset):
+        if not self.is_valid():
+            return queryset
+        for bit in self.cleaned_data['q'].split():
+            queryset = queryset.filter(title__icontains=bit)
+        section = self.cleaned_data['section']
+        if section is not None:
+            queryset = queryset.filter(path__startswith=section.path)
+        return queryset
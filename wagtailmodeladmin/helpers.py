@@ -1,9 +1,27 @@
+import operator
+import os
+from functools import reduce
+
+from django.conf import settings
 from django.contrib.auth import get_permission_codename
 from django.utils.translation import ugettext as _
 from django.utils.encoding import force_text
 from django.contrib.admin.utils import quote
 from django.core.urlresolvers import reverse
-from wagtail.wagtailcore.models import Page
+from django.core.cache import cache
+from django.db import models
+from django.template.loader import select_template
+from django.utils import six
+from django.contrib.contenttypes.models import ContentType
+from wagtail.wagtailcore.models import (
+    GroupPagePermission, Page, get_page_models)
+
+# `Filter` objects fetched by `get_image_filter`, keyed by spec
+_image_filters = {}
+
+# (template, modification time) tuples found by `get_cached_template`, keyed
+# by the template names searched for
+_templates = {}
 
 
 class PermissionHelper(object):
@@ -120,24 +138,53 @@ class PagePermissionHelper(PermissionHelper):
         """
         Identifies possible parent pages for the current user by first looking
         at allowed_parent_page_types() on self.model to limit options to the
-        correct type of page, then checking permissions on those individual
-        pages to make sure we have permission to add a subpage to it.
+        correct type of page, then limiting those to pages the user has
+        permission to add a subpage to. Permissions are applied as filters on
+        the queryset (rather than checked for each page), so the queryset is
+        never evaluated here.
         """
-        # Start with empty qs
-        parents_qs = Page.objects.none()
-
-        # Add pages of the correct type
-        valid_parent_types = self.model.allowed_parent_page_types()
-        for pt in valid_parent_types:
-            pt_items = Page.objects.type(pt.model_class())
-            parents_qs = parents_qs | pt_items
-
-        # Exclude pages that we can't add subpages to
-        for page in parents_qs.all():
-            if not page.permissions_for_user(user).can_add_subpage():
-                parents_qs = parents_qs.exclude(pk=page.pk)
-
-        return parents_qs
+        if not user.is_active:
+            return Page.objects.none()
+
+        # Pages of the correct type, whose own type (which may be a subclass
+        # of an allowed parent type) allows this model as a subpage. This
+        # includes the root page, where the model's parent page types allow
+        # it.
+        parents_qs = Page.objects.filter(
+            content_type__in=self.get_valid_parent_content_types())
+        if user.is_superuser:
+            return parents_qs
+
+        # Subpages can be added at or below any page that one of the user's
+        # groups has 'add' permission for (but never to the root page)
+        add_paths = GroupPagePermission.objects.filter(
+            group__user=user, permission_type='add'
+        ).values_list('page__path', flat=True)
+        if not add_paths:
+            return Page.objects.none()
+        path_filter = reduce(operator.or_, [
+            models.Q(path__startswith=path) for path in add_paths
+        ])
+        return parents_qs.filter(path_filter)
+
+    def get_valid_parent_content_types(self):
+        """
+        Return a list of the content types of pages that `self.model` pages
+        can be created under, according to `parent_page_types` on
+        `self.model`, and `subpage_types` on each type of parent
+        """
+        model_type = ContentType.objects.get_for_model(self.model)
+        parent_types = set(self.model.allowed_parent_page_types())
+        valid_types = []
+        for page_model in get_page_models():
+            page_type = ContentType.objects.get_for_model(page_model)
+            if (
+                any(issubclass(page_model, parent_type.model_class())
+                    for parent_type in parent_types) and
+                model_type in page_model.allowed_subpage_types()
+            ):
+                valid_types.append(page_type)
+        return valid_types
 
     def can_edit_object(self, user, obj):
         perms = obj.permissions_for_user(user)
@@ -159,6 +206,98 @@ class PagePermissionHelper(PermissionHelper):
         return self.has_list_permission(user)
 
 
+def get_image_filter(spec):
+    """
+    Return a `Filter` object for the supplied spec (e.g. 'fill-100x100'),
+    creating it if necessary. Filters are cached for the lifetime of the
+    process, so that views don't need to look them up for every request.
+    """
+    fltr = _image_filters.get(spec)
+    if fltr is None:
+        from wagtail.wagtailimages.models import Filter
+        fltr, created = Filter.objects.get_or_create(spec=spec)
+        _image_filters[spec] = fltr
+    return fltr
+
+
+def has_prefetched_renditions(image):
+    """
+    Return a boolean indicating whether renditions have been prefetched (with
+    `prefetch_related`) onto `image`
+    """
+    return 'renditions' in getattr(image, '_prefetched_objects_cache', {})
+
+
+def get_prefetched_rendition(image, fltr):
+    """
+    Return a rendition of `image` for `fltr` from renditions prefetched (with
+    `prefetch_related`) onto the image, or `None` if no matching rendition
+    was prefetched.
+    """
+    if not has_prefetched_renditions(image):
+        return None
+    prefetched = image._prefetched_objects_cache
+    focal_point_key = ''
+    if hasattr(fltr, 'get_cache_key'):
+        focal_point_key = fltr.get_cache_key(image)
+    for rendition in prefetched['renditions']:
+        if (
+            rendition.filter_id == fltr.pk and
+            getattr(rendition, 'focal_point_key', '') == focal_point_key
+        ):
+            return rendition
+    return None
+
+
+def get_document_model():
+    """
+    Return the document model in use, supporting versions of Wagtail that
+    don't allow the document model to be swapped.
+    """
+    try:
+        from wagtail.wagtaildocs.models import get_document_model
+    except ImportError:
+        from wagtail.wagtaildocs.models import Document
+        return Document
+    return get_document_model()
+
+
+def get_field_display_type(model, field_name, field=None):
+    """
+    Identify how a value for `field_name` should be displayed for instances
+    of `model`. Returns 'choices' if the model has a `get_<field>_display`
+    attribute, 'image' or 'document' for foreign keys to the image or
+    document model, or `None` if the value can be displayed as-is.
+    """
+    if hasattr(model, 'get_%s_display' % field_name):
+        return 'choices'
+    if isinstance(field, models.ForeignKey):
+        from wagtail.wagtailimages.models import get_image_model
+        if field.related_model == get_image_model():
+            return 'image'
+        if field.related_model == get_document_model():
+            return 'document'
+    return None
+
+
+def get_document_file_size(document, timeout=60 * 60 * 24):
+    """
+    Return the size of a document's file in bytes. Finding the size can
+    involve a request to remote storage, so values are cached (the key
+    includes the file name, so replacing the file invalidates it).
+    """
+    file_size = getattr(document, 'file_size', None)
+    if file_size is not None:
+        return file_size
+    cache_key = 'wagtailmodeladmin:document_size:%s:%s' % (
+        document.pk, document.file.name)
+    file_size = cache.get(cache_key)
+    if file_size is None:
+        file_size = document.file.size
+        cache.set(cache_key, file_size, timeout)
+    return file_size
+
+
 def get_url_pattern(model_meta, action=None):
     if not action:
         return r'^modeladmin/%s/%s/$' % (
@@ -172,6 +311,45 @@ def get_object_specific_url_pattern(model_meta, action):
         model_meta.app_label, model_meta.model_name, action)
 
 
+def get_template_mtime(template):
+    """
+    Return the modification time of the file `template` was loaded from, or
+    `None` if it can't be found
+    """
+    template = getattr(template, 'template', template)
+    origin = getattr(template, 'origin', None)
+    try:
+        return os.path.getmtime(origin.name)
+    except (AttributeError, TypeError, OSError):
+        return None
+
+
+def get_cached_template(template_names):
+    """
+    Return the first template found from `template_names` (a template name,
+    or list of names), as `select_template` does. The template chosen for
+    each list of names is cached for the lifetime of the process, so that
+    template directories aren't searched on every request, even without
+    Django's cached template loader.
+
+    As with Python code, new templates are only found once the development
+    server's autoreloader restarts it (or it's restarted manually). But when
+    `DEBUG` is `True`, changes to a template that's already cached are picked
+    up straight away.
+    """
+    if isinstance(template_names, six.string_types):
+        template_names = [template_names]
+    key = tuple(template_names)
+    cached = _templates.get(key)
+    if cached is not None:
+        template, mtime = cached
+        if not settings.DEBUG or get_template_mtime(template) == mtime:
+            return template
+    template = select_template(template_names)
+    _templates[key] = (template, get_template_mtime(template))
+    return template
+
+
 def get_url_name(model_meta, action='index'):
     return '%s_%s_modeladmin_%s/' % (
         model_meta.app_label, model_meta.model_name, action)
@@ -0,0 +1,455 @@
+"""
+Finds the queries made by the index views of registered ModelAdmins that
+can't use an index, and suggests indexes for them. Used by the
+`wagtailmodeladmin_advise_indexes` management command:
+
+    python manage.py wagtailmodeladmin_advise_indexes
+    python manage.py wagtailmodeladmin_advise_indexes --write-migrations
+
+For each ModelAdmin, the listing's queryset is built (as `IndexView` builds
+it) for a few representative requests: the default listing, the listing
+sorted by each sortable column, filtered by a value of each filter, and
+searched. The query for the first page of each one is run with EXPLAIN, and
+where the plan shows a sequential scan of the model's table, or a sort, an
+index is suggested:
+
+-   a B-tree index on the ordering fields, for sorted listings
+-   a composite B-tree index on the filtered field followed by the ordering
+    fields, for filtered listings
+-   on PostgreSQL, a trigram (GIN) index for each search field matched with
+    'contains', and an expression index for '^' (starts with) and '='
+    (exact) search fields, matching the `UPPER(...)` used by Django's
+    case-insensitive lookups
+
+Only columns in the model's own table are indexed. Fields inherited from a
+parent model with multi-table inheritance (e.g. the `title` of a Page model)
+are stored in the parent's table, so are reported instead. On MySQL, B-tree
+indexes on text columns index a prefix of each value.
+
+Indexes that already exist (including any index starting with the same
+columns) aren't suggested. Plans are read on PostgreSQL, SQLite and MySQL.
+For other databases, every candidate index is suggested.
+
+The versions of Django supported have no `Meta.indexes`, so migrations are
+written with `RunSQL`, and are specific to the database they were generated
+for. On PostgreSQL (with Django 1.10 or later, which can run a migration
+outside of a transaction), indexes are created `CONCURRENTLY`, so that the
+table isn't locked against writes while the index is built.
+"""
+import json
+from collections import OrderedDict
+
+from django.contrib.admin import FieldListFilter
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.auth.models import AnonymousUser
+from django.db import connections
+from django.db.backends.utils import truncate_name
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.fields import FieldDoesNotExist
+from django.http import QueryDict
+from django.test.client import RequestFactory
+from django.utils import six
+from django.utils.encoding import force_text
+
+from .views import ORDER_VAR, SEARCH_VAR
+
+SAMPLE_SEARCH_TERM = 'example'
+
+BTREE = 'btree'
+UPPER = 'upper'
+PATTERN = 'pattern'
+TRIGRAM = 'trigram'
+
+TEXT_FIELD_TYPES = ('CharField', 'TextField', 'SlugField')
+
+# MySQL can only index BLOB and TEXT columns up to a prefix length
+MYSQL_PREFIX_FIELD_TYPES = ('TextField', 'BinaryField')
+MYSQL_PREFIX_LENGTH = 255
+
+
+class IndexSuggestion(object):
+    """
+    An index for one or more columns of a model's table, along with the
+    reasons it was suggested
+    """
+
+    def __init__(self, model, columns, kind=BTREE):
+        self.model = model
+        self.table = model._meta.db_table
+        self.columns = list(columns)
+        self.kind = kind
+        self.reasons = []
+
+    @property
+    def key(self):
+        return (self.table, self.kind, tuple(self.columns))
+
+    def get_name(self, connection):
+        name = '%s_%s_wma' % (self.table, '_'.join(self.columns))
+        if self.kind != BTREE:
+            name += '_%s' % self.kind
+        return truncate_name(name, connection.ops.max_name_length())
+
+    def get_column_sql(self, connection, column):
+        qn = connection.ops.quote_name
+        if connection.vendor != 'mysql':
+            return qn(column)
+        for field in self.model._meta.concrete_fields:
+            if (field.column == column and
+                    field.get_internal_type() in MYSQL_PREFIX_FIELD_TYPES):
+                return '%s(%s)' % (qn(column), MYSQL_PREFIX_LENGTH)
+        return qn(column)
+
+    def get_expression(self, connection):
+        qn = connection.ops.quote_name
+        if self.kind == BTREE:
+            return '(%s)' % ', '.join(
+                self.get_column_sql(connection, column)
+                for column in self.columns)
+        upper = 'UPPER(%s::text)' % qn(self.columns[0])
+        if self.kind == PATTERN:
+            return '(%s text_pattern_ops)' % upper
+        if self.kind == TRIGRAM:
+            return 'USING gin (%s gin_trgm_ops)' % upper
+        return '(%s)' % upper
+
+    def get_create_sql(self, connection, concurrently=False):
+        qn = connection.ops.quote_name
+        return 'CREATE INDEX %s%s ON %s %s' % (
+            'CONCURRENTLY ' if concurrently else '',
+            qn(self.get_name(connection)), qn(self.table),
+            self.get_expression(connection))
+
+    def get_drop_sql(self, connection, concurrently=False):
+        qn = connection.ops.quote_name
+        sql = 'DROP INDEX %s%s' % ('CONCURRENTLY ' if concurrently else '',
+                                   qn(self.get_name(connection)))
+        if connection.vendor == 'mysql':
+            sql += ' ON %s' % qn(self.table)
+        return sql
+
+    def is_covered(self, connection, constraints):
+        """
+        Return a boolean indicating whether an index in `constraints` (as
+        returned by the database introspection's `get_constraints()`) already
+        does the job of this one
+        """
+        if self.get_name(connection) in constraints:
+            return True
+        if self.kind != BTREE:
+            return False
+        return any(
+            (c['index'] or c['unique'] or c['primary_key']) and
+            list(c['columns'][:len(self.columns)]) == self.columns
+            for c in constraints.values()
+        )
+
+
+class QueryReport(object):
+    """
+    The plan for the query made by a listing for one representative request
+    """
+
+    def __init__(self, description, query, plan=None, scans=(), sorts=False,
+                 error=None):
+        self.description = description
+        self.query = query
+        self.plan = plan
+        self.scans = set(scans)
+        self.sorts = sorts
+        self.error = error
+        # Reasons that indexes couldn't be suggested
+        self.notes = []
+
+    @property
+    def plan_known(self):
+        return self.plan is not None
+
+
+def read_postgresql_plan(plan):
+    lines = []
+    scans = set()
+    sorts = False
+    nodes = [(plan, 0)]
+    while nodes:
+        node, depth = nodes.pop()
+        node_type = node['Node Type']
+        line = node_type
+        if 'Relation Name' in node:
+            line += ' on %s' % node['Relation Name']
+        if node.get('Sort Key'):
+            line += ' (%s)' % ', '.join(node['Sort Key'])
+        lines.append('  ' * depth + line)
+        if node_type == 'Seq Scan':
+            scans.add(node['Relation Name'])
+        elif node_type in ('Sort', 'Incremental Sort'):
+            sorts = True
+        nodes.extend(
+            (child, depth + 1) for child in reversed(node.get('Plans', [])))
+    return lines, scans, sorts
+
+
+def read_sqlite_plan(details):
+    scans = set()
+    sorts = False
+    for detail in details:
+        words = detail.split()
+        # 'SCAN TABLE <table>' before SQLite 3.36, 'SCAN <table>' after
+        if words[0] == 'SCAN' and 'USING' not in words:
+            scans.add(words[2] if words[1] == 'TABLE' else words[1])
+        elif 'TEMP B-TREE' in detail and 'ORDER BY' in detail:
+            sorts = True
+    return list(details), scans, sorts
+
+
+def read_mysql_plan(rows):
+    lines = []
+    scans = set()
+    sorts = False
+    for row in rows:
+        extra = row.get('Extra') or ''
+        lines.append('%s: type=%s, key=%s, %s' % (
+            row.get('table'), row.get('type'), row.get('key'), extra))
+        if row.get('type') == 'ALL':
+            scans.add(row.get('table'))
+        if 'Using filesort' in extra:
+            sorts = True
+    return lines, scans, sorts
+
+
+def explain(queryset):
+    """
+    Run EXPLAIN for `queryset`, returning a tuple of the plan (as a list of
+    lines), the set of tables scanned sequentially, and a boolean indicating
+    whether rows are sorted. Returns `None` if plans can't be read for the
+    queryset's database.
+    """
+    connection = connections[queryset.db]
+    sql, params = queryset.query.get_compiler(queryset.db).as_sql()
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, six.string_types):
+                plan = json.loads(plan)
+            return read_postgresql_plan(plan[0]['Plan'])
+        if connection.vendor == 'sqlite':
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            return read_sqlite_plan([row[-1] for row in cursor.fetchall()])
+        if connection.vendor == 'mysql':
+            cursor.execute('EXPLAIN ' + sql, params)
+            names = [column[0] for column in cursor.description]
+            return read_mysql_plan(
+                [dict(zip(names, row)) for row in cursor.fetchall()])
+    return None
+
+
+def get_listing(model_admin, query=None):
+    """
+    Return an `IndexView` for `model_admin`, set up (but not dispatched) as
+    if for a GET request with the query string parameters in `query`
+    """
+    request = RequestFactory().get(model_admin.get_index_url(), query or {})
+    request.user = AnonymousUser()
+    request.session = {}
+    view = model_admin.index_view_class(model_admin=model_admin)
+    view.request = request
+    view.setup_listing(request)
+    return view
+
+
+def is_inherited(opts, field):
+    """
+    Return a boolean indicating whether `field` is stored in the table of a
+    parent model (with multi-table inheritance), rather than the model's own
+    """
+    return field.model._meta.concrete_model is not opts.concrete_model
+
+
+def note_inherited(notes, field):
+    if notes is None:
+        return
+    note = "%s is stored in %s, so can't be indexed with this table" % (
+        field.name, field.model._meta.db_table)
+    if note not in notes:
+        notes.append(note)
+
+
+def get_columns(opts, names, notes=None):
+    """
+    Return the columns in the model's own table for the ordering field names
+    in `names`, stopping at the first that isn't one (e.g. a field of a
+    related or parent model), or is the primary key. Where a field of a
+    parent model stops it, a note is added to `notes`.
+    """
+    columns = []
+    for name in names:
+        if not isinstance(name, six.string_types):
+            break
+        name = name.lstrip('-')
+        if name == 'pk' or LOOKUP_SEP in name:
+            break
+        try:
+            field = opts.get_field(name)
+        except FieldDoesNotExist:
+            break
+        if field.primary_key or field.is_relation or not field.concrete:
+            break
+        if is_inherited(opts, field):
+            note_inherited(notes, field)
+            break
+        columns.append(field.column)
+    return columns
+
+
+def get_filter_column(opts, spec, notes=None):
+    """
+    Return the column in the model's own table that `spec` (a list filter)
+    filters by, or `None`. Where it filters by a field of a parent model, a
+    note is added to `notes`.
+    """
+    field_path = getattr(spec, 'field_path', None)
+    if not isinstance(spec, FieldListFilter) or not field_path:
+        return None
+    if LOOKUP_SEP in field_path:
+        return None
+    try:
+        field = opts.get_field(field_path)
+    except FieldDoesNotExist:
+        return None
+    if not field.concrete or field.many_to_many:
+        return None
+    if is_inherited(opts, field):
+        note_inherited(notes, field)
+        return None
+    return field.column
+
+
+def get_search_kind(search_field):
+    if search_field.startswith('^'):
+        return PATTERN
+    if search_field.startswith('='):
+        return UPPER
+    if search_field.startswith('@'):
+        return None
+    return TRIGRAM
+
+
+def get_scenarios(model_admin):
+    """
+    Yield a tuple of (description, query, candidates) for each representative
+    request for `model_admin`'s listing, where `candidates` is a function
+    that takes the view for the request and a list to add notes to, and
+    returns a list of (suggestion, needed_for_scan, needed_for_sort) tuples
+    """
+    view = get_listing(model_admin)
+    opts = model_admin.model._meta
+
+    def ordering_candidates(view, notes):
+        columns = get_columns(opts, view.queryset.query.order_by, notes)
+        if not columns:
+            return []
+        return [(IndexSuggestion(model_admin.model, columns), False, True)]
+
+    yield 'default ordering', {}, ordering_candidates
+
+    for i, field_name in enumerate(view.list_display):
+        if view.get_ordering_field(field_name):
+            yield ('sorted by %s' % field_name, {ORDER_VAR: str(i)},
+                   ordering_candidates)
+
+    for spec in view.filter_specs:
+        for choice in spec.choices(view):
+            if choice['selected']:
+                continue
+            query = QueryDict(choice['query_string'].lstrip('?'))
+
+            def filter_candidates(view, notes, spec=spec):
+                column = get_filter_column(opts, spec, notes)
+                if column is None:
+                    return []
+                columns = [column] + [
+                    c for c in get_columns(
+                        opts, view.queryset.query.order_by, notes)
+                    if c != column]
+                return [(IndexSuggestion(model_admin.model, columns),
+                         True, True)]
+
+            yield ('filtered by %s' % force_text(spec.title),
+                   dict(query.items()), filter_candidates)
+            break
+
+    if view.search_fields:
+        def search_candidates(view, notes):
+            if connections[view.queryset.db].vendor != 'postgresql':
+                return []
+            candidates = []
+            for search_field in view.search_fields:
+                search_field = str(search_field)
+                kind = get_search_kind(search_field)
+                name = search_field.lstrip('^=@')
+                if kind is None or LOOKUP_SEP in name:
+                    continue
+                try:
+                    field = opts.get_field(name)
+                except FieldDoesNotExist:
+                    continue
+                if field.get_internal_type() not in TEXT_FIELD_TYPES:
+                    continue
+                if is_inherited(opts, field):
+                    note_inherited(notes, field)
+                    continue
+                candidates.append((
+                    IndexSuggestion(model_admin.model, [field.column], kind),
+                    True, False))
+            return candidates
+
+        yield ('searched for %r' % SAMPLE_SEARCH_TERM,
+               {SEARCH_VAR: SAMPLE_SEARCH_TERM}, search_candidates)
+
+
+def advise(model_admin, using=None):
+    """
+    Explain the queries for `model_admin`'s listing for each representative
+    request, returning a list of `QueryReport` objects, and a list of
+    `IndexSuggestion` objects for indexes that would help them and don't
+    exist yet
+    """
+    model = model_admin.model
+    table = model._meta.db_table
+    reports = []
+    suggestions = OrderedDict()
+    for description, query, candidates in get_scenarios(model_admin):
+        try:
+            view = get_listing(model_admin, query)
+        except IncorrectLookupParameters as e:
+            reports.append(QueryReport(description, query, error=e))
+            continue
+        queryset = view.queryset
+        if using:
+            queryset = queryset.using(using)
+        queryset = queryset[:view.items_per_page]
+        result = explain(queryset)
+        report = QueryReport(description, query)
+        if result is not None:
+            report.plan, report.scans, report.sorts = result
+        reports.append(report)
+
+        for suggestion, for_scan, for_sort in candidates(view, report.notes):
+            if report.plan_known and not (
+                (for_scan and table in report.scans) or
+                (for_sort and report.sorts)
+            ):
+                continue
+            suggestion = suggestions.setdefault(suggestion.key, suggestion)
+            suggestion.reasons.append(description)
+
+    if not suggestions:
+        return reports, []
+    connection = connections[using or model._default_manager.db]
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table)
+    return reports, [
+        suggestion for suggestion in suggestions.values()
+        if not suggestion.is_covered(connection, constraints)
+    ]
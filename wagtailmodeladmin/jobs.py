@@ -0,0 +1,211 @@
+"""
+Utilities for running expensive ModelAdmin operations outside of the
+request/response cycle. Jobs are stored as `ModelAdminJob` objects, so the
+database is the only 'queue' required. They are picked up and run by the
+`wagtailmodeladmin_worker` management command.
+
+A job 'action' is any importable callable with the following signature:
+
+    def my_action(job, model_admin, **params):
+        ...
+
+Actions can call `job.report_progress()` as they go, and may save a file to
+`job.result_file` (without saving the job) for users to download once the job
+has completed.
+
+A job that has been running for longer than the
+`WAGTAILMODELADMIN_JOB_TIMEOUT` setting (in seconds, 3600 by default) is
+assumed to have been left behind by a worker that stopped, and is claimed
+and run again by the next worker to poll the queue.
+"""
+import csv
+import logging
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.admin.utils import label_for_field, lookup_field
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import ObjectDoesNotExist
+from django.core.files import File
+from django.http import Http404
+from django.test.client import RequestFactory
+from django.utils import six, timezone
+from django.utils.http import urlencode
+from django.utils.encoding import force_text
+from django.utils.module_loading import import_string
+from django.utils.translation import ugettext as _
+
+from .models import ModelAdminJob
+
+logger = logging.getLogger('wagtailmodeladmin.jobs')
+
+# How many items an action should process between progress updates
+PROGRESS_INTERVAL = 250
+
+
+def enqueue_job(model_admin, action, user=None, label='', **params):
+    """
+    Add a new job to the queue for `model_admin`, and return it. `params`
+    must be JSON-serialisable, and are passed to the action as keyword
+    arguments when the job is run.
+    """
+    job = ModelAdminJob(
+        app_label=model_admin.opts.app_label,
+        model_name=model_admin.opts.model_name,
+        action=action,
+        label=force_text(label),
+        user=user,
+    )
+    job.set_params(params)
+    job.save()
+    return job
+
+
+def get_job_timeout():
+    return getattr(settings, 'WAGTAILMODELADMIN_JOB_TIMEOUT', 3600)
+
+
+def claim_job():
+    """
+    Mark the oldest queued job (or a job that has been running for longer
+    than the job timeout) as 'running' and return it, or return `None` if
+    there's nothing to do. The status change is made with a conditional
+    UPDATE, so two workers polling the same table can never claim the same
+    job (and no row-level locking support is needed from the database).
+    """
+    now = timezone.now()
+    stale_before = now - timedelta(seconds=get_job_timeout())
+    claimable = ModelAdminJob.objects.claimable(stale_before)
+    for pk in claimable.values_list('pk', flat=True)[:10]:
+        claimed = ModelAdminJob.objects.claimable(stale_before).filter(
+            pk=pk).update(status=ModelAdminJob.STATUS_RUNNING,
+                          started_at=now, progress=0)
+        if claimed:
+            return ModelAdminJob.objects.get(pk=pk)
+    return None
+
+
+def run_job(job_id):
+    """
+    Run the job with the supplied id, recording the outcome on the job
+    object. Returns `True` if the job completed successfully.
+    """
+    from .options import get_registered_modeladmin
+    job = ModelAdminJob.objects.get(pk=job_id)
+    try:
+        model_admin = get_registered_modeladmin(job.app_label,
+                                                job.model_name)
+        if model_admin is None:
+            raise LookupError(
+                "No ModelAdmin is registered for '%s.%s'" % (
+                    job.app_label, job.model_name))
+        action = import_string(job.action)
+        action(job, model_admin, **job.get_params())
+    except Exception:
+        # The traceback is logged rather than saved with the job, because
+        # the job's status page can be viewed by the user that queued it
+        logger.exception("wagtailmodeladmin job %s failed", job.pk)
+        ModelAdminJob.objects.filter(pk=job.pk).update(
+            status=ModelAdminJob.STATUS_FAILED,
+            message=force_text(_(
+                "Sorry, something went wrong while running this job. The "
+                "details have been logged.")),
+            finished_at=timezone.now())
+        return False
+    ModelAdminJob.objects.filter(pk=job.pk).update(
+        status=ModelAdminJob.STATUS_COMPLETE,
+        result_file=job.result_file.name or '',
+        finished_at=timezone.now())
+    return True
+
+
+def delete_object(job, model_admin, object_id):
+    """
+    Delete the object with the primary key `object_id` (along with anything
+    that cascades from it) using the `delete_instance()` method of
+    `model_admin`'s confirm delete view, as `ConfirmDeleteView` does when
+    the deletion is small enough to run within the request.
+    """
+    view = model_admin.confirm_delete_view_class(
+        model_admin=model_admin, object_id=object_id)
+    view.request = get_request_for_job(job, model_admin.get_index_url())
+    job.report_progress(0, 1)
+    try:
+        view.instance
+    except Http404:
+        job.report_progress(1, message=_("It had already been deleted."))
+        return
+    view.delete_instance()
+    job.report_progress(1)
+
+
+def get_request_for_job(job, path, query=None):
+    """
+    Return a GET request for `path` that can be used to run view code on
+    behalf of the user that queued `job`. `query` maps parameter names to
+    a value, or a list of values (as returned by `QueryDict.lists()`).
+    """
+    request = RequestFactory().get(
+        '%s?%s' % (path, urlencode(query or {}, doseq=True)))
+    request.user = job.user or AnonymousUser()
+    request.session = {}
+    return request
+
+
+def open_csv_file():
+    """
+    Return a temporary file for a `csv.writer` to write to. The `csv` module
+    only writes bytes on Python 2, so rows must be passed through
+    `encode_csv_row()`.
+    """
+    if six.PY2:
+        return tempfile.TemporaryFile(mode='w+b')
+    return tempfile.TemporaryFile(mode='w+', encoding='utf-8', newline='')
+
+
+def encode_csv_row(row):
+    if six.PY2:
+        return [value.encode('utf-8') for value in row]
+    return row
+
+
+def export_csv(job, model_admin, query=None):
+    """
+    Write the results of `model_admin`'s index view (using the filters,
+    search terms and ordering in `query`) to a CSV file, with a column for
+    each item in `list_display`.
+    """
+    request = get_request_for_job(job, model_admin.get_index_url(), query)
+    view = model_admin.index_view_class(model_admin=model_admin)
+    view.request = request
+    view.setup_listing(request)
+
+    model = model_admin.model
+    queryset = view.queryset
+    total = queryset.count()
+    job.report_progress(0, total)
+
+    with open_csv_file() as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(encode_csv_row([
+            force_text(label_for_field(field_name, model, model_admin))
+            for field_name in view.list_display
+        ]))
+        for i, obj in enumerate(queryset.iterator(), 1):
+            row = []
+            for field_name in view.list_display:
+                try:
+                    f, attr, value = lookup_field(field_name, obj,
+                                                  model_admin)
+                except ObjectDoesNotExist:
+                    value = None
+                row.append('' if value is None else force_text(value))
+            writer.writerow(encode_csv_row(row))
+            if i % PROGRESS_INTERVAL == 0:
+                job.report_progress(i)
+        job.report_progress(total)
+
+        csv_file.seek(0)
+        filename = '%s-%s.csv' % (model_admin.opts.model_name, job.pk)
+        job.result_file.save(filename, File(csv_file), save=False)
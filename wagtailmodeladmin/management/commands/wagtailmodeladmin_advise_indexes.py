@@ -0,0 +1,182 @@
+import os
+import sysconfig
+
+import django
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, router
+from django.db.migrations import Migration, RunSQL
+from django.db.migrations.autodetector import MigrationAutodetector
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.writer import MigrationWriter
+
+from wagtailmodeladmin.indexes import TRIGRAM, advise
+from wagtailmodeladmin.options import get_registered_modeladmins
+
+# Migrations can only be run outside of a transaction (as PostgreSQL needs
+# for CREATE INDEX CONCURRENTLY) from Django 1.10
+NON_ATOMIC_MIGRATIONS = django.VERSION >= (1, 10)
+
+
+def is_installed_package(app_config):
+    """
+    Return a boolean indicating whether the app is installed in
+    site-packages (e.g. Wagtail's apps), rather than part of the project
+    """
+    app_path = os.path.realpath(app_config.path)
+    paths = sysconfig.get_paths()
+    return any(
+        app_path.startswith(os.path.realpath(paths[key]) + os.sep)
+        for key in ('purelib', 'platlib'))
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs EXPLAIN for representative queries made by the index view of "
+        "every registered ModelAdmin (sorted by each sortable column, "
+        "filtered by each filter and searched), reports sequential scans "
+        "and sorts, and suggests indexes. Optionally writes a migration "
+        "for each app in the project, creating the suggested indexes.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'models', nargs='*', metavar='app_label.model_name',
+            help="Only check the ModelAdmins for these models")
+        parser.add_argument(
+            '--database',
+            help="Database to run EXPLAIN in (defaults to the database "
+                 "each model is read from)")
+        parser.add_argument(
+            '--write-migrations', action='store_true', default=False,
+            help="Write a migration for each app, creating the suggested "
+                 "indexes. Apps installed in site-packages are skipped, "
+                 "unless named with --app.")
+        parser.add_argument(
+            '--app', action='append', dest='apps', default=[],
+            metavar='app_label',
+            help="Only write migrations for this app (can be repeated)")
+        parser.add_argument(
+            '--plans', action='store_true', default=False,
+            help="Print the plan for each query")
+
+    def get_model_admins(self, labels):
+        model_admins = get_registered_modeladmins()
+        if not labels:
+            return model_admins
+        labels = set(label.lower() for label in labels)
+        selected = [
+            model_admin for model_admin in model_admins
+            if '%s.%s' % (model_admin.opts.app_label,
+                          model_admin.opts.model_name) in labels
+        ]
+        if not selected:
+            raise CommandError("No ModelAdmins are registered for %s" % (
+                ', '.join(sorted(labels)),))
+        return selected
+
+    def report(self, model_admin, reports, show_plans):
+        opts = model_admin.opts
+        self.stdout.write("%s.%s (%s)" % (
+            opts.app_label, opts.model_name, opts.db_table))
+        for report in reports:
+            if report.error is not None:
+                self.stdout.write("  %s: skipped (%s)" % (
+                    report.description, report.error))
+                continue
+            if not report.plan_known:
+                self.stdout.write("  %s: plan unavailable" % (
+                    report.description,))
+            else:
+                findings = [
+                    'sequential scan of %s' % table
+                    for table in sorted(report.scans)]
+                if report.sorts:
+                    findings.append('sort')
+                self.stdout.write("  %s: %s" % (
+                    report.description, ', '.join(findings) or 'OK'))
+            for note in report.notes:
+                self.stdout.write("    Note: %s" % note)
+            if show_plans and report.plan_known:
+                for line in report.plan:
+                    self.stdout.write("      %s" % line)
+
+    def should_write_migration(self, app_label, selected):
+        if selected:
+            return app_label in selected
+        if is_installed_package(apps.get_app_config(app_label)):
+            self.stderr.write(
+                "Not writing a migration for '%s', which is installed in "
+                "site-packages (use --app to choose it)" % app_label)
+            return False
+        return True
+
+    def write_migration(self, app_label, suggestions, connection, loader):
+        leaf_nodes = loader.graph.leaf_nodes(app_label)
+        if not leaf_nodes:
+            self.stderr.write(
+                "Can't write a migration for '%s', which has no "
+                "migrations" % app_label)
+            return
+        number = max(
+            MigrationAutodetector.parse_number(name) or 0
+            for app, name in leaf_nodes) + 1
+        migration = Migration(
+            '%04d_wagtailmodeladmin_indexes' % number, app_label)
+        migration.dependencies = leaf_nodes
+        # Build indexes without locking tables against writes, where possible
+        concurrently = (
+            connection.vendor == 'postgresql' and NON_ATOMIC_MIGRATIONS)
+        migration.operations = [
+            RunSQL(suggestion.get_create_sql(connection, concurrently),
+                   suggestion.get_drop_sql(connection, concurrently))
+            for suggestion in suggestions
+        ]
+        if any(suggestion.kind == TRIGRAM for suggestion in suggestions):
+            migration.operations.insert(0, RunSQL(
+                'CREATE EXTENSION IF NOT EXISTS pg_trgm', RunSQL.noop))
+        writer = MigrationWriter(migration)
+        contents = writer.as_string()
+        if concurrently:
+            # MigrationWriter doesn't write the `atomic` attribute
+            contents = contents.replace(
+                'class Migration(migrations.Migration):\n',
+                'class Migration(migrations.Migration):\n\n'
+                '    atomic = False\n', 1)
+        with open(writer.path, 'w') as migration_file:
+            migration_file.write(contents)
+        self.stdout.write("Wrote %s" % writer.path)
+
+    def handle(self, *args, **options):
+        # Suggestions keyed by app label, then by `IndexSuggestion.key` (so
+        # that models with more than one ModelAdmin get each index once)
+        suggestions_by_app = {}
+        for model_admin in self.get_model_admins(options['models']):
+            using = options['database'] or router.db_for_read(
+                model_admin.model)
+            connection = connections[using]
+            reports, suggestions = advise(model_admin, using)
+            self.report(model_admin, reports, options['plans'])
+            for suggestion in suggestions:
+                self.stdout.write("  Suggested index (for %s):" % (
+                    ', '.join(suggestion.reasons),))
+                self.stdout.write(
+                    "    %s;" % suggestion.get_create_sql(connection))
+                suggestions_by_app.setdefault(
+                    model_admin.opts.app_label, {}
+                ).setdefault(suggestion.key, suggestion)
+
+        count = sum(len(s) for s in suggestions_by_app.values())
+        self.stdout.write("Done. %s indexes suggested" % count)
+        if not options['write_migrations'] or not count:
+            return
+
+        # Migrations are run against the default database, unless another
+        # was chosen
+        connection = connections[options['database'] or DEFAULT_DB_ALIAS]
+        loader = MigrationLoader(None, ignore_no_migrations=True)
+        selected = set(options['apps'])
+        for app_label, suggestions in sorted(suggestions_by_app.items()):
+            if not self.should_write_migration(app_label, selected):
+                continue
+            self.write_migration(
+                app_label, list(suggestions.values()), connection, loader)
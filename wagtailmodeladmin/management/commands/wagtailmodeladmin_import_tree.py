@@ -0,0 +1,78 @@
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.test.client import RequestFactory
+
+from wagtailmodeladmin.options import get_registered_modeladmin
+from wagtailmodeladmin.recipes.treebeard.importer import (
+    IMPORT_BATCH_SIZE, TreeImporter, get_format_for_filename, get_text_file,
+    iter_nodes)
+from wagtailmodeladmin.recipes.treebeard.options import TreebeardModelAdmin
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports a tree of nodes from a JSON or CSV file into a model "
+        "registered using TreebeardModelAdmin. Nodes are validated using "
+        "the ModelAdmin's form, and inserted in batches using treebeard's "
+        "load_bulk().")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'model', help="The model to import into, as 'app_label.Model'")
+        parser.add_argument('file', help="The file to import")
+        parser.add_argument(
+            '--format', choices=('json', 'csv'), default=None,
+            help="The format of the file (by default, this is guessed from "
+                 "the file's extension)")
+        parser.add_argument(
+            '--parent', default=None,
+            help="The primary key of an existing node to import beneath "
+                 "(by default, nodes are imported as root nodes)")
+        parser.add_argument(
+            '--batch-size', type=int, default=IMPORT_BATCH_SIZE,
+            help="Number of nodes to insert per transaction")
+
+    def get_model_admin(self, model):
+        try:
+            app_label, model_name = model.split('.')
+        except ValueError:
+            raise CommandError("Models must be specified as 'app_label.Model'")
+        model_admin = get_registered_modeladmin(app_label, model_name.lower())
+        if not isinstance(model_admin, TreebeardModelAdmin):
+            raise CommandError(
+                "No TreebeardModelAdmin is registered for '%s'" % model)
+        return model_admin
+
+    def report_progress(self, count, elapsed):
+        rate = count / float(elapsed) if elapsed else 0
+        self.stdout.write("Imported %s nodes (%d per second)" % (count, rate))
+
+    def handle(self, *args, **options):
+        model_admin = self.get_model_admin(options['model'])
+        request = RequestFactory().get(model_admin.get_index_url())
+        request.user = AnonymousUser()
+
+        parent = None
+        if options['parent'] is not None:
+            manager = model_admin.model._default_manager
+            try:
+                parent = manager.get(pk=options['parent'])
+            except (manager.model.DoesNotExist, ValueError):
+                raise CommandError("Parent '%s' not found" % options['parent'])
+
+        file_format = (options['format'] or
+                       get_format_for_filename(options['file']))
+        importer = TreeImporter(
+            model_admin, request, parent=parent,
+            batch_size=max(1, options['batch_size']),
+            progress_callback=self.report_progress)
+        with open(options['file'], 'rb') as f:
+            try:
+                importer.run(iter_nodes(get_text_file(f), file_format))
+            except ValidationError as e:
+                raise CommandError("%s (%s nodes were imported)" % (
+                    e.messages[0], importer.count))
+
+        self.stdout.write("Done. %s nodes imported in %.1f seconds" % (
+            importer.count, importer.elapsed))
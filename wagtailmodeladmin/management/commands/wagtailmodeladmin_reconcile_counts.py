@@ -0,0 +1,61 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from wagtailmodeladmin.counters import (
+    get_counted_models, get_model_label, is_counted, reconcile)
+
+
+class Command(BaseCommand):
+    help = (
+        "Recounts the rows for the models in the "
+        "WAGTAILMODELADMIN_ROW_COUNTERS setting, and corrects their "
+        "counters. Should be run periodically, and after any changes that "
+        "don't send signals (e.g. bulk_create() or update()).")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'models', nargs='*', metavar='app_label.ModelName',
+            help="Only recount rows for these models")
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help="Database to recount rows in (defaults to 'default')")
+
+    def get_models(self, labels):
+        if not labels:
+            return get_counted_models()
+        models = []
+        for label in labels:
+            try:
+                model = apps.get_model(label)
+            except (LookupError, ValueError):
+                raise CommandError("Unknown model: %s" % label)
+            if not is_counted(model):
+                raise CommandError(
+                    "%s isn't in the WAGTAILMODELADMIN_ROW_COUNTERS "
+                    "setting" % label)
+            models.append(model)
+        return models
+
+    def handle(self, *args, **options):
+        models = self.get_models(options['models'])
+        if not models:
+            self.stdout.write("Nothing to do")
+            return
+
+        corrected = 0
+        for model in models:
+            previous, count = reconcile(model, using=options['database'])
+            if previous is None:
+                self.stdout.write("%s: %s rows (new counter)" % (
+                    get_model_label(model), count))
+            elif previous != count:
+                corrected += 1
+                self.stdout.write("%s: %s rows (was %s)" % (
+                    get_model_label(model), count, previous))
+            else:
+                self.stdout.write("%s: %s rows" % (
+                    get_model_label(model), count))
+
+        self.stdout.write("Done. %s of %s counters corrected" % (
+            corrected, len(models)))
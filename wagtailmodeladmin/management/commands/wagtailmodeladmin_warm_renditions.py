@@ -0,0 +1,136 @@
+import multiprocessing
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections, models
+from django.db.models.fields import FieldDoesNotExist
+
+from wagtail.wagtailimages.models import get_image_model
+
+from wagtailmodeladmin.helpers import get_image_filter
+from wagtailmodeladmin.options import (
+    ThumbmnailMixin, get_registered_modeladmins)
+from wagtailmodeladmin.renditions import generate_renditions
+
+
+# Keeps the number of parameters in each query within the limits of all
+# supported databases
+ID_QUERY_BATCH_SIZE = 500
+
+# The image fields that rendition cache keys can vary with
+FOCAL_POINT_FIELDS = (
+    'focal_point_x', 'focal_point_y', 'focal_point_width',
+    'focal_point_height')
+
+
+def _init_worker_process():
+    django.setup()
+    connections.close_all()
+
+
+def _generate_batch(args):
+    image_ids, spec = args
+    return len(image_ids), generate_renditions(image_ids, spec)
+
+
+class Command(BaseCommand):
+    help = (
+        "Creates the image renditions used by the index and inspect views "
+        "of every registered ModelAdmin, so that they don't have to be "
+        "created when those views are first requested. Work is spread "
+        "across a pool of processes.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=multiprocessing.cpu_count(),
+            help="Number of processes to use (defaults to the number of "
+                 "CPUs)")
+        parser.add_argument(
+            '--batch-size', type=int, default=50,
+            help="Number of images to send to a process at a time")
+
+    def get_image_fields(self, model_admin):
+        """
+        Return a list of (field, filter_spec) tuples for the image fields
+        displayed by `model_admin`'s index and inspect views.
+        """
+        image_model = get_image_model()
+        model = model_admin.model
+        image_fields = []
+        if isinstance(model_admin, ThumbmnailMixin):
+            image_fields.append((
+                model_admin.get_thumb_image_field(),
+                model_admin.thumb_image_filter_spec))
+        if model_admin.inspect_view_enabled:
+            for field_name in model_admin.get_inspect_view_fields():
+                try:
+                    field = model._meta.get_field(field_name)
+                except FieldDoesNotExist:
+                    continue
+                if (
+                    isinstance(field, models.ForeignKey) and
+                    field.related_model == image_model
+                ):
+                    image_fields.append((
+                        field, model_admin.inspect_view_image_filter_spec))
+        return image_fields
+
+    def get_tasks(self, batch_size):
+        image_model = get_image_model()
+        rendition_model = image_model._meta.get_field(
+            'renditions').related_model
+        image_ids_by_spec = {}
+        for model_admin in get_registered_modeladmins():
+            for field, spec in self.get_image_fields(model_admin):
+                image_ids = model_admin.model._default_manager.filter(
+                    **{'%s__isnull' % field.name: False}
+                ).values_list(field.attname, flat=True).distinct()
+                image_ids_by_spec.setdefault(spec, set()).update(image_ids)
+
+        tasks = []
+        for spec, image_ids in image_ids_by_spec.items():
+            fltr = get_image_filter(spec)
+            missing = []
+            image_ids = sorted(image_ids)
+            for i in range(0, len(image_ids), ID_QUERY_BATCH_SIZE):
+                batch = image_ids[i:i + ID_QUERY_BATCH_SIZE]
+                # Renditions are looked up using a key that varies with the
+                # image's focal point, so compare keys rather than image ids
+                existing = set(rendition_model._default_manager.filter(
+                    filter=fltr, image_id__in=batch,
+                ).values_list('image_id', 'focal_point_key'))
+                for image in image_model._default_manager.filter(
+                    pk__in=batch
+                ).only('pk', *FOCAL_POINT_FIELDS):
+                    key = (image.pk, fltr.get_cache_key(image))
+                    if key not in existing:
+                        missing.append(image.pk)
+            self.stdout.write("'%s': %s images, %s without renditions" % (
+                spec, len(image_ids), len(missing)))
+            for i in range(0, len(missing), batch_size):
+                tasks.append((missing[i:i + batch_size], spec))
+        return tasks
+
+    def handle(self, *args, **options):
+        tasks = self.get_tasks(max(1, options['batch_size']))
+        if not tasks:
+            self.stdout.write("Nothing to do")
+            return
+
+        # Connections must not be inherited by forked pool processes
+        connections.close_all()
+        pool = multiprocessing.Pool(max(1, options['processes']),
+                                    _init_worker_process)
+        processed = errors = 0
+        try:
+            for count, error_count in pool.imap_unordered(_generate_batch,
+                                                          tasks):
+                processed += count
+                errors += error_count
+                self.stdout.write("Processed %s images" % processed)
+        finally:
+            pool.close()
+            pool.join()
+
+        self.stdout.write("Done. %s renditions created, %s failed" % (
+            processed - errors, errors))
@@ -0,0 +1,77 @@
+import multiprocessing
+import time
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from wagtailmodeladmin.jobs import claim_job, run_job
+
+
+def _init_worker_process():
+    """
+    Make sure Django is ready in each pool process (necessary where
+    processes are spawned rather than forked), and that no database
+    connections are shared with the parent process.
+    """
+    django.setup()
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs queued wagtailmodeladmin jobs, using a pool of local "
+        "processes. The database is polled for new jobs, so no additional "
+        "message broker is needed.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=multiprocessing.cpu_count(),
+            help="Number of jobs to run concurrently (defaults to the "
+                 "number of CPUs)")
+        parser.add_argument(
+            '--sleep', type=float, default=2.0,
+            help="Seconds to wait between polls when the queue is empty")
+        parser.add_argument(
+            '--burst', action='store_true', default=False,
+            help="Exit once the queue is empty, instead of waiting for new "
+                 "jobs")
+
+    def handle(self, *args, **options):
+        processes = max(1, options['processes'])
+        # Connections must not be inherited by forked pool processes
+        connections.close_all()
+        pool = multiprocessing.Pool(processes, _init_worker_process)
+        running = {}
+        try:
+            while True:
+                for job_id, result in list(running.items()):
+                    if result.ready():
+                        del running[job_id]
+                        self.report_result(job_id, result)
+
+                job = None
+                if len(running) < processes:
+                    job = claim_job()
+                if job is not None:
+                    self.stdout.write("Starting job %s: %s" % (job.pk, job))
+                    running[job.pk] = pool.apply_async(run_job, (job.pk,))
+                    continue
+
+                if options['burst'] and not running:
+                    break
+                time.sleep(options['sleep'])
+        finally:
+            pool.close()
+            pool.join()
+
+    def report_result(self, job_id, result):
+        try:
+            success = result.get()
+        except Exception as e:
+            success = False
+            self.stderr.write("Job %s crashed: %s" % (job_id, e))
+        if success:
+            self.stdout.write("Job %s complete" % job_id)
+        else:
+            self.stderr.write("Job %s failed" % job_id)
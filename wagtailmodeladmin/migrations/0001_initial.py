@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModelAdminJob',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('app_label', models.CharField(max_length=100)),
+                ('model_name', models.CharField(max_length=100)),
+                ('action', models.CharField(help_text='Dotted path to the callable that performs the job', max_length=255)),
+                ('label', models.CharField(max_length=255, blank=True)),
+                ('params', models.TextField(default='{}', blank=True)),
+                ('status', models.CharField(default='queued', max_length=20, db_index=True, choices=[('queued', 'Queued'), ('running', 'Running'), ('complete', 'Complete'), ('failed', 'Failed')])),
+                ('progress', models.PositiveIntegerField(default=0)),
+                ('progress_total', models.PositiveIntegerField(null=True, blank=True)),
+                ('message', models.TextField(blank=True)),
+                ('result_file', models.FileField(upload_to='wagtailmodeladmin/jobs/', blank=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('started_at', models.DateTimeField(null=True, editable=False, blank=True)),
+                ('finished_at', models.DateTimeField(null=True, editable=False, blank=True)),
+                ('user', models.ForeignKey(related_name='+', on_delete=django.db.models.deletion.SET_NULL, blank=True, editable=False, to=settings.AUTH_USER_MODEL, null=True)),
+            ],
+            options={
+                'ordering': ('created_at', 'pk'),
+                'verbose_name': 'model admin job',
+                'verbose_name_plural': 'model admin jobs',
+            },
+        ),
+    ]
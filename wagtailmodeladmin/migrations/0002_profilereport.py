@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('wagtailmodeladmin', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfileReport',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('view_name', models.CharField(max_length=255)),
+                ('path', models.TextField()),
+                ('status_code', models.PositiveIntegerField(null=True)),
+                ('duration', models.FloatField(help_text='In seconds')),
+                ('query_count', models.PositiveIntegerField(default=0)),
+                ('peak_memory', models.PositiveIntegerField(help_text='In bytes', null=True, blank=True)),
+                ('functions', models.TextField(blank=True)),
+                ('allocations', models.TextField(blank=True)),
+                ('queries', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('user', models.ForeignKey(related_name='+', on_delete=django.db.models.deletion.SET_NULL, blank=True, editable=False, to=settings.AUTH_USER_MODEL, null=True)),
+            ],
+            options={
+                'ordering': ('-created_at', '-pk'),
+                'verbose_name': 'profile report',
+                'verbose_name_plural': 'profile reports',
+                'permissions': (('profile_views', 'Can profile views'),),
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wagtailmodeladmin', '0002_profilereport'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RowCount',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('app_label', models.CharField(max_length=100)),
+                ('model_name', models.CharField(max_length=100)),
+                ('count', models.BigIntegerField(default=0)),
+                ('reconciled_at', models.DateTimeField(null=True, blank=True, editable=False)),
+            ],
+            options={
+                'verbose_name': 'row count',
+                'verbose_name_plural': 'row counts',
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='rowcount',
+            unique_together=set([('app_label', 'model_name')]),
+        ),
+    ]
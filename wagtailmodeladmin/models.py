@@ -0,0 +1,172 @@
+import json
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+from django.utils.encoding import python_2_unicode_compatible
+from django.utils.translation import ugettext_lazy as _
+
+
+class ModelAdminJobQuerySet(models.QuerySet):
+
+    def queued(self):
+        return self.filter(status=ModelAdminJob.STATUS_QUEUED)
+
+    def running(self):
+        return self.filter(status=ModelAdminJob.STATUS_RUNNING)
+
+    def claimable(self, stale_before):
+        """
+        Jobs that are queued, or that started running before `stale_before`
+        (and so were probably left behind by a worker that stopped)
+        """
+        return self.filter(
+            models.Q(status=ModelAdminJob.STATUS_QUEUED) |
+            models.Q(status=ModelAdminJob.STATUS_RUNNING,
+                     started_at__lt=stale_before))
+
+    def for_model(self, model):
+        opts = model._meta
+        return self.filter(app_label=opts.app_label,
+                           model_name=opts.model_name)
+
+
+@python_2_unicode_compatible
+class ModelAdminJob(models.Model):
+    """
+    Records an expensive ModelAdmin operation (e.g. an export) that has been
+    queued to run outside of the request/response cycle. The database table
+    itself acts as the queue, which is consumed by the
+    `wagtailmodeladmin_worker` management command.
+    """
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETE = 'complete'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = (
+        (STATUS_QUEUED, _('Queued')),
+        (STATUS_RUNNING, _('Running')),
+        (STATUS_COMPLETE, _('Complete')),
+        (STATUS_FAILED, _('Failed')),
+    )
+
+    app_label = models.CharField(max_length=100)
+    model_name = models.CharField(max_length=100)
+    action = models.CharField(
+        max_length=255,
+        help_text=_("Dotted path to the callable that performs the job"))
+    label = models.CharField(max_length=255, blank=True)
+    params = models.TextField(blank=True, default='{}')
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, blank=True, editable=False,
+        on_delete=models.SET_NULL, related_name='+')
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED,
+        db_index=True)
+    progress = models.PositiveIntegerField(default=0)
+    progress_total = models.PositiveIntegerField(null=True, blank=True)
+    message = models.TextField(blank=True)
+    result_file = models.FileField(
+        upload_to='wagtailmodeladmin/jobs/', blank=True)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+    started_at = models.DateTimeField(null=True, blank=True, editable=False)
+    finished_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = ModelAdminJobQuerySet.as_manager()
+
+    class Meta:
+        ordering = ('created_at', 'pk')
+        verbose_name = _('model admin job')
+        verbose_name_plural = _('model admin jobs')
+
+    def __str__(self):
+        return self.label or self.action
+
+    def get_params(self):
+        return json.loads(self.params or '{}')
+
+    def set_params(self, params):
+        self.params = json.dumps(params)
+
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_COMPLETE, self.STATUS_FAILED)
+
+    @property
+    def progress_percent(self):
+        if not self.progress_total:
+            return 100 if self.status == self.STATUS_COMPLETE else 0
+        return min(100, int(self.progress * 100 / self.progress_total))
+
+    def report_progress(self, progress, total=None, message=None):
+        """
+        Record how far through the job the worker is. Uses a queryset
+        `update()` so that concurrent status checks never see a half-saved
+        object, and so that other fields are not overwritten.
+        """
+        values = {'progress': progress}
+        self.progress = progress
+        if total is not None:
+            values['progress_total'] = self.progress_total = total
+        if message is not None:
+            values['message'] = self.message = message
+        type(self)._default_manager.filter(pk=self.pk).update(**values)
+
+
+@python_2_unicode_compatible
+class ProfileReport(models.Model):
+    """
+    The results of running a single ModelAdmin view request under cProfile
+    and tracemalloc (see `wagtailmodeladmin.profiling`)
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, blank=True, editable=False,
+        on_delete=models.SET_NULL, related_name='+')
+    view_name = models.CharField(max_length=255)
+    path = models.TextField()
+    status_code = models.PositiveIntegerField(null=True)
+    duration = models.FloatField(help_text=_("In seconds"))
+    query_count = models.PositiveIntegerField(default=0)
+    peak_memory = models.PositiveIntegerField(
+        null=True, blank=True, help_text=_("In bytes"))
+    functions = models.TextField(blank=True)
+    allocations = models.TextField(blank=True)
+    queries = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        ordering = ('-created_at', '-pk')
+        verbose_name = _('profile report')
+        verbose_name_plural = _('profile reports')
+        permissions = (
+            ('profile_views', _('Can profile views')),
+        )
+
+    def __str__(self):
+        return '%s (%s)' % (self.view_name, self.path)
+
+    def duration_ms(self):
+        return '%.1f' % (self.duration * 1000)
+    duration_ms.short_description = _('Duration (ms)')
+
+
+@python_2_unicode_compatible
+class RowCount(models.Model):
+    """
+    The number of rows in a model's table, kept up to date as rows are
+    created and deleted, so that listings don't need to count them (see
+    `wagtailmodeladmin.counters`)
+    """
+    app_label = models.CharField(max_length=100)
+    model_name = models.CharField(max_length=100)
+    count = models.BigIntegerField(default=0)
+    reconciled_at = models.DateTimeField(
+        null=True, blank=True, editable=False)
+
+    class Meta:
+        unique_together = ('app_label', 'model_name')
+        verbose_name = _('row count')
+        verbose_name_plural = _('row counts')
+
+    def __str__(self):
+        return '%s.%s' % (self.app_label, self.model_name)
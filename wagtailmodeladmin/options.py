@@ -1,52 +1,153 @@
+import threading
 import warnings
+import weakref
 
 from django.contrib.auth.models import Permission
 from django.conf.urls import url
 from django.core.urlresolvers import reverse
 from django.core.exceptions import ImproperlyConfigured
-from django.db.models import Model
+from django.db.models.fields import FieldDoesNotExist
+from django.db.models import ForeignKey, Model, Prefetch
 from django.forms.widgets import flatatt
+from django.utils.functional import cached_property
+from django.utils.module_loading import import_string
 from django.utils.translation import ugettext_lazy as _
 from django.utils.safestring import mark_safe
 
 from wagtail.wagtailcore.models import Page
-from wagtail.wagtailimages.models import Filter
 from wagtail.wagtailcore import hooks
 
+from .budgets import enforce_query_budget
+from .dispatch import register_urls
+from .routers import has_recent_write, record_write, route_reads
 from .menus import ModelAdminMenuItem, GroupMenuItem, SubMenu
 from .helpers import (
     PermissionHelper, PagePermissionHelper, ButtonHelper, PageButtonHelper,
-    get_url_pattern, get_object_specific_url_pattern, get_url_name)
-from .views import (
-    IndexView, InspectView, CreateView, ChooseParentView, EditView,
-    ConfirmDeleteView, CopyRedirectView, UnpublishRedirectView)
+    get_url_pattern, get_object_specific_url_pattern, get_url_name,
+    get_image_filter, get_prefetched_rendition, has_prefetched_renditions,
+    get_field_display_type)
 
+# ModelAdmin instances registered with Wagtail, keyed by (app_label, model_name)
+_registered_modeladmins = {}
 
-class WagtailRegisterable(object):
+# `LazyRegistration` objects for classes registered using
+# `wagtailmodeladmin_register`, which may not have been instantiated yet
+_lazy_registrations = []
+
+
+def get_registered_modeladmins():
     """
-    Base class, providing a more convenient way for ModelAdmin or
-    ModelAdminGroup instances to be registered with Wagtail's admin area.
+    Return a list of all ModelAdmin instances registered with Wagtail
     """
-    add_to_settings_menu = False
+    hooks.get_hooks('register_admin_urls')
+    for registration in _lazy_registrations:
+        registration.get_instance()
+    return list(_registered_modeladmins.values())
+
+
+def get_registered_modeladmin(app_label, model_name):
+    """
+    Return the registered ModelAdmin instance for the specified model, or
+    `None` if no ModelAdmin is registered for it. Can be used outside of the
+    request/response cycle (e.g. from management commands), because fetching
+    Wagtail's hooks ensures every app's `wagtail_hooks` module is imported.
+    """
+    hooks.get_hooks('register_admin_urls')
+    key = (app_label, model_name)
+    if key not in _registered_modeladmins:
+        for registration in _lazy_registrations:
+            registration.get_instance()
+    return _registered_modeladmins.get(key)
+
+
+def register_hooks(get_instance, add_to_settings_menu=False):
+    """
+    Register the Wagtail hooks that add the permissions, URLs and menu item
+    for a ModelAdmin or ModelAdminGroup instance to Wagtail's admin area.
+    `get_instance` is called to fetch the instance each time a hook is
+    called, so that the instance can be created when first needed. URLs are
+    routed to the instance's views by `dispatch.ModelAdminURLDispatcher`.
+    """
+    @hooks.register('register_permissions')
+    def register_permissions():
+        return get_instance().get_permissions_for_registration()
+
+    @hooks.register('register_admin_urls')
+    def register_admin_urls():
+        return register_urls(get_instance().get_admin_urls_for_registration())
+
+    menu_hook = (
+        'register_settings_menu_item' if add_to_settings_menu else
+        'register_admin_menu_item'
+    )
+
+    @hooks.register(menu_hook)
+    def register_admin_menu_item():
+        return get_instance().get_menu_item()
+
+
+class LazyView(object):
+    """
+    A descriptor for the `*_view_class` attributes of ModelAdmin classes,
+    which imports the view class from a dotted path when it's first accessed.
+    This means `wagtailmodeladmin.views` (and the admin, image and document
+    modules it imports) isn't loaded until a view is actually needed.
+    Subclasses can still override the attributes with view classes.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.view_class = None
+
+    def __get__(self, instance, owner):
+        if self.view_class is None:
+            self.view_class = import_string(self.path)
+        return self.view_class
+
+
+class LazyRegistration(object):
+    """
+    Registers a ModelAdmin or ModelAdminGroup class with Wagtail without
+    instantiating it. The class is instantiated when one of its hooks is first
+    called, or when registered ModelAdmins are looked up (see
+    `get_registered_modeladmin`).
+    """
+
+    def __init__(self, wagtailmodeladmin_class):
+        self.wagtailmodeladmin_class = wagtailmodeladmin_class
+        self.instance = None
+        self.lock = threading.Lock()
+
+    def get_instance(self):
+        if self.instance is None:
+            with self.lock:
+                if self.instance is None:
+                    instance = self.wagtailmodeladmin_class()
+                    instance.register_modeladmin_instances()
+                    self.instance = instance
+        return self.instance
 
     def register_with_wagtail(self):
+        _lazy_registrations.append(self)
+        register_hooks(self.get_instance,
+                       self.wagtailmodeladmin_class.add_to_settings_menu)
 
-        @hooks.register('register_permissions')
-        def register_permissions():
-            return self.get_permissions_for_registration()
 
-        @hooks.register('register_admin_urls')
-        def register_admin_urls():
-            return self.get_admin_urls_for_registration()
+class WagtailRegisterable(object):
+    """
+    Base class, providing a more convenient way for ModelAdmin or
+    ModelAdminGroup instances to be registered with Wagtail's admin area.
+    """
+    add_to_settings_menu = False
 
-        menu_hook = (
-            'register_settings_menu_item' if self.add_to_settings_menu else
-            'register_admin_menu_item'
-        )
+    def register_modeladmin_instances(self):
+        for instance in self.get_modeladmin_instances():
+            key = (instance.opts.app_label, instance.opts.model_name)
+            _registered_modeladmins[key] = instance
 
-        @hooks.register(menu_hook)
-        def register_admin_menu_item():
-            return self.get_menu_item()
+    def register_with_wagtail(self):
+        self.register_modeladmin_instances()
+        register_hooks(lambda: self, self.add_to_settings_menu)
 
 
 class ThumbmnailMixin(object):
@@ -54,6 +155,11 @@ class ThumbmnailMixin(object):
     Mixin class to help display thumbnail images in ModelAdmin listing results.
     `thumb_image_field_name` must be overridden to name a ForeignKey field on
     your model, linking to `wagtailimages.Image`.
+
+    If `thumb_generate_renditions_async` is `True`, thumbnails that don't
+    exist yet are rendered as a placeholder (`thumb_placeholder`, or
+    `thumb_default`), and created in a pool of background threads, instead of
+    during the request.
     """
     thumb_image_field_name = 'image'
     thumb_image_filter_spec = 'fill-100x100'
@@ -61,6 +167,56 @@ class ThumbmnailMixin(object):
     thumb_classname = 'admin-thumb'
     thumb_col_header_text = _('image')
     thumb_default = None
+    thumb_placeholder = None
+    thumb_generate_renditions_async = False
+
+    def get_thumb_placeholder(self):
+        from .renditions import PLACEHOLDER_IMAGE_SRC
+        return (
+            self.thumb_placeholder or self.thumb_default or
+            PLACEHOLDER_IMAGE_SRC)
+
+    def get_thumb_image_field(self):
+        try:
+            return self.model._meta.get_field(self.thumb_image_field_name)
+        except FieldDoesNotExist:
+            raise ImproperlyConfigured(
+                u"The `thumb_image_field_name` attribute on your `%s` class "
+                "must name a field on your model." % self.__class__.__name__
+            )
+
+    def prefetch_for_index_view(self, request, object_list):
+        """
+        Fetch the images for all objects in `object_list` in a single query,
+        along with any existing renditions for `thumb_image_filter_spec`
+        (in one more), so that `admin_thumb` doesn't need to query the
+        database for every row.
+        """
+        super(ThumbmnailMixin, self).prefetch_for_index_view(
+            request, object_list)
+        field = self.get_thumb_image_field()
+        image_ids = set(
+            getattr(obj, field.attname) for obj in object_list
+            if getattr(obj, field.attname) is not None
+        )
+        if not image_ids:
+            return
+        from wagtail.wagtailimages.models import get_image_model
+        fltr = get_image_filter(self.thumb_image_filter_spec)
+        image_model = get_image_model()
+        rendition_model = image_model._meta.get_field(
+            'renditions').related_model
+        images = image_model._default_manager.filter(
+            pk__in=image_ids).prefetch_related(Prefetch(
+                'renditions',
+                queryset=rendition_model._default_manager.filter(
+                    filter=fltr)))
+        images_by_id = dict((image.pk, image) for image in images)
+        cache_name = field.get_cache_name()
+        for obj in object_list:
+            image_id = getattr(obj, field.attname)
+            if image_id in images_by_id:
+                setattr(obj, cache_name, images_by_id[image_id])
 
     def admin_thumb(self, obj):
         try:
@@ -77,9 +233,24 @@ class ThumbmnailMixin(object):
             'class': self.thumb_classname,
         }
         if image:
-            fltr, _ = Filter.objects.get_or_create(
-                spec=self.thumb_image_filter_spec)
-            img_attrs.update({'src': image.get_rendition(fltr).url})
+            fltr = get_image_filter(self.thumb_image_filter_spec)
+            rendition = get_prefetched_rendition(image, fltr)
+            if (
+                rendition is None and self.thumb_generate_renditions_async and
+                has_prefetched_renditions(image)
+            ):
+                # The rendition doesn't exist yet
+                from .renditions import queue_rendition
+                queue_rendition(image, self.thumb_image_filter_spec)
+                img_attrs.update({
+                    'src': self.get_thumb_placeholder(),
+                    'class': '%s %s-pending' % (self.thumb_classname,
+                                                self.thumb_classname),
+                })
+                return mark_safe('<img{}>'.format(flatatt(img_attrs)))
+            if rendition is None:
+                rendition = image.get_rendition(fltr)
+            img_attrs.update({'src': rendition.url})
             return mark_safe('<img{}>'.format(flatatt(img_attrs)))
         elif self.thumb_default:
             return mark_safe('<img{}>'.format(flatatt(img_attrs)))
@@ -105,6 +276,7 @@ class ModelAdmin(WagtailRegisterable):
     inspect_view_fields = None
     inspect_view_fields_exclude = []
     inspect_view_enabled = False
+    inspect_view_image_filter_spec = 'max-400x400'
     empty_value_display = '-'
     list_filter = ()
     list_select_related = False
@@ -112,20 +284,30 @@ class ModelAdmin(WagtailRegisterable):
     search_fields = None
     ordering = None
     parent = None
-    index_view_class = IndexView
-    create_view_class = CreateView
-    inspect_view_class = InspectView
-    edit_view_class = EditView
-    confirm_delete_view_class = ConfirmDeleteView
-    choose_parent_view_class = ChooseParentView
-    copy_view_class = CopyRedirectView
-    unpublish_view_class = UnpublishRedirectView
+    index_view_class = LazyView('wagtailmodeladmin.views.IndexView')
+    create_view_class = LazyView('wagtailmodeladmin.views.CreateView')
+    inspect_view_class = LazyView('wagtailmodeladmin.views.InspectView')
+    edit_view_class = LazyView('wagtailmodeladmin.views.EditView')
+    confirm_delete_view_class = LazyView(
+        'wagtailmodeladmin.views.ConfirmDeleteView')
+    choose_parent_view_class = LazyView(
+        'wagtailmodeladmin.views.ChooseParentView')
+    copy_view_class = LazyView('wagtailmodeladmin.views.CopyRedirectView')
+    unpublish_view_class = LazyView(
+        'wagtailmodeladmin.views.UnpublishRedirectView')
+    export_view_class = LazyView('wagtailmodeladmin.views.ExportView')
+    job_status_view_class = LazyView('wagtailmodeladmin.views.JobStatusView')
+    job_download_view_class = LazyView(
+        'wagtailmodeladmin.views.JobDownloadView')
+    jobs_enabled = False
+    delete_job_threshold = 1000
     index_template_name = ''
     create_template_name = ''
     edit_template_name = ''
     inspect_template_name = ''
     confirm_delete_template_name = ''
     choose_parent_template_name = ''
+    job_status_template_name = ''
     permission_helper_class = None
     button_helper_class = None
     index_view_extra_css = []
@@ -134,6 +316,19 @@ class ModelAdmin(WagtailRegisterable):
     inspect_view_extra_js = []
     form_view_extra_css = []
     form_view_extra_js = []
+    index_view_max_queries = None
+    create_view_max_queries = None
+    edit_view_max_queries = None
+    inspect_view_max_queries = None
+    confirm_delete_view_max_queries = None
+    choose_parent_view_max_queries = None
+    read_db_alias = None
+    read_your_writes_window = 10
+    index_view_count_timeout = None
+    index_view_search_timeout = None
+    index_view_page_timeout = None
+    use_row_counter = False
+    _inspect_view_field_plan = None
 
     def __init__(self, parent=None):
         """
@@ -146,8 +341,21 @@ class ModelAdmin(WagtailRegisterable):
         self.opts = self.model._meta
         self.is_pagemodel = issubclass(self.model, Page)
         self.parent = parent
+        self._views = {}
+        self._edit_handler = None
+        self._form_classes = weakref.WeakKeyDictionary()
+        self._form_lock = threading.Lock()
+
+    def get_modeladmin_instances(self):
+        return [self]
+
+    @cached_property
+    def permission_helper(self):
+        """
+        The permission helper for the model, created when first needed
+        """
         permission_helper_class = self.get_permission_helper_class()
-        self.permission_helper = permission_helper_class(self.model)
+        return permission_helper_class(self.model)
 
     def get_permission_helper_class(self):
         if self.permission_helper_class:
@@ -260,6 +468,57 @@ class ModelAdmin(WagtailRegisterable):
     def get_create_url(self):
         return reverse(get_url_name(self.opts, 'create'))
 
+    def get_export_url(self):
+        return reverse(get_url_name(self.opts, 'export'))
+
+    def get_job_url(self, job):
+        return reverse(get_url_name(self.opts, 'job'), args=(job.pk,))
+
+    def build_edit_handler(self):
+        """
+        Returns a new edit handler class for the model, bound to the model,
+        for use in `create_view` and `edit_view`
+        """
+        from wagtail.wagtailadmin.edit_handlers import (
+            ObjectList, extract_panel_definitions_from_model_class)
+        if hasattr(self.model, 'edit_handler'):
+            edit_handler = self.model.edit_handler
+        else:
+            panels = extract_panel_definitions_from_model_class(self.model)
+            edit_handler = ObjectList(panels)
+        return edit_handler.bind_to_model(self.model)
+
+    def get_edit_handler(self, request):
+        """
+        Returns the edit handler class to use for `create_view` and
+        `edit_view`. By default, the class returned by `build_edit_handler`
+        is built when first needed, and reused for all subsequent requests.
+        If the panels for your model should differ depending on the request
+        (e.g. the current user's permissions), override this method to return
+        a suitable edit handler class for `request`.
+        """
+        if self._edit_handler is None:
+            with self._form_lock:
+                if self._edit_handler is None:
+                    self._edit_handler = self.build_edit_handler()
+        return self._edit_handler
+
+    def get_form_class(self, request):
+        """
+        Returns the form class to use for `create_view` and `edit_view`. Form
+        classes are generated once for each edit handler class returned by
+        `get_edit_handler`, and reused for subsequent requests.
+        """
+        edit_handler = self.get_edit_handler(request)
+        form_class = self._form_classes.get(edit_handler)
+        if form_class is None:
+            with self._form_lock:
+                form_class = self._form_classes.get(edit_handler)
+                if form_class is None:
+                    form_class = edit_handler.get_form_class(self.model)
+                    self._form_classes[edit_handler] = form_class
+        return form_class
+
     def get_inspect_view_fields(self):
         if not self.inspect_view_fields:
             found_fields = []
@@ -273,6 +532,41 @@ class ModelAdmin(WagtailRegisterable):
             return found_fields
         return self.inspect_view_fields
 
+    def get_inspect_view_field_plan(self):
+        """
+        Return a list of dictionaries describing how to display each of the
+        fields named by `get_inspect_view_fields` in `inspect_view`. Each has
+        a `name`, a `field` (the model field, or `None`) and a `display_type`
+        (see `helpers.get_field_display_type`). The plan is compiled when
+        first needed, and reused for all subsequent requests.
+        """
+        if self._inspect_view_field_plan is None:
+            plan = []
+            for field_name in self.get_inspect_view_fields():
+                try:
+                    field = self.opts.get_field(field_name)
+                except FieldDoesNotExist:
+                    field = None
+                plan.append({
+                    'name': field_name,
+                    'field': field,
+                    'display_type': get_field_display_type(
+                        self.model, field_name, field),
+                })
+            self._inspect_view_field_plan = plan
+        return self._inspect_view_field_plan
+
+    def get_inspect_view_select_related(self):
+        """
+        Return a list of foreign key field names to pass to `select_related`
+        when fetching the object for `inspect_view`, so that related objects
+        can be displayed without further queries.
+        """
+        return [
+            item['name'] for item in self.get_inspect_view_field_plan()
+            if isinstance(item['field'], ForeignKey)
+        ]
+
     def get_extra_class_names_for_field_col(self, obj, field_name):
         """
         Return a list of additional CSS class names to be added to the table
@@ -293,6 +587,15 @@ class ModelAdmin(WagtailRegisterable):
         """
         return {}
 
+    def prefetch_for_index_view(self, request, object_list):
+        """
+        Called with the list of objects for the current page of results in
+        `index_view`, before they are rendered. Override this to fetch any
+        related data needed to render the results in bulk, and attach it to
+        the objects, to avoid making queries for each row.
+        """
+        pass
+
     def get_index_view_extra_css(self):
         css = ['wagtailmodeladmin/css/index.css']
         css.extend(self.index_view_extra_css)
@@ -313,16 +616,91 @@ class ModelAdmin(WagtailRegisterable):
     def get_inspect_view_extra_js(self):
         return self.inspect_view_extra_js
 
+    def get_query_budget_rows(self, action):
+        """
+        Returns the maximum number of rows displayed by the view for `action`,
+        by which the 'per row' part of its query budget is multiplied
+        """
+        if action == 'index':
+            return self.list_per_page
+        if action == 'choose_parent':
+            return self.choose_parent_view_class.parents_per_page
+        return 1
+
+    def get_max_queries(self, action):
+        """
+        Returns the maximum number of queries that the view for `action`
+        should make, according to its `<action>_view_max_queries` attribute,
+        or `None` if the view has no budget. See `wagtailmodeladmin.budgets`.
+        """
+        budget = getattr(self, '%s_view_max_queries' % action, None)
+        if budget is None:
+            return None
+        if isinstance(budget, (list, tuple)):
+            base, per_row = budget
+            return base + per_row * self.get_query_budget_rows(action)
+        return budget
+
+    def get_index_view_timeout(self, kind, searching=False):
+        """
+        Returns the time limit (in seconds) for the index view's `kind`
+        queries ('count' or 'page'), according to its
+        `index_view_<kind>_timeout` attribute (or `index_view_search_timeout`
+        if `searching`), or `None` if there's no limit. See
+        `wagtailmodeladmin.timeouts`.
+        """
+        if searching and self.index_view_search_timeout is not None:
+            return self.index_view_search_timeout
+        return getattr(self, 'index_view_%s_timeout' % kind, None)
+
+    def get_read_db_alias(self, request):
+        """
+        Returns the alias of the database that `index_view` and `inspect_view`
+        should read from, or `None` to leave it to the project's database
+        routers. By default, returns `read_db_alias`, unless the user has made
+        changes using any ModelAdmin view within the last
+        `read_your_writes_window` seconds (so that they always see their own
+        changes). See `wagtailmodeladmin.routers`.
+        """
+        if not self.read_db_alias:
+            return None
+        if has_recent_write(request, self.read_your_writes_window):
+            return None
+        return self.read_db_alias
+
+    def record_write(self, request):
+        """
+        Called after a view handles a request that makes changes, so that
+        the user's reads are sent to the default database for a while (by
+        the views of any ModelAdmin that uses `read_db_alias`)
+        """
+        record_write(request)
+
+    def get_view(self, action):
+        """
+        Returns a view function for `action`, built from the view class in
+        the `<action>_view_class` attribute when first needed, and reused for
+        all subsequent requests. For object-specific views, the object's id
+        should be passed to the function as an `object_id` keyword argument.
+        """
+        view = self._views.get(action)
+        if view is None:
+            view_class = getattr(self, '%s_view_class' % action)
+            view = view_class.as_view(model_admin=self)
+            self._views[action] = view
+        return view
+
+    @enforce_query_budget('index')
+    @route_reads
     def index_view(self, request):
         """
         Instantiates a class-based view to provide listing functionality for
         the assigned model. The view class used can be overridden by changing
         the 'index_view_class' attribute.
         """
-        kwargs = {'model_admin': self}
-        view_class = self.index_view_class
-        return view_class.as_view(**kwargs)(request)
+        return self.get_view('index')(request)
 
+    @enforce_query_budget('create')
     def create_view(self, request):
         """
         Instantiates a class-based view to provide 'creation' functionality for
@@ -330,15 +708,14 @@ class ModelAdmin(WagtailRegisterable):
         assigned model extends 'Page'. The view class used can be overridden by
         changing the 'create_view_class' attribute.
         """
-        kwargs = {'model_admin': self}
-        view_class = self.create_view_class
-        return view_class.as_view(**kwargs)(request)
+        return self.get_view('create')(request)
 
+    @enforce_query_budget('inspect')
+    @route_reads
     def inspect_view(self, request, object_id):
-        kwargs = {'model_admin': self, 'object_id': object_id}
-        view_class = self.inspect_view_class
-        return view_class.as_view(**kwargs)(request)
+        return self.get_view('inspect')(request, object_id=object_id)
 
+    @enforce_query_budget('choose_parent')
     def choose_parent_view(self, request):
         """
         Instantiates a class-based view to provide a view that allows a parent
@@ -347,10 +724,9 @@ class ModelAdmin(WagtailRegisterable):
         new instances. The view class used can be overridden by changing the
         'choose_parent_view_class' attribute.
         """
-        kwargs = {'model_admin': self}
-        view_class = self.choose_parent_view_class
-        return view_class.as_view(**kwargs)(request)
+        return self.get_view('choose_parent')(request)
 
+    @enforce_query_budget('edit')
     def edit_view(self, request, object_id):
         """
         Instantiates a class-based view to provide 'edit' functionality for the
@@ -358,10 +734,9 @@ class ModelAdmin(WagtailRegisterable):
         model extends 'Page'. The view class used can be overridden by changing
         the  'edit_view_class' attribute.
         """
-        kwargs = {'model_admin': self, 'object_id': object_id}
-        view_class = self.edit_view_class
-        return view_class.as_view(**kwargs)(request)
+        return self.get_view('edit')(request, object_id=object_id)
 
+    @enforce_query_budget('confirm_delete')
     def confirm_delete_view(self, request, object_id):
         """
         Instantiates a class-based view to provide 'delete confirmation'
@@ -370,9 +745,7 @@ class ModelAdmin(WagtailRegisterable):
         used can be overridden by changing the 'confirm_delete_view_class'
         attribute.
         """
-        kwargs = {'model_admin': self, 'object_id': object_id}
-        view_class = self.confirm_delete_view_class
-        return view_class.as_view(**kwargs)(request)
+        return self.get_view('confirm_delete')(request, object_id=object_id)
 
     def unpublish_view(self, request, object_id):
         """
@@ -383,9 +756,7 @@ class ModelAdmin(WagtailRegisterable):
         is completed. The view class used can be overridden by changing the
         'unpublish_view_class' attribute.
         """
-        kwargs = {'model_admin': self, 'object_id': object_id}
-        view_class = self.unpublish_view_class
-        return view_class.as_view(**kwargs)(request)
+        return self.get_view('unpublish')(request, object_id=object_id)
 
     def copy_view(self, request, object_id):
         """
@@ -396,9 +767,42 @@ class ModelAdmin(WagtailRegisterable):
         is completed. The view class used can be overridden by changing the
         'copy_view_class' attribute.
         """
-        kwargs = {'model_admin': self, 'object_id': object_id}
-        view_class = self.copy_view_class
-        return view_class.as_view(**kwargs)(request)
+        return self.get_view('copy')(request, object_id=object_id)
+
+    def export_view(self, request):
+        """
+        Instantiates a class-based view that queues an export of the listing
+        as a background job. The view class used can be overridden by
+        changing the 'export_view_class' attribute.
+        """
+        return self.get_view('export')(request)
+
+    def job_status_view(self, request, object_id):
+        """
+        Instantiates a class-based view that displays the progress of a
+        background job. The view class used can be overridden by changing the
+        'job_status_view_class' attribute.
+        """
+        return self.get_view('job_status')(request, object_id=object_id)
+
+    def job_download_view(self, request, object_id):
+        """
+        Instantiates a class-based view that serves the file created by a
+        completed background job. The view class used can be overridden by
+        changing the 'job_download_view_class' attribute.
+        """
+        return self.get_view('job_download')(request, object_id=object_id)
+
+    def enqueue_job(self, request, action, label='', **params):
+        """
+        Queue `action` (a dotted path to a callable accepting `job`,
+        `model_admin` and any supplied `params` as keyword arguments) to be
+        run for this ModelAdmin by the `wagtailmodeladmin_worker` management
+        command. Returns the new `ModelAdminJob` instance.
+        """
+        from .jobs import enqueue_job
+        return enqueue_job(self, action, user=request.user, label=label,
+                           **params)
 
     def get_templates(self, action='index'):
         """
@@ -470,6 +874,16 @@ class ModelAdmin(WagtailRegisterable):
         return self.confirm_delete_template_name or self.get_templates(
             'confirm_delete')
 
+    def get_job_status_template(self):
+        """
+        Returns a template to be used when rendering 'job_status_view'. If a
+        template is specified by the 'job_status_template_name' attribute,
+        that will be used. Otherwise, a list of preferred template names are
+        returned.
+        """
+        return self.job_status_template_name or self.get_templates(
+            'job_status')
+
     def get_menu_item(self, order=None):
         """
         Utilised by Wagtail's 'register_menu_item' hook to create a menu item
@@ -514,6 +928,16 @@ class ModelAdmin(WagtailRegisterable):
                     self.inspect_view,
                     name=get_url_name(self.opts, 'inspect')),
             )
+        if self.jobs_enabled:
+            urls = urls + (
+                url(get_url_pattern(self.opts, 'export'),
+                    self.export_view, name=get_url_name(self.opts, 'export')),
+                url(get_object_specific_url_pattern(self.opts, 'job'),
+                    self.job_status_view, name=get_url_name(self.opts, 'job')),
+                url(get_object_specific_url_pattern(self.opts, 'job_download'),
+                    self.job_download_view,
+                    name=get_url_name(self.opts, 'job_download')),
+            )
         if self.is_pagemodel:
             urls = urls + (
                 url(get_url_pattern(self.opts, 'choose_parent'),
@@ -557,6 +981,9 @@ class ModelAdminGroup(WagtailRegisterable):
         for ModelAdminClass in self.items:
             self.modeladmin_instances.append(ModelAdminClass(parent=self))
 
+    def get_modeladmin_instances(self):
+        return self.modeladmin_instances
+
     def get_menu_label(self):
         return self.menu_label or self.get_app_label_from_subitems()
 
@@ -654,7 +1081,8 @@ class AppModelAdmin(ModelAdminGroup):
 def wagtailmodeladmin_register(wagtailmodeladmin_class):
     """
     Alternative one-line method for registering ModelAdmin or ModelAdminGroup
-    classes with Wagtail.
+    classes with Wagtail. The class is instantiated lazily, when Wagtail first
+    needs its URLs, permissions or menu item.
     """
-    instance = wagtailmodeladmin_class()
-    instance.register_with_wagtail()
+    registration = LazyRegistration(wagtailmodeladmin_class)
+    registration.register_with_wagtail()
@@ -0,0 +1,149 @@
+"""
+On-demand profiling of individual ModelAdmin view requests. Disabled by
+default; set `WAGTAILMODELADMIN_PROFILING = True` to enable it. When enabled,
+and a superuser adds `?_profile=1` to the URL of any wagtailmodeladmin view,
+the request (including rendering of the response) is run under cProfile and
+tracemalloc, and the results are saved as a `ProfileReport`, which can be
+viewed from the 'Settings' menu in Wagtail's admin.
+
+tracemalloc is only available from Python 3.4. On earlier versions, reports
+don't include allocations.
+"""
+import cProfile
+import json
+import pstats
+import time
+
+from django.conf import settings
+from django.contrib.admin.utils import quote
+from django.core.urlresolvers import reverse
+from django.utils import six
+from django.utils.translation import ugettext as _
+
+from wagtail.wagtailadmin import messages
+
+from .budgets import QueryCounter
+from .helpers import get_url_name
+from .models import ProfileReport
+
+try:
+    import tracemalloc
+except ImportError:  # Python < 3.4
+    tracemalloc = None
+
+PROFILE_VAR = '_profile'
+
+
+def profiling_enabled():
+    return getattr(settings, 'WAGTAILMODELADMIN_PROFILING', False)
+
+
+def get_report_size():
+    """
+    Return the number of functions and allocation sites to include in
+    reports
+    """
+    return getattr(settings, 'WAGTAILMODELADMIN_PROFILE_REPORT_SIZE', 50)
+
+
+def can_profile_views(user):
+    """
+    Profile reports include the SQL (with parameters) of every query made,
+    so only superusers can create or view them
+    """
+    return user.is_active and user.is_superuser
+
+
+def can_profile(request):
+    return profiling_enabled() and can_profile_views(request.user)
+
+
+def get_function_stats(profile, limit):
+    stream = six.StringIO()
+    stats = pstats.Stats(profile, stream=stream)
+    stats.sort_stats('cumulative').print_stats(limit)
+    return stream.getvalue()
+
+
+def get_allocation_stats(snapshot, limit):
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+    ))
+    return '\n'.join(
+        str(stat) for stat in snapshot.statistics('lineno')[:limit])
+
+
+def run_profiled(view_func, request, *args, **kwargs):
+    """
+    Call `view_func` and render its response under cProfile and tracemalloc,
+    returning the response, along with a dictionary of field values for a
+    `ProfileReport`
+    """
+    started_tracing = tracemalloc is not None and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    profile = cProfile.Profile()
+    started = time.time()
+    try:
+        with QueryCounter() as counter:
+            profile.enable()
+            try:
+                response = view_func(request, *args, **kwargs)
+                if callable(getattr(response, 'render', None)):
+                    response = response.render()
+            finally:
+                profile.disable()
+        duration = time.time() - started
+        limit = get_report_size()
+        report = {
+            'duration': duration,
+            'status_code': response.status_code,
+            'functions': get_function_stats(profile, limit),
+            'query_count': counter.count,
+            'queries': json.dumps([
+                {'alias': q['alias'], 'sql': q['sql'], 'time': q['time']}
+                for q in counter.queries
+            ], indent=2),
+        }
+        if tracemalloc is not None:
+            report['peak_memory'] = tracemalloc.get_traced_memory()[1]
+            report['allocations'] = get_allocation_stats(
+                tracemalloc.take_snapshot(), limit)
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+    return response, report
+
+
+def profiled_view(view_func, model_admin, view_class):
+    """
+    Wrap `view_func` (as returned by `as_view()`) so that it can be profiled
+    on request
+    """
+    def view(request, *args, **kwargs):
+        if PROFILE_VAR not in request.GET:
+            return view_func(request, *args, **kwargs)
+
+        # Remove the parameter (even if the request won't be profiled), so
+        # that views don't mistake it for a filter
+        request.GET = request.GET.copy()
+        del request.GET[PROFILE_VAR]
+        if not can_profile(request):
+            return view_func(request, *args, **kwargs)
+
+        response, report = run_profiled(view_func, request, *args, **kwargs)
+        profile_report = ProfileReport.objects.create(
+            user=request.user, path=request.get_full_path(),
+            view_name='%s.%s' % (model_admin.__class__.__name__,
+                                 view_class.__name__),
+            **report)
+        url = reverse(get_url_name(ProfileReport._meta, 'inspect'),
+                      args=(quote(profile_report.pk),))
+        response['X-Profile-Report'] = url
+        messages.info(
+            request, _("Profile report saved (%(duration).1fms).") % {
+                'duration': profile_report.duration * 1000},
+            buttons=[messages.button(url, _('View report'))])
+        return response
+
+    return view
@@ -0,0 +1,2 @@
+default_app_config = (
+    'wagtailmodeladmin.recipes.treebeard.apps.TreebeardRecipeAppConfig')
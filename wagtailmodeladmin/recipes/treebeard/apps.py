@@ -0,0 +1,7 @@
+from django.apps import AppConfig
+
+
+class TreebeardRecipeAppConfig(AppConfig):
+    name = 'wagtailmodeladmin.recipes.treebeard'
+    # The default label ('treebeard') would clash with django-treebeard's
+    label = 'wagtailmodeladmin_treebeard'
@@ -1,3 +1,6 @@
+from django import forms
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
 from django.utils.translation import ugettext as _
 from treebeard.forms import MoveNodeForm
 
@@ -5,11 +8,20 @@ from treebeard.forms import MoveNodeForm
 class MoveForm(MoveNodeForm):
     @classmethod
     def mk_dropdown_tree(cls, model, for_node=None):
-        """ Creates a tree-like list of choices """
-
+        """
+        Creates a tree-like list of choices. Rather than querying for the
+        children of each node in turn, the whole tree is fetched in a single
+        query (ordered by path), and indentation is derived from each node's
+        `depth`.
+        """
         options = [(0, _('Root'))]
-        for node in model.get_root_nodes():
-            cls.add_subtree(for_node, node, options)
+        for node in model.get_tree():
+            if for_node is not None and node.path.startswith(for_node.path):
+                # A node cannot be moved beneath itself or its descendants
+                continue
+            options.append((
+                node.pk, mark_safe(cls.mk_indent(node.depth) + escape(node))
+            ))
         return options
 
 
@@ -17,3 +29,13 @@ class NoIndentationMoveForm(MoveForm):
     @staticmethod
     def mk_indent(level):
         return ''
+
+
+class ImportForm(forms.Form):
+    import_file = forms.FileField(
+        label=_('File'),
+        help_text=_(
+            "A JSON file in the format produced by treebeard's dump_bulk(), "
+            "or a CSV file with a 'depth' column (where 1 indicates a "
+            "top-level item) and a row for each item, with parents listed "
+            "before their children."))
@@ -0,0 +1,266 @@
+"""
+Utilities for importing large trees into models that extend treebeard's
+`MP_Node` model.
+
+Source files are parsed one top-level node (and its descendants) at a time,
+so only a small part of a file is held in memory at once. Nodes are
+validated using the ModelAdmin's form, and inserted with treebeard's
+`load_bulk`, in batches of roughly `batch_size` nodes per transaction. No
+node in a batch is inserted until every node in the batch is valid.
+
+Two formats are supported:
+
+JSON
+    A list of nodes, in the format produced by treebeard's `dump_bulk`:
+    `[{"data": {"name": "A"}, "children": [{"data": {...}}]}, ...]`. Nodes
+    without a "data" key are also accepted, in which case all keys other
+    than "children" are used as the node's data.
+
+CSV
+    A header row, followed by a row per node, in the order they appear in
+    the tree (parents before their children). A 'depth' column (where `1`
+    represents a top-level node) indicates where each node belongs.
+"""
+import csv
+import io
+import json
+import time
+
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import six
+from django.utils.translation import ugettext as _
+
+# Fields managed by treebeard, which should not be supplied by source files
+TREE_FIELDS = ('path', 'depth', 'numchild')
+
+# The number of nodes to insert per transaction. Nodes are always inserted
+# alongside their descendants, so a single large branch may exceed this.
+IMPORT_BATCH_SIZE = 1000
+
+JSON_READ_SIZE = 64 * 1024
+
+
+def get_format_for_filename(filename):
+    if filename.lower().endswith('.csv'):
+        return 'csv'
+    return 'json'
+
+
+def iter_json_nodes(fileobj):
+    """
+    Yield the top-level nodes from the JSON list in `fileobj` one at a time,
+    without reading the whole file into memory
+    """
+    decoder = json.JSONDecoder()
+    buf = ''
+    pos = 0
+    eof = False
+    started = False
+
+    while True:
+        # Skip whitespace and separators between items
+        while True:
+            while pos < len(buf) and buf[pos] in ' \t\r\n,':
+                pos += 1
+            if pos < len(buf) or eof:
+                break
+            chunk = fileobj.read(JSON_READ_SIZE)
+            buf, pos = chunk, 0
+            eof = not chunk
+        if pos >= len(buf):
+            raise ValidationError(_("The file ended unexpectedly."))
+        if not started:
+            if buf[pos] != '[':
+                raise ValidationError(_("The file must contain a JSON list."))
+            started = True
+            pos += 1
+            continue
+        if buf[pos] == ']':
+            return
+
+        try:
+            item, end = decoder.raw_decode(buf, pos)
+        except ValueError:
+            if eof:
+                raise ValidationError(_("The file is not valid JSON."))
+            # Read at least as much again as is currently buffered, so large
+            # items aren't parsed from the start many times over
+            chunk = fileobj.read(max(JSON_READ_SIZE, len(buf) - pos))
+            buf, pos = buf[pos:] + chunk, 0
+            eof = not chunk
+            continue
+        yield item
+        pos = end
+
+
+def iter_csv_nodes(fileobj):
+    """
+    Yield the top-level nodes from the CSV data in `fileobj`, in the same
+    format as `iter_json_nodes`, one at a time
+    """
+    reader = csv.DictReader(fileobj)
+    if not reader.fieldnames or 'depth' not in reader.fieldnames:
+        raise ValidationError(_("The file must include a 'depth' column."))
+    stack = []
+    for row in reader:
+        try:
+            depth = int(row.pop('depth'))
+        except (TypeError, ValueError):
+            depth = 0
+        if depth < 1 or depth > len(stack) + 1:
+            raise ValidationError(
+                _("Line %(line)s has an invalid depth.") %
+                {'line': reader.line_num})
+        node = {'data': row, 'children': []}
+        if depth == 1 and stack:
+            yield stack[0]
+        del stack[depth - 1:]
+        if stack:
+            stack[-1]['children'].append(node)
+        stack.append(node)
+    if stack:
+        yield stack[0]
+
+
+def get_text_file(fileobj):
+    """
+    Return a version of the binary file `fileobj` that the parsers can read
+    text from
+    """
+    fileobj = getattr(fileobj, 'file', fileobj)
+    if six.PY3:
+        return io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    return fileobj
+
+
+def iter_nodes(fileobj, file_format):
+    if file_format == 'csv':
+        return iter_csv_nodes(fileobj)
+    return iter_json_nodes(fileobj)
+
+
+class TreeImporter(object):
+    """
+    Validates and inserts the nodes yielded by `iter_json_nodes` or
+    `iter_csv_nodes`. `progress_callback`, if supplied, is called with the
+    number of nodes imported and the number of seconds taken so far after
+    each batch is inserted.
+    """
+
+    def __init__(self, model_admin, request, parent=None,
+                 batch_size=IMPORT_BATCH_SIZE, progress_callback=None):
+        self.model_admin = model_admin
+        self.model = model_admin.model
+        self.parent = parent
+        self.batch_size = batch_size
+        self.progress_callback = progress_callback
+        self.form_class = model_admin.get_form_class(request)
+        self.count = 0
+        self.elapsed = 0
+
+    def get_form(self, data):
+        form = self.form_class(data=data, instance=self.model())
+        for field_name in TREE_FIELDS:
+            form.fields.pop(field_name, None)
+        return form
+
+    def prepare_node(self, node, forms):
+        """
+        Validate `node` and its descendants, returning a structure for
+        `load_bulk` that provides each new node as an unsaved instance.
+        Valid forms are added to `forms`, so that many-to-many data can be
+        saved once the nodes have been inserted.
+        """
+        if not isinstance(node, dict):
+            raise ValidationError(_("Node %s is not valid.") % (
+                self.count + len(forms) + 1))
+        children = node.get('children') or []
+        if 'data' in node:
+            data = node['data']
+        else:
+            data = dict((k, v) for k, v in node.items() if k != 'children')
+        form = self.get_form(data)
+        if not form.is_valid():
+            errors = '; '.join(
+                '%s: %s' % (name, ' '.join(messages))
+                for name, messages in form.errors.items())
+            raise ValidationError(
+                _("Node %(number)s is not valid (%(errors)s)") % {
+                    'number': self.count + len(forms) + 1, 'errors': errors})
+        forms.append(form)
+        return {
+            'data': {'instance': form.save(commit=False)},
+            'children': [self.prepare_node(c, forms) for c in children],
+        }
+
+    def load_batch(self, batch, forms):
+        with transaction.atomic():
+            self.model.load_bulk(batch, parent=self.parent)
+            for form in forms:
+                form.save_m2m()
+        self.count += len(forms)
+
+    def report_progress(self, started_at):
+        self.elapsed = time.time() - started_at
+        if self.progress_callback is not None:
+            self.progress_callback(self.count, self.elapsed)
+
+    @property
+    def rate(self):
+        """
+        The number of nodes imported per second
+        """
+        if not self.elapsed:
+            return 0
+        return self.count / float(self.elapsed)
+
+    def run(self, nodes):
+        """
+        Import the top-level nodes in `nodes` (and their descendants).
+        Returns the number of nodes imported. If a node is invalid,
+        `ValidationError` is raised, and nodes in the same batch are not
+        imported (though any earlier batches will have been).
+        """
+        started_at = time.time()
+        batch = []
+        forms = []
+        for node in nodes:
+            batch.append(self.prepare_node(node, forms))
+            if len(forms) >= self.batch_size:
+                self.load_batch(batch, forms)
+                batch, forms = [], []
+                self.report_progress(started_at)
+        if batch:
+            self.load_batch(batch, forms)
+        self.report_progress(started_at)
+        return self.count
+
+
+def import_tree(job, model_admin, file_name, file_format, parent_id=None):
+    """
+    A job action (see `wagtailmodeladmin.jobs`) for importing the file
+    saved to `file_name` in the default storage. The file is deleted once
+    the job has finished.
+    """
+    from wagtailmodeladmin.jobs import get_request_for_job
+
+    request = get_request_for_job(job, model_admin.get_index_url())
+    parent = None
+    if parent_id is not None:
+        parent = model_admin.model._default_manager.get(pk=parent_id)
+
+    def report_progress(count, elapsed):
+        job.report_progress(count, message=_(
+            "%(count)s nodes imported (%(rate)d per second)") % {
+                'count': count,
+                'rate': count / float(elapsed) if elapsed else 0})
+
+    importer = TreeImporter(model_admin, request, parent=parent,
+                            progress_callback=report_progress)
+    try:
+        with default_storage.open(file_name, 'rb') as f:
+            importer.run(iter_nodes(get_text_file(f), file_format))
+    finally:
+        default_storage.delete(file_name)
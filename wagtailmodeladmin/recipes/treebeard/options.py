@@ -1,32 +1,90 @@
 from django.conf.urls import url
-from wagtailmodeladmin.options import ModelAdmin
+from django.contrib.admin.utils import quote
+from django.core.urlresolvers import reverse
+from treebeard.forms import movenodeform_factory
+from wagtailmodeladmin.budgets import enforce_query_budget
+from wagtailmodeladmin.options import LazyView, ModelAdmin
 from wagtailmodeladmin.helpers import (
-    get_object_specific_url_pattern, get_url_name)
+    get_object_specific_url_pattern, get_url_name, get_url_pattern)
+from .forms import MoveForm, NoIndentationMoveForm
 from .helpers import TreebeardPermissionHelper, TreebeardButtonHelper
-from .views import (
-    TreebeardCreateView, TreebeardMoveView, TreebeardConfirmDeleteView)
 
 
 class TreebeardModelAdmin(ModelAdmin):
     """
     A custom ModelAdmin class for working with tree-based models that
     extend Treebeard's `MP_Node` model.
+
+    Unless `index_view_tree_mode` is `False`, the index view only lists root
+    nodes initially, and their children are loaded when expanded. Unless
+    the model uses `node_order_by`, siblings can then be reordered by
+    dragging them (see `TreebeardReorderView`).
     """
-    create_view_class = TreebeardCreateView
-    confirm_delete_view_class = TreebeardConfirmDeleteView
+    index_view_class = LazyView(
+        'wagtailmodeladmin.recipes.treebeard.views.TreebeardIndexView')
+    children_view_class = LazyView(
+        'wagtailmodeladmin.recipes.treebeard.views.TreebeardChildrenView')
+    reorder_view_class = LazyView(
+        'wagtailmodeladmin.recipes.treebeard.views.TreebeardReorderView')
+    import_view_class = LazyView(
+        'wagtailmodeladmin.recipes.treebeard.views.TreebeardImportView')
+    move_view_class = LazyView(
+        'wagtailmodeladmin.recipes.treebeard.views.TreebeardMoveView')
+    index_view_tree_mode = True
+    move_view_max_queries = None
+    create_view_class = LazyView(
+        'wagtailmodeladmin.recipes.treebeard.views.TreebeardCreateView')
+    confirm_delete_view_class = LazyView(
+        'wagtailmodeladmin.recipes.treebeard.views.TreebeardConfirmDeleteView')
     permission_helper_class = TreebeardPermissionHelper
     button_helper_class = TreebeardButtonHelper
     move_form_select_indentation = True
+    _move_form_class = None
 
+    @enforce_query_budget('move')
     def move_view(self, request, object_id):
-        kwargs = {'model_admin': self, 'object_id': object_id}
-        return TreebeardMoveView.as_view(**kwargs)(request)
+        return self.get_view('move')(request, object_id=object_id)
+
+    def children_view(self, request, object_id):
+        return self.get_view('children')(request, object_id=object_id)
+
+    def reorder_view(self, request):
+        return self.get_view('reorder')(request)
+
+    def get_reorder_url(self):
+        return reverse(get_url_name(self.opts, 'reorder'))
+
+    def import_view(self, request):
+        return self.get_view('import')(request)
+
+    def get_import_url(self):
+        return reverse(get_url_name(self.opts, 'import'))
+
+    def get_move_form_class(self):
+        """
+        Returns the form class used by `move_view`. The class is generated
+        when first needed, and reused for all subsequent requests.
+        """
+        if self._move_form_class is None:
+            if self.move_form_select_indentation:
+                formclass = MoveForm
+            else:
+                formclass = NoIndentationMoveForm
+            self._move_form_class = movenodeform_factory(
+                self.model, form=formclass, fields=[])
+        return self._move_form_class
 
     def get_admin_urls_for_registration(self):
         urls = super(TreebeardModelAdmin, self).get_admin_urls_for_registration()
         urls = urls + (
             url(get_object_specific_url_pattern(self.opts, 'move'),
                 self.move_view, name=get_url_name(self.opts, 'move')),
+            url(get_object_specific_url_pattern(self.opts, 'children'),
+                self.children_view, name=get_url_name(self.opts, 'children')),
+            url(get_url_pattern(self.opts, 'reorder'),
+                self.reorder_view, name=get_url_name(self.opts, 'reorder')),
+            url(get_url_pattern(self.opts, 'import'),
+                self.import_view, name=get_url_name(self.opts, 'import')),
         )
         return urls
 
@@ -36,6 +94,24 @@ class TreebeardModelAdmin(ModelAdmin):
             classes.append('first-col depth-%s' % obj.depth)
         return classes
 
+    def get_extra_attrs_for_field_col(self, field_name, obj):
+        """
+        Identify each node's row by its path, and (for nodes with children)
+        provide a URL from which the children can be loaded. Where nodes can
+        be reordered, also provide the URL for posting new orders to.
+        """
+        attrs = {}
+        if field_name == self.list_display[0]:
+            attrs['data-node-id'] = quote(obj.pk)
+            attrs['data-node-path'] = obj.path
+            if not self.model.node_order_by:
+                attrs['data-reorder-url'] = self.get_reorder_url()
+            if obj.numchild:
+                attrs['data-children-url'] = reverse(
+                    get_url_name(self.opts, 'children'),
+                    args=(quote(obj.pk),))
+        return attrs
+
     def get_index_view_extra_css(self):
         css = super(TreebeardModelAdmin, self).get_index_view_extra_css()
         css.append('wagtailmodeladmin/recipes/treebeard/css/index.css')
@@ -0,0 +1,223 @@
+from django.core.exceptions import ValidationError
+from django.db import router, transaction
+from django.db.models import (
+    Case, CharField, IntegerField, Q, Value, When)
+from django.utils.translation import ugettext as _
+
+# Keeps the number of parameters in each query within the limits of all
+# supported databases
+UPDATE_BATCH_SIZE = 500
+
+# Prefix for the temporary paths that rows are given while paths are being
+# rewritten, so that swapping two paths never violates the 'unique'
+# constraint. It must not be a character used by the model's `alphabet`.
+TEMP_PATH_PREFIX = '~'
+
+
+class TreeReorder(object):
+    """
+    Applies a batch of changes to the order of sibling nodes in a treebeard
+    `MP_Node` tree, in a single transaction.
+
+    Each change is a `(parent_pk, child_pks)` tuple, where `parent_pk` is
+    `None` for root nodes, and `child_pks` lists the complete set of
+    children the parent should have, in their new order. Children can come
+    from other parts of the tree, in which case they are moved (along with
+    their descendants) to the new parent.
+
+    Rather than moving nodes one at a time (which rewrites the paths of
+    every following sibling for every move), the final path of every
+    affected row is worked out in memory, and rows are then updated in
+    batches.
+    """
+
+    def __init__(self, model, orders):
+        self.model = model
+        self.orders = orders
+        self.steplen = model.steplen
+        self.manager = model._default_manager
+        self.using = router.db_for_write(model)
+
+    def get_nodes(self, pks):
+        nodes = {}
+        pks = list(pks)
+        for i in range(0, len(pks), UPDATE_BATCH_SIZE):
+            nodes.update(
+                (node.pk, node) for node in
+                self.manager.using(self.using).select_for_update()
+                .filter(pk__in=pks[i:i + UPDATE_BATCH_SIZE])
+                .only('pk', 'path', 'depth', 'numchild')
+            )
+        missing = set(pks) - set(nodes)
+        if missing:
+            raise ValidationError(
+                _("Some of the selected items could not be found."))
+        return nodes
+
+    def get_parent_path(self, path):
+        return path[:-self.steplen]
+
+    def get_current_children_paths(self, parent_path, depth):
+        return set(self.manager.using(self.using).filter(
+            path__startswith=parent_path, depth=depth,
+        ).values_list('path', flat=True))
+
+    def validate(self, nodes):
+        """
+        Check that the requested orders describe a valid tree, returning a
+        dictionary of {child_path: (new_parent_path, position)} for every
+        child included
+        """
+        positions = {}
+        max_children = len(self.model.alphabet) ** self.steplen - 1
+        for parent_pk, child_pks in self.orders:
+            if parent_pk is None:
+                parent_path = ''
+            else:
+                parent_path = nodes[parent_pk].path
+            if len(child_pks) > max_children:
+                raise ValidationError(
+                    _("A node cannot have more than %s children.") %
+                    max_children)
+            for position, pk in enumerate(child_pks, 1):
+                path = nodes[pk].path
+                if path in positions:
+                    raise ValidationError(
+                        _("Each item can only be positioned once."))
+                positions[path] = (parent_path, position)
+            # No current children can be left without a position
+            current = self.get_current_children_paths(
+                parent_path, len(parent_path) // self.steplen + 1)
+            if not current.issubset(positions):
+                raise ValidationError(
+                    _("The new order must include every existing child."))
+
+        # Nodes cannot be moved beneath themselves. Reordering nodes without
+        # changing their parent can't affect ancestry, so only nodes that
+        # change parent need to be checked.
+        moved_paths = [
+            path for path, (parent_path, position) in positions.items()
+            if self.get_parent_path(path) != parent_path
+        ]
+        for parent_path, position in positions.values():
+            for path in moved_paths:
+                if parent_path.startswith(path):
+                    raise ValidationError(
+                        _("Items cannot be moved beneath themselves."))
+        return positions
+
+    def get_new_path(self, path, positions, cache):
+        """
+        Return the path that the row currently at `path` will have once the
+        new orders are applied
+        """
+        if path in cache:
+            return cache[path]
+        if path in positions:
+            parent_path, position = positions[path]
+            new_parent_path = self.get_new_path(parent_path, positions, cache)
+            depth = len(new_parent_path) // self.steplen + 1
+            new_path = self.model._get_path(new_parent_path, depth, position)
+        elif path:
+            parent_path = self.get_parent_path(path)
+            new_path = self.get_new_path(parent_path, positions, cache) + (
+                path[len(parent_path):])
+        else:
+            new_path = ''
+        cache[path] = new_path
+        return new_path
+
+    def get_affected_rows(self, positions):
+        """
+        Return a list of (pk, path) tuples for every node included in
+        `positions`, and all of their descendants
+        """
+        paths = sorted(positions)
+        rows = {}
+        for i in range(0, len(paths), UPDATE_BATCH_SIZE):
+            q = Q()
+            for path in paths[i:i + UPDATE_BATCH_SIZE]:
+                q |= Q(path__startswith=path)
+            rows.update(self.manager.using(self.using).filter(q).values_list(
+                'pk', 'path'))
+        return list(rows.items())
+
+    def bulk_update(self, values, **fields):
+        """
+        Set `fields` for the rows in `values` (a list of (pk, value_dict)
+        tuples), using a CASE expression per field, per batch of rows
+        """
+        for i in range(0, len(values), UPDATE_BATCH_SIZE):
+            batch = values[i:i + UPDATE_BATCH_SIZE]
+            updates = {}
+            for field_name, output_field in fields.items():
+                updates[field_name] = Case(
+                    *[When(pk=pk, then=Value(row[field_name]))
+                      for pk, row in batch],
+                    output_field=output_field)
+            self.manager.using(self.using).filter(
+                pk__in=[pk for pk, row in batch]).update(**updates)
+
+    def get_numchild_changes(self, positions, nodes):
+        """
+        Return a list of (pk, {'numchild': value}) tuples for every node
+        whose number of children changes
+        """
+        changes = []
+        parent_paths = set()
+        for parent_pk, child_pks in self.orders:
+            if parent_pk is not None:
+                parent = nodes[parent_pk]
+                parent_paths.add(parent.path)
+                if parent.numchild != len(child_pks):
+                    changes.append((parent_pk, {'numchild': len(child_pks)}))
+
+        # Parents that only lose children
+        moved_out = {}
+        for path in positions:
+            old_parent_path = self.get_parent_path(path)
+            if old_parent_path and old_parent_path not in parent_paths:
+                moved_out[old_parent_path] = (
+                    moved_out.get(old_parent_path, 0) + 1)
+        if moved_out:
+            for pk, path, numchild in self.manager.using(self.using).filter(
+                path__in=list(moved_out)
+            ).values_list('pk', 'path', 'numchild'):
+                changes.append((pk, {'numchild': numchild - moved_out[path]}))
+        return changes
+
+    def apply(self):
+        """
+        Apply the new orders, returning a dictionary of {pk: new_path} for
+        every node whose path changed
+        """
+        with transaction.atomic(using=self.using):
+            pks = set()
+            for parent_pk, child_pks in self.orders:
+                if parent_pk is not None:
+                    pks.add(parent_pk)
+                pks.update(child_pks)
+            nodes = self.get_nodes(pks)
+            positions = self.validate(nodes)
+
+            numchild_changes = self.get_numchild_changes(positions, nodes)
+            cache = {}
+            changes = []
+            for pk, path in self.get_affected_rows(positions):
+                new_path = self.get_new_path(path, positions, cache)
+                if new_path != path:
+                    changes.append((pk, {
+                        'path': new_path,
+                        'temp_path': '%s%s' % (TEMP_PATH_PREFIX, pk),
+                        'depth': len(new_path) // self.steplen,
+                    }))
+
+            # Move every row out of the way first, so that no two rows
+            # share a path at any point
+            self.bulk_update(
+                [(pk, {'path': row['temp_path']}) for pk, row in changes],
+                path=CharField())
+            self.bulk_update(changes, path=CharField(), depth=IntegerField())
+            self.bulk_update(numchild_changes, numchild=IntegerField())
+
+        return dict((pk, row['path']) for pk, row in changes)
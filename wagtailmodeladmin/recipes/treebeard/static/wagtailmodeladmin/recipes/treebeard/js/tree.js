@@ -0,0 +1,180 @@
+$(function() {
+    var $listing = $('#result_list table.listing');
+
+    function addToggles($cells) {
+        $cells.filter('[data-children-url]').each(function() {
+            $(this).prepend(
+                '<a href="#" class="tree-toggle icon icon-arrow-right" ' +
+                'aria-expanded="false"></a>');
+        });
+    }
+
+    function collapse($row, path) {
+        // Descendant rows follow their ancestor, and have a longer path
+        // that starts with the ancestor's path
+        $row.nextAll('tr').each(function() {
+            var rowPath = $(this).children('td[data-node-path]').attr('data-node-path') || '';
+            if (rowPath.length <= path.length || rowPath.indexOf(path) !== 0) {
+                return false;
+            }
+            $(this).remove();
+        });
+    }
+
+    addToggles($listing.find('td[data-node-path]'));
+
+    /* Drag and drop reordering */
+
+    // Root nodes can only be reordered when they're all on one page
+    var rootsPaginated = $('.pagination ul').length > 0;
+    var $dragged = null;
+
+    function getPath($row) {
+        return $row.children('td[data-node-path]').attr('data-node-path') || '';
+    }
+
+    function getParentPath(path, $row) {
+        var steplen = path.length / parseInt($row.children('td[data-node-path]').attr('class').match(/depth-(\d+)/)[1], 10);
+        return path.substr(0, path.length - steplen);
+    }
+
+    function getSubtreeRows($row) {
+        // The row itself, plus the rows of any expanded descendants
+        var path = getPath($row);
+        var $rows = $row;
+        $row.nextAll('tr').each(function() {
+            var rowPath = getPath($(this));
+            if (rowPath.length <= path.length || rowPath.indexOf(path) !== 0) {
+                return false;
+            }
+            $rows = $rows.add(this);
+        });
+        return $rows;
+    }
+
+    function getSiblingRows(parentPath, length) {
+        return $listing.find('tbody > tr').filter(function() {
+            var path = getPath($(this));
+            return path.length === length && path.indexOf(parentPath) === 0;
+        });
+    }
+
+    function updatePaths(paths) {
+        // Rewrite the paths of moved nodes and their visible descendants
+        var changes = [];
+        $listing.find('td[data-node-id]').each(function() {
+            var newPath = paths[$(this).attr('data-node-id')];
+            if (newPath !== undefined) {
+                changes.push([$(this).attr('data-node-path'), newPath]);
+            }
+        });
+        $listing.find('td[data-node-path]').each(function() {
+            var $cell = $(this);
+            var path = $cell.attr('data-node-path');
+            $.each(changes, function(i, change) {
+                if (path.indexOf(change[0]) === 0) {
+                    $cell.attr('data-node-path', change[1] + path.substr(change[0].length));
+                    return false;
+                }
+            });
+        });
+    }
+
+    function saveOrder($row) {
+        var $cell = $row.children('td[data-reorder-url]');
+        var path = getPath($row);
+        var parentPath = getParentPath(path, $row);
+        var parentId = null;
+        if (parentPath) {
+            parentId = $listing.find('td[data-node-path="' + parentPath + '"]').attr('data-node-id');
+        }
+        var children = getSiblingRows(parentPath, path.length).map(function() {
+            return $(this).children('td[data-node-id]').attr('data-node-id');
+        }).get();
+        $.ajax({
+            url: $cell.attr('data-reorder-url'),
+            type: 'POST',
+            contentType: 'application/json',
+            data: JSON.stringify({orders: [{parent: parentId, children: children}]}),
+            headers: {'X-CSRFToken': $('input[name="csrfmiddlewaretoken"]').val() || (document.cookie.match(/csrftoken=([^;]+)/) || [])[1]}
+        }).done(function(data) {
+            updatePaths(data.paths);
+        }).fail(function(xhr) {
+            var message = xhr.responseJSON && xhr.responseJSON.error;
+            window.alert(message || 'The new order could not be saved.');
+            window.location.reload();
+        });
+    }
+
+    function makeDraggable($rows) {
+        $rows.has('td[data-reorder-url]').each(function() {
+            if (!(rootsPaginated && $(this).children('td.depth-1').length)) {
+                $(this).attr('draggable', 'true');
+            }
+        });
+    }
+
+    makeDraggable($listing.find('tbody > tr'));
+    $listing.on('dragstart', 'tr[draggable]', function(e) {
+        $dragged = $(this);
+        e.originalEvent.dataTransfer.effectAllowed = 'move';
+        e.originalEvent.dataTransfer.setData('text/plain', getPath($dragged));
+    });
+    $listing.on('dragover', 'tr[draggable]', function(e) {
+        var $target = $(this);
+        if (!$dragged || $target.is($dragged)) {
+            return;
+        }
+        var path = getPath($dragged);
+        var targetPath = getPath($target);
+        // Nodes can only be dropped on their siblings
+        if (targetPath.length === path.length &&
+                getParentPath(targetPath, $target) === getParentPath(path, $dragged)) {
+            e.preventDefault();
+        }
+    });
+    $listing.on('drop', 'tr[draggable]', function(e) {
+        e.preventDefault();
+        var $target = $(this);
+        var $rows = getSubtreeRows($dragged);
+        if ($dragged.index() < $target.index()) {
+            getSubtreeRows($target).last().after($rows);
+        } else {
+            $target.before($rows);
+        }
+        saveOrder($dragged);
+        $dragged = null;
+    });
+    $listing.on('dragend', 'tr[draggable]', function() {
+        $dragged = null;
+    });
+
+    $listing.on('click', 'a.tree-toggle', function(e) {
+        e.preventDefault();
+        var $toggle = $(this);
+        var $cell = $toggle.closest('td');
+        var $row = $cell.closest('tr');
+        var path = $cell.attr('data-node-path');
+
+        if ($toggle.hasClass('expanded')) {
+            collapse($row, path);
+            $toggle.removeClass('expanded icon-arrow-down').addClass('icon-arrow-right');
+            $toggle.attr('aria-expanded', 'false');
+            return;
+        }
+        if ($toggle.hasClass('loading')) {
+            return;
+        }
+        $toggle.addClass('loading');
+        $.get($cell.attr('data-children-url'), function(html) {
+            var $rows = $($.parseHTML($.trim(html))).filter('tr');
+            addToggles($rows.children('td[data-node-path]'));
+            makeDraggable($rows);
+            $row.after($rows);
+            $toggle.addClass('expanded icon-arrow-down').removeClass('icon-arrow-right');
+            $toggle.attr('aria-expanded', 'true');
+        }).always(function() {
+            $toggle.removeClass('loading');
+        });
+    });
+});
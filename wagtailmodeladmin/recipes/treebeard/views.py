@@ -1,13 +1,108 @@
+import json
+
+from django import forms
+from django.contrib.admin.utils import unquote
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect
+from django.utils.functional import cached_property
 from django.utils.translation import ugettext as _
 from django.contrib.auth.decorators import login_required
 from django.utils.decorators import method_decorator
+from django.views.generic.edit import FormView
 from wagtail.wagtailadmin import messages
 from wagtailmodeladmin.views import (
-    CreateView, ObjectSpecificView, WMAFormView, ConfirmDeleteView,
-    permission_denied_response)
-from treebeard.forms import movenodeform_factory
-from .forms import MoveForm, NoIndentationMoveForm
+    CreateView, IndexView, ObjectSpecificView, WMABaseView, WMAFormView,
+    ConfirmDeleteView, permission_denied_response, PAGE_VAR)
+from .forms import ImportForm
+from .importer import (
+    TreeImporter, get_format_for_filename, get_text_file, iter_nodes)
+from .reorder import TreeReorder
+
+
+class TreebeardIndexView(IndexView):
+    """
+    A customised IndexView class that, unless the listing is being searched,
+    filtered or reordered, only lists root nodes. Nodes with children can
+    then be expanded to load their children (one level at a time) from
+    `TreebeardChildrenView`.
+    """
+
+    def is_tree_mode(self, request):
+        if not self.model_admin.index_view_tree_mode:
+            return False
+        return not (set(request.GET) - {PAGE_VAR})
+
+    def setup_listing(self, request):
+        self.tree_mode = self.is_tree_mode(request)
+        super(TreebeardIndexView, self).setup_listing(request)
+
+    def get_queryset(self, request):
+        qs = super(TreebeardIndexView, self).get_queryset(request)
+        if self.tree_mode:
+            qs = qs.filter(depth=1).order_by('path')
+        return qs
+
+    def is_unfiltered(self, request, queryset):
+        # Only root nodes are listed in tree mode
+        if self.tree_mode:
+            return False
+        return super(TreebeardIndexView, self).is_unfiltered(request,
+                                                             queryset)
+
+    @property
+    def media(self):
+        media = super(TreebeardIndexView, self).media
+        if self.tree_mode:
+            media = media + forms.Media(
+                js=['wagtailmodeladmin/recipes/treebeard/js/tree.js'])
+        return media
+
+
+class TreebeardChildrenView(TreebeardIndexView):
+    """
+    Renders listing rows for the children of a single node, for inserting
+    into the listing rendered by `TreebeardIndexView`
+    """
+
+    def __init__(self, model_admin, object_id):
+        super(TreebeardChildrenView, self).__init__(model_admin)
+        self.object_id = object_id
+
+    def is_tree_mode(self, request):
+        return True
+
+    @method_decorator(login_required)
+    def dispatch(self, request, *args, **kwargs):
+        # Check permissions before the parent node is fetched, so that users
+        # who can't view the listing can't find out which node ids exist
+        if not self.permission_helper.allow_list_view(request.user):
+            return permission_denied_response(request)
+        return super(TreebeardChildrenView, self).dispatch(
+            request, *args, **kwargs)
+
+    @cached_property
+    def parent(self):
+        qs = self.model._default_manager.get_queryset()
+        return get_object_or_404(qs, pk=unquote(self.object_id))
+
+    def get_queryset(self, request):
+        """
+        Fetch the parent's children with a single path-prefix query
+        """
+        parent = self.parent
+        qs = self.get_base_queryset(request).filter(
+            path__startswith=parent.path, depth=parent.depth + 1)
+        return self.apply_select_related(qs).order_by('path')
+
+    def get_context_data(self, request, *args, **kwargs):
+        object_list = list(self.queryset)
+        self.model_admin.prefetch_for_index_view(request, object_list)
+        return {'view': self, 'object_list': object_list}
+
+    def get_template_names(self):
+        return self.model_admin.get_templates('children')
 
 
 class TreebeardCreateView(CreateView):
@@ -95,11 +190,7 @@ class TreebeardMoveView(ObjectSpecificView, WMAFormView):
         return self.instance
 
     def get_form_class(self):
-        if self.model_admin.move_form_select_indentation:
-            formclass = MoveForm
-        else:
-            formclass = NoIndentationMoveForm
-        return movenodeform_factory(self.model, form=formclass, fields=[])
+        return self.model_admin.get_move_form_class()
 
     def get_form_kwargs(self):
         """
@@ -117,6 +208,145 @@ class TreebeardMoveView(ObjectSpecificView, WMAFormView):
         return self.model_admin.get_templates('move')
 
 
+class TreebeardReorderView(WMABaseView):
+    """
+    Accepts a batch of new sibling orders as JSON, in the format:
+
+        {"orders": [{"parent": <pk or null>, "children": [<pk>, ...]}, ...]}
+
+    and applies them all in a single transaction (see `TreeReorder`).
+    Responds with the new paths of the nodes that were affected.
+    """
+    http_method_names = ['post']
+
+    def check_action_permitted(self):
+        user = self.request.user
+        return self.permission_helper.has_edit_permission(user)
+
+    @method_decorator(login_required)
+    def dispatch(self, request, *args, **kwargs):
+        if not self.check_action_permitted():
+            return permission_denied_response(request)
+        return super(TreebeardReorderView, self).dispatch(request, *args,
+                                                          **kwargs)
+
+    def error_response(self, message):
+        return JsonResponse({'error': message}, status=400)
+
+    def get_orders(self, request):
+        """
+        Return a list of (parent_pk, child_pks) tuples from the request
+        body, raising `ValidationError` if it cannot be understood
+        """
+        to_python = self.opts.pk.to_python
+        try:
+            data = json.loads(request.body.decode('utf-8'))
+            orders = []
+            for item in data['orders']:
+                parent = item.get('parent')
+                if parent is not None:
+                    parent = to_python(parent)
+                orders.append(
+                    (parent, [to_python(pk) for pk in item['children']]))
+        except (ValueError, KeyError, TypeError, AttributeError):
+            raise ValidationError(_("The new order could not be read."))
+        return orders
+
+    def post(self, request, *args, **kwargs):
+        if self.model.node_order_by:
+            return self.error_response(_(
+                "%s are ordered automatically, so cannot be reordered.") %
+                self.model_name_plural)
+        try:
+            paths = TreeReorder(self.model, self.get_orders(request)).apply()
+        except ValidationError as e:
+            return self.error_response(e.messages[0])
+        return JsonResponse({
+            'paths': dict((str(pk), path) for pk, path in paths.items()),
+        })
+
+
+class TreebeardImportView(WMAFormView):
+    """
+    Imports a tree of nodes from an uploaded JSON or CSV file (see
+    `wagtailmodeladmin.recipes.treebeard.importer`). Where the ModelAdmin has
+    `jobs_enabled`, the import is run as a background job. Otherwise, it is
+    run straight away.
+    """
+    page_title = _('Import')
+    form_class = ImportForm
+    job_action = 'wagtailmodeladmin.recipes.treebeard.importer.import_tree'
+
+    def check_action_permitted(self):
+        user = self.request.user
+        return self.permission_helper.has_add_permission(user)
+
+    @method_decorator(login_required)
+    def dispatch(self, request, *args, **kwargs):
+        if not self.check_action_permitted():
+            return permission_denied_response(request)
+        return super(TreebeardImportView, self).dispatch(request, *args,
+                                                         **kwargs)
+
+    def get_meta_title(self):
+        return _('Import %s') % self.model_name_plural.lower()
+
+    def get_page_subtitle(self):
+        return self.model_name_plural
+
+    def get_form_class(self):
+        return self.form_class
+
+    def get_form_kwargs(self):
+        return FormView.get_form_kwargs(self)
+
+    def get_error_message(self):
+        return _("The file could not be imported.")
+
+    def get_job_label(self):
+        return _('Import of %s') % self.model_name_plural.lower()
+
+    def form_valid(self, form):
+        uploaded_file = form.cleaned_data['import_file']
+        file_format = get_format_for_filename(uploaded_file.name)
+
+        if self.model_admin.jobs_enabled:
+            file_name = default_storage.save(
+                'wagtailmodeladmin/imports/%s' % uploaded_file.name,
+                uploaded_file)
+            job = self.model_admin.enqueue_job(
+                self.request, self.job_action, label=self.get_job_label(),
+                file_name=file_name, file_format=file_format)
+            messages.success(self.request, _("Your import has been queued."))
+            return redirect(self.model_admin.get_job_url(job))
+
+        importer = TreeImporter(self.model_admin, self.request)
+        try:
+            importer.run(iter_nodes(get_text_file(uploaded_file),
+                                    file_format))
+        except ValidationError as e:
+            if importer.count:
+                messages.warning(self.request, _(
+                    "%(count)s %(model_name)s were imported before an error "
+                    "was found.") % {
+                        'count': importer.count,
+                        'model_name': self.opts.verbose_name_plural})
+            form.add_error('import_file', e)
+            return self.form_invalid(form)
+        messages.success(self.request, _(
+            "%(count)s %(model_name)s imported (%(rate)d per second).") % {
+                'count': importer.count,
+                'model_name': self.opts.verbose_name_plural,
+                'rate': importer.rate})
+        return redirect(self.get_index_url)
+
+    def get_context_data(self, **kwargs):
+        return {'view': self, 'form': kwargs.get('form') or self.get_form()}
+
+    def get_template_names(self):
+        return self.model_admin.get_templates('import')
+
+
 class TreebeardConfirmDeleteView(ConfirmDeleteView):
 
     def delete_instance(self):
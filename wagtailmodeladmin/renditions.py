@@ -0,0 +1,76 @@
+"""
+Utilities for generating image renditions away from the request/response
+cycle, so that listings can render straight away, using placeholders for
+any renditions that don't exist yet.
+"""
+import logging
+import threading
+from multiprocessing.pool import ThreadPool
+
+from django.conf import settings
+from django.db import connection
+
+from wagtail.wagtailimages.models import get_image_model
+
+from .helpers import get_image_filter
+
+logger = logging.getLogger('wagtailmodeladmin.renditions')
+
+# A transparent 1x1 GIF, used where no other placeholder image is specified
+PLACEHOLDER_IMAGE_SRC = (
+    'data:image/gif;base64,'
+    'R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7')
+
+_pool = None
+_pool_lock = threading.Lock()
+_pending = set()
+
+
+def generate_renditions(image_ids, spec):
+    """
+    Create renditions for `spec` for each of the images with the supplied
+    ids (where they don't exist already). Returns the number of images that
+    could not be processed.
+    """
+    fltr = get_image_filter(spec)
+    errors = 0
+    for image in get_image_model()._default_manager.filter(pk__in=image_ids):
+        try:
+            image.get_rendition(fltr)
+        except Exception:
+            logger.exception("Failed to create '%s' rendition for image %s",
+                             spec, image.pk)
+            errors += 1
+    return errors
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPool(getattr(
+                settings, 'WAGTAILMODELADMIN_RENDITION_WORKERS', 2))
+        return _pool
+
+
+def _generate_in_background(image_id, spec):
+    try:
+        generate_renditions([image_id], spec)
+    finally:
+        with _pool_lock:
+            _pending.discard((image_id, spec))
+        # Each thread has its own connection, which must not be left open
+        connection.close()
+
+
+def queue_rendition(image, spec):
+    """
+    Queue the creation of a rendition of `image` for `spec` in a pool of
+    background threads, unless one has already been queued
+    """
+    key = (image.pk, spec)
+    with _pool_lock:
+        if key in _pending:
+            return
+        _pending.add(key)
+    _get_pool().apply_async(_generate_in_background, key)
@@ -0,0 +1,144 @@
+"""
+Routing of the queries made by read-only ModelAdmin views (the index and
+inspect views) to a read replica. To use it, add the router to your settings
+(before any other routers), and set `read_db_alias` on your ModelAdmin:
+
+    DATABASE_ROUTERS = ['wagtailmodeladmin.routers.ModelAdminReadRouter']
+
+    class BookAdmin(ModelAdmin):
+        model = Book
+        read_db_alias = 'replica'
+
+While those views run (and their templates are rendered), the router sends
+every read to the replica, including counts, filter choices and related
+objects. Views that make changes are unaffected. Writes made inside those
+views, and writes of objects that were read from the replica (e.g. image
+renditions created while rendering thumbnails in a listing), go to the
+default database. Other writes are left to other routers.
+
+So that users always see their own changes, straight after a user creates,
+edits or deletes anything using a ModelAdmin view, their reads go to the
+default database for `read_your_writes_window` seconds.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, router
+
+LAST_WRITE_SESSION_KEY = 'wagtailmodeladmin_last_write'
+
+_state = threading.local()
+
+# Every alias that reads have been sent to, so that objects read from one
+# can be recognised (and written to the default database) later on
+_read_aliases = set()
+
+
+def get_read_db_alias():
+    """
+    Return the alias set by the `read_from` block currently running in this
+    thread, or `None`
+    """
+    return getattr(_state, 'alias', None)
+
+
+@contextmanager
+def read_from(alias):
+    """
+    Send all reads in this thread to the database `alias` (if
+    `ModelAdminReadRouter` is installed) until the block exits
+    """
+    previous = get_read_db_alias()
+    _state.alias = alias
+    _read_aliases.add(alias)
+    try:
+        yield
+    finally:
+        _state.alias = previous
+
+
+class ModelAdminReadRouter(object):
+    """
+    A database router that sends reads made inside `read_from` blocks to the
+    block's database, and writes made inside them (or of objects read from
+    a `read_from` database) to the default database. Everything else is left
+    to other routers.
+    """
+
+    def db_for_read(self, model, **hints):
+        return get_read_db_alias()
+
+    def db_for_write(self, model, **hints):
+        # Without this, Django would write objects back to the database
+        # they were read from (the `instance` hint), i.e. the replica
+        if get_read_db_alias() is not None:
+            return DEFAULT_DB_ALIAS
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db in _read_aliases:
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Objects read from the replica can be related to objects from the
+        # default database (e.g. a rendition created for a listed image)
+        alias = get_read_db_alias()
+        if alias is None:
+            return None
+        aliases = {DEFAULT_DB_ALIAS, alias}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+
+def router_installed():
+    return any(isinstance(r, ModelAdminReadRouter) for r in router.routers)
+
+
+def check_router_installed():
+    if not router_installed():
+        raise ImproperlyConfigured(
+            "ModelAdmin.read_db_alias is set, but "
+            "'wagtailmodeladmin.routers.ModelAdminReadRouter' isn't in your "
+            "DATABASE_ROUTERS setting.")
+
+
+def record_write(request):
+    """
+    Record that the user for `request` has just made changes, so that their
+    reads go to the default database for a while. Does nothing unless
+    `ModelAdminReadRouter` is installed.
+    """
+    if router_installed():
+        request.session[LAST_WRITE_SESSION_KEY] = time.time()
+
+
+def has_recent_write(request, window):
+    """
+    Return a boolean indicating whether the user for `request` made changes
+    within the last `window` seconds
+    """
+    last_write = request.session.get(LAST_WRITE_SESSION_KEY)
+    return last_write is not None and time.time() - last_write < window
+
+
+def route_reads(view_method):
+    """
+    A decorator for `ModelAdmin` view methods, that runs the view (and
+    renders its response) inside a `read_from` block for the alias returned
+    by `ModelAdmin.get_read_db_alias(request)`, if any
+    """
+    @wraps(view_method)
+    def wrapper(model_admin, request, *args, **kwargs):
+        alias = model_admin.get_read_db_alias(request)
+        if alias is None:
+            return view_method(model_admin, request, *args, **kwargs)
+        check_router_installed()
+        with read_from(alias):
+            response = view_method(model_admin, request, *args, **kwargs)
+            if callable(getattr(response, 'render', None)):
+                response = response.render()
+        return response
+    return wrapper
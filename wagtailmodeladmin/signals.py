@@ -0,0 +1,7 @@
+from django.dispatch import Signal
+
+# Sent after a wagtailmodeladmin view has been timed (when
+# WAGTAILMODELADMIN_TIMING is enabled), with `phases` as an ordered
+# dictionary of {phase_name: (duration_in_seconds, query_count)}. The sender
+# is the view class.
+view_timed = Signal(providing_args=['model_admin', 'request', 'phases'])
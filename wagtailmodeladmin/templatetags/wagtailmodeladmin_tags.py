@@ -4,7 +4,6 @@ import datetime
 import django
 from django.db import models
 from django.template import Library
-from django.template.loader import get_template
 from django.utils.safestring import mark_safe
 from django.utils.encoding import force_text
 from django.utils.html import format_html
@@ -18,6 +17,7 @@ from django.contrib.admin.utils import (
     display_for_field, display_for_value, lookup_field,
 )
 
+from ..helpers import get_cached_template
 from ..views import PAGE_VAR, SEARCH_VAR
 
 register = Library()
@@ -79,8 +79,11 @@ def items_for_result(view, result):
 
 
 def results(view, object_list):
+    timer = view.timer
     for item in object_list:
-        yield ResultList(None, items_for_result(view, item))
+        with timer.phase('rows'):
+            row = ResultList(None, items_for_result(view, item))
+        yield row
 
 
 @register.inclusion_tag("wagtailmodeladmin/includes/result_list.html",
@@ -103,6 +106,19 @@ def result_list(context):
     return context
 
 
+@register.inclusion_tag("wagtailmodeladmin/includes/result_rows.html",
+                        takes_context=True)
+def result_rows(context):
+    """
+    Displays table rows for the objects in `object_list`, without headers
+    (e.g. for adding rows to a listing that has already been rendered)
+    """
+    view = context['view']
+    object_list = context['object_list']
+    context.update({'results': list(results(view, object_list))})
+    return context
+
+
 @register.simple_tag
 def pagination_link_previous(current_page, view):
     if current_page.has_previous():
@@ -137,7 +153,7 @@ def admin_list_filter(view, spec):
     template_name = spec.template
     if template_name == 'admin/filter.html':
         template_name = 'wagtailmodeladmin/includes/filter.html'
-    tpl = get_template(template_name)
+    tpl = get_cached_template(template_name)
     return tpl.render({
         'title': spec.title,
         'choices': list(spec.choices(view)),
@@ -150,9 +166,11 @@ def admin_list_filter(view, spec):
 def result_row_display(context, index=0):
     obj = context['object_list'][index]
     view = context['view']
+    with view.timer.phase('buttons'):
+        buttons = view.button_helper.get_buttons_for_index_view(obj)
     context.update({
         'obj': obj,
-        'action_buttons': view.button_helper.get_buttons_for_index_view(obj),
+        'action_buttons': buttons,
     })
     return context
 
@@ -0,0 +1,145 @@
+"""
+Time limits for the expensive queries made by `IndexView`. Limits are set on
+a `ModelAdmin` class, in seconds:
+
+    class BookAdmin(ModelAdmin):
+        model = Book
+        search_fields = ('title', 'author__name', 'publisher__name')
+        index_view_count_timeout = 2
+        index_view_search_timeout = 5
+        index_view_page_timeout = 5
+
+`index_view_count_timeout` applies to the queries that count results,
+`index_view_page_timeout` to the query for the current page of results, and
+`index_view_search_timeout` replaces both of them when a search term is
+entered.
+
+On PostgreSQL, limits are enforced with `SET LOCAL statement_timeout`. On
+SQLite, a query that runs for too long is interrupted. On other databases,
+queries aren't limited.
+
+When a limit is reached, the listing is still displayed, but without exact
+counts (pages are found without counting, and only 'Previous' and 'Next'
+links are shown), without filters whose choices need another query of the
+whole table, and with a message suggesting narrowing the listing down.
+"""
+import time
+from contextlib import contextmanager
+
+from django.core.paginator import Page, Paginator
+from django.db import OperationalError, connections, transaction
+
+# Number of SQLite virtual machine instructions between checks of the time
+SQLITE_PROGRESS_STEPS = 1000
+
+# The PostgreSQL error code for 'query_canceled'
+POSTGRESQL_QUERY_CANCELED = '57014'
+
+
+class QueryTimeout(Exception):
+    pass
+
+
+def is_timeout_error(error, vendor):
+    """
+    Return a boolean indicating whether `error` (a database error raised in
+    a `statement_timeout` block) was caused by the time limit
+    """
+    if vendor == 'postgresql':
+        cause = getattr(error, '__cause__', None)
+        return getattr(cause, 'pgcode', None) == POSTGRESQL_QUERY_CANCELED
+    if vendor == 'sqlite':
+        return 'interrupted' in str(error)
+    return False
+
+
+@contextmanager
+def postgresql_timeout(connection, seconds):
+    with transaction.atomic(using=connection.alias):
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL statement_timeout = %s',
+                           [max(1, int(seconds * 1000))])
+        yield
+        # If already in a transaction, the setting would otherwise last
+        # until it ends
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL statement_timeout TO DEFAULT')
+
+
+@contextmanager
+def sqlite_timeout(connection, seconds):
+    connection.ensure_connection()
+    deadline = time.time() + seconds
+    connection.connection.set_progress_handler(
+        lambda: time.time() > deadline, SQLITE_PROGRESS_STEPS)
+    try:
+        yield
+    finally:
+        connection.connection.set_progress_handler(None, 0)
+
+
+@contextmanager
+def statement_timeout(seconds, using):
+    """
+    Limit each query made using the database `using` within the block to
+    `seconds`. Raises `QueryTimeout` if a query takes longer. If `seconds`
+    is `None`, queries aren't limited.
+    """
+    connection = connections[using]
+    if not seconds:
+        limit = None
+    elif connection.vendor == 'postgresql':
+        limit = postgresql_timeout(connection, seconds)
+    elif connection.vendor == 'sqlite':
+        limit = sqlite_timeout(connection, seconds)
+    else:
+        limit = None
+
+    if limit is None:
+        yield
+        return
+    try:
+        with limit:
+            yield
+    except OperationalError as e:
+        if is_timeout_error(e, connection.vendor):
+            raise QueryTimeout(str(e))
+        raise
+
+
+class UncountedPage(Page):
+    """
+    A page of results from an `UncountedPaginator`, which knows whether there
+    is a next page without knowing how many pages there are
+    """
+
+    def __init__(self, object_list, number, paginator, has_next):
+        super(UncountedPage, self).__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+    def next_page_number(self):
+        return self.number + 1
+
+    def previous_page_number(self):
+        return self.number - 1
+
+
+class UncountedPaginator(Paginator):
+    """
+    A paginator for when counting the results would take too long. One more
+    result than is displayed is fetched for each page, to tell whether there
+    is a next page. The number of results and pages is `None`.
+    """
+    count = None
+    num_pages = None
+
+    def page(self, number):
+        number = max(1, int(number))
+        bottom = (number - 1) * self.per_page
+        object_list = list(self.object_list[bottom:bottom + self.per_page + 1])
+        return UncountedPage(
+            object_list[:self.per_page], number, self,
+            has_next=len(object_list) > self.per_page)
@@ -0,0 +1,156 @@
+"""
+Records how long each phase of a wagtailmodeladmin view takes (and how many
+queries it makes), so that slow views can be diagnosed. Disabled by default;
+set `WAGTAILMODELADMIN_TIMING = True` to enable it.
+
+When enabled, the measurements for each request are:
+
+-   Added to the response in a `Server-Timing` header, so they can be viewed
+    in a browser's developer tools.
+-   Sent with the `wagtailmodeladmin.signals.view_timed` signal.
+-   Reported to a tracer, if `WAGTAILMODELADMIN_TRACER` is set to the dotted
+    path of an object with a `start_as_current_span(name)` method that
+    returns a context manager (such as an OpenTelemetry `Tracer`). A span is
+    started for the view, and for each phase within it.
+
+Phases can be nested (e.g. 'render' includes 'rows' and 'buttons'), and a
+phase entered more than once (e.g. 'rows', which is entered for every row)
+reports its total time and queries.
+
+When disabled, views use a `NullTimer`, whose phases do nothing.
+"""
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import connections
+from django.utils import six
+from django.utils.module_loading import import_string
+
+from .budgets import QueryCounter
+from .signals import view_timed
+
+TIMER_ATTR = '_wagtailmodeladmin_timer'
+
+
+class NullPhase(object):
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+class NullTimer(object):
+    enabled = False
+    _phase = NullPhase()
+
+    def phase(self, name, span_name=None):
+        return self._phase
+
+
+NULL_TIMER = NullTimer()
+
+
+def timing_enabled():
+    return getattr(settings, 'WAGTAILMODELADMIN_TIMING', False)
+
+
+def get_tracer():
+    tracer = getattr(settings, 'WAGTAILMODELADMIN_TRACER', None)
+    if isinstance(tracer, six.string_types):
+        tracer = import_string(tracer)
+    return tracer
+
+
+def get_query_count():
+    return sum(len(connection.queries_log) for connection in connections.all())
+
+
+class Phase(object):
+
+    def __init__(self, timer, name, span_name=None):
+        self.timer = timer
+        self.name = name
+        self.span_name = span_name or name
+        self.span = None
+
+    def __enter__(self):
+        if self.timer.tracer is not None:
+            self.span = self.timer.tracer.start_as_current_span(
+                self.span_name)
+            self.span.__enter__()
+        self.queries = get_query_count()
+        self.started = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        duration = time.time() - self.started
+        queries = get_query_count() - self.queries
+        self.timer.add(self.name, duration, queries)
+        if self.span is not None:
+            self.span.__exit__(exc_type, exc_value, traceback)
+        return False
+
+
+class Timer(object):
+    """
+    Collects (duration, query count) totals for the phases of a single
+    request
+    """
+    enabled = True
+
+    def __init__(self, name, tracer=None):
+        self.name = name
+        self.tracer = tracer
+        self.phases = OrderedDict()
+
+    def phase(self, name, span_name=None):
+        return Phase(self, name, span_name)
+
+    def add(self, name, duration, queries):
+        total_duration, total_queries = self.phases.get(name, (0, 0))
+        self.phases[name] = (total_duration + duration,
+                             total_queries + queries)
+
+    def get_server_timing_header(self):
+        return ', '.join(
+            '%s;dur=%.1f;desc="%s queries"' % (name, duration * 1000, queries)
+            for name, (duration, queries) in self.phases.items())
+
+
+def get_timer(request):
+    """
+    Return the `Timer` for `request`, or a `NullTimer` if timing is disabled
+    """
+    return getattr(request, TIMER_ATTR, NULL_TIMER)
+
+
+def timed_view(view_func, model_admin, view_class):
+    """
+    Wrap `view_func` (as returned by `as_view()`) so that its phases are
+    timed, if timing is enabled
+    """
+    def view(request, *args, **kwargs):
+        if not timing_enabled():
+            return view_func(request, *args, **kwargs)
+
+        name = '%s.%s' % (model_admin.__class__.__name__, view_class.__name__)
+        timer = Timer(name, tracer=get_tracer())
+        setattr(request, TIMER_ATTR, timer)
+        # Phases count the queries logged by each connection, which
+        # `QueryCounter` ensures are all kept while the view runs
+        with QueryCounter():
+            with timer.phase('total', span_name=name):
+                response = view_func(request, *args, **kwargs)
+                if callable(getattr(response, 'render', None)):
+                    with timer.phase('render'):
+                        response = response.render()
+        response['Server-Timing'] = timer.get_server_timing_header()
+        view_timed.send(
+            sender=view_class, model_admin=model_admin, request=request,
+            phases=timer.phases)
+        return response
+
+    return view
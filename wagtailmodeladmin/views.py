@@ -1,14 +1,17 @@
 import sys
 import operator
 from collections import OrderedDict
-from functools import reduce
+from functools import reduce, update_wrapper
 
-from django.db import models
+from django.apps import apps
+from django.core.cache import cache
+from django.db import models, router
 from django import forms
 from django.db.models.fields.related import ForeignObjectRel
 from django.db.models.constants import LOOKUP_SEP
 from django.db.models.sql.constants import QUERY_TERMS
-from django.shortcuts import get_object_or_404, redirect, render
+from django.http import FileResponse, Http404, HttpResponse
+from django.shortcuts import get_object_or_404, redirect
 from django.core.urlresolvers import reverse
 from django.template.defaultfilters import filesizeformat
 
@@ -17,7 +20,8 @@ from django.db.models.fields import FieldDoesNotExist
 
 from django.core.paginator import Paginator, InvalidPage
 
-from django.contrib.admin import FieldListFilter, widgets
+from django.contrib.admin import (
+    AllValuesFieldListFilter, FieldListFilter, widgets)
 from django.contrib.auth.decorators import login_required
 from django.utils.decorators import method_decorator
 
@@ -37,18 +41,22 @@ from django.views.generic import TemplateView
 from django.views.generic.edit import FormView
 
 from wagtail.wagtailadmin import messages
-from wagtail.wagtailadmin.edit_handlers import (
-    ObjectList, extract_panel_definitions_from_model_class)
-from wagtail.wagtailimages.models import get_image_model, Filter
-try:
-    from wagtail.wagtaildocs.models import get_document_model
-    Document = get_document_model
-except ImportError:
-    from wagtail.wagtaildocs.models import Document
 from wagtail.wagtailcore import __version__ as wagtail_version
-
-from .helpers import get_url_name
-from .forms import ParentChooserForm
+from wagtail.wagtailcore.models import Page
+
+from .helpers import (
+    get_url_name, get_image_filter, get_field_display_type,
+    get_document_file_size, get_cached_template)
+from .counters import CountedPaginator, check_counted, get_row_count
+from .deletion import CountingCollector
+from .forms import ParentChooserForm, ParentChooserFilterForm
+from .models import ModelAdminJob
+from .profiling import profiled_view
+from .timeouts import (
+    QueryTimeout, UncountedPage, UncountedPaginator, statement_timeout)
+from .timing import get_timer, timed_view
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
 
 # IndexView settings
 ORDER_VAR = 'o'
@@ -97,13 +105,74 @@ class WMABaseView(TemplateView):
         self.is_pagemodel = model_admin.is_pagemodel
         self.permission_helper = model_admin.permission_helper
 
+    @classmethod
+    def as_view(cls, **initkwargs):
+        """
+        Returns a view function for the class, as Django's `View.as_view()`
+        does, except that an `object_id` keyword argument passed to the view
+        function (e.g. captured from the URL) is passed to the view's
+        `__init__` method, rather than to `dispatch`. That way, a ModelAdmin
+        can build one view function for each view, and reuse it for every
+        request, whichever object the request is for.
+        """
+        model_admin = initkwargs['model_admin']
+        for key in initkwargs:
+            if not hasattr(cls, key):
+                raise TypeError(
+                    "%s() received an invalid keyword %r. as_view only "
+                    "accepts arguments that are already attributes of the "
+                    "class." % (cls.__name__, key))
+
+        def view(request, *args, **kwargs):
+            if 'object_id' in kwargs:
+                self = cls(object_id=kwargs.pop('object_id'), **initkwargs)
+            else:
+                self = cls(**initkwargs)
+            if hasattr(self, 'get') and not hasattr(self, 'head'):
+                self.head = self.get
+            self.request = request
+            self.args = args
+            self.kwargs = kwargs
+            return self.dispatch(request, *args, **kwargs)
+        view.view_class = cls
+        view.view_initkwargs = initkwargs
+        update_wrapper(view, cls, updated=())
+        update_wrapper(view, cls.dispatch, assigned=())
+
+        view = timed_view(view, model_admin, cls)
+        return profiled_view(view, model_admin, cls)
+
+    @property
+    def timer(self):
+        """
+        Used to time phases of the view (see `wagtailmodeladmin.timing`)
+        """
+        return get_timer(self.request)
+
+    def render_to_response(self, context, **response_kwargs):
+        """
+        As `TemplateResponseMixin.render_to_response`, but the template is
+        found from `get_template_names()` using `get_cached_template`
+        """
+        response_kwargs.setdefault('content_type', self.content_type)
+        return self.response_class(
+            request=self.request,
+            template=get_cached_template(self.get_template_names()),
+            context=context,
+            using=self.template_engine,
+            **response_kwargs
+        )
+
     @method_decorator(login_required)
     def dispatch(self, request, *args, **kwargs):
         button_helper_class = self.model_admin.get_button_helper_class()
         self.button_helper = button_helper_class(
             self.model, self.permission_helper, request.user,
             self.model_admin.inspect_view_enabled)
-        return super(WMABaseView, self).dispatch(request, *args, **kwargs)
+        response = super(WMABaseView, self).dispatch(request, *args, **kwargs)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            self.model_admin.record_write(request)
+        return response
 
     @cached_property
     def app_label(self):
@@ -165,15 +234,10 @@ class WMAFormView(WMABaseView, FormView):
         return getattr(self, 'instance', None) or self.model()
 
     def get_edit_handler(self):
-        if hasattr(self.model, 'edit_handler'):
-            edit_handler = self.model.edit_handler
-        else:
-            panels = extract_panel_definitions_from_model_class(self.model)
-            edit_handler = ObjectList(panels)
-        return edit_handler.bind_to_model(self.model)
+        return self.model_admin.get_edit_handler(self.request)
 
     def get_form_class(self):
-        return self.get_edit_handler().get_form_class(self.model)
+        return self.model_admin.get_form_class(self.request)
 
     def get_form_kwargs(self):
         kwargs = FormView.get_form_kwargs(self)
@@ -181,7 +245,10 @@ class WMAFormView(WMABaseView, FormView):
         return kwargs
 
     def get_context_data(self, **kwargs):
-        form = self.get_form()
+        form = kwargs.get('form')
+        if form is None:
+            with self.timer.phase('form'):
+                form = self.get_form()
         edit_handler_class = self.get_edit_handler()
         instance = self.get_instance()
         return {
@@ -217,23 +284,46 @@ class WMAFormView(WMABaseView, FormView):
 
     def form_invalid(self, form):
         messages.error(self.request, self.get_error_message())
-        return self.render_to_response(self.get_context_data())
+        return self.render_to_response(self.get_context_data(form=form))
 
 
 class ObjectSpecificView(WMABaseView):
 
     object_id = None
-    instance = None
+    instance_select_related = ()
+    instance_only = ()
 
     def __init__(self, model_admin, object_id):
         super(ObjectSpecificView, self).__init__(model_admin)
         self.object_id = object_id
         self.pk_safe = quote(object_id)
+
+    @cached_property
+    def instance(self):
+        """
+        The object this view is for. It's fetched when first accessed (rather
+        than when the view is initialised), so that no query is made for
+        requests that fail login or permission checks, or for views that
+        don't need it.
+        """
         filter_kwargs = {}
         filter_kwargs[self.pk_attname] = self.pk_safe
-        object_qs = model_admin.model._default_manager.get_queryset().filter(
-            **filter_kwargs)
-        self.instance = get_object_or_404(object_qs)
+        object_qs = self.get_instance_queryset().filter(**filter_kwargs)
+        with self.timer.phase('instance'):
+            return get_object_or_404(object_qs)
+
+    def get_instance_queryset(self):
+        """
+        Return the queryset from which this view's instance is fetched. The
+        `instance_select_related` and `instance_only` attributes can be used
+        to control which related objects and fields are loaded.
+        """
+        qs = self.model._default_manager.get_queryset()
+        if self.instance_select_related:
+            qs = qs.select_related(*self.instance_select_related)
+        if self.instance_only:
+            qs = qs.only(*self.instance_only)
+        return qs
 
     def check_action_permitted(self):
         return True
@@ -256,12 +346,25 @@ class IndexView(WMABaseView):
 
     @method_decorator(login_required)
     def dispatch(self, request, *args, **kwargs):
+        self.setup_listing(self.request)
+
+        if not self.permission_helper.allow_list_view(request.user):
+            return permission_denied_response(request)
+
+        return super(IndexView, self).dispatch(request, *args, **kwargs)
+
+    def setup_listing(self, request):
+        """
+        Use the supplied request to set the attributes needed to build the
+        filtered, searched and ordered queryset for the listing. Kept
+        separate from `dispatch()` so that the same queryset can be built
+        outside of the request/response cycle (e.g. when exporting).
+        """
         self.list_display = self.model_admin.get_list_display(request)
         self.list_filter = self.model_admin.get_list_filter(request)
         self.search_fields = self.model_admin.get_search_fields(request)
         self.items_per_page = self.model_admin.list_per_page
         self.select_related = self.model_admin.list_select_related
-        request = self.request
 
         # Get search parameters from the query string.
         try:
@@ -278,10 +381,8 @@ class IndexView(WMABaseView):
         self.query = request.GET.get(SEARCH_VAR, '')
         self.queryset = self.get_queryset(request)
 
-        if not self.permission_helper.allow_list_view(request.user):
-            return permission_denied_response(request)
-
-        return super(IndexView, self).dispatch(request, *args, **kwargs)
+    def get_export_url(self):
+        return self.model_admin.get_export_url()
 
     @property
     def media(self):
@@ -588,8 +689,9 @@ class IndexView(WMABaseView):
 
     def get_queryset(self, request):
         # First, we collect all the declared list filters.
-        (self.filter_specs, self.has_filters, remaining_lookup_params,
-         filters_use_distinct) = self.get_filters(request)
+        with self.timer.phase('filters'):
+            (self.filter_specs, self.has_filters, remaining_lookup_params,
+             filters_use_distinct) = self.get_filters(request)
 
         # Then, we let every list filter modify the queryset to its liking.
         qs = self.get_base_queryset(request)
@@ -657,21 +759,59 @@ class IndexView(WMABaseView):
 
     def get_context_data(self, request, *args, **kwargs):
         user = request.user
-        all_count = self.get_base_queryset(request).count()
+        timer = self.timer
         queryset = self.get_queryset(request)
-        result_count = queryset.count()
+        using = queryset.db
+        get_timeout = self.model_admin.get_index_view_timeout
+        searching = bool(self.query)
+        degraded = False
+
+        all_count = result_count = None
+        with timer.phase('counts'):
+            try:
+                with statement_timeout(get_timeout('count'), using):
+                    all_count = self.get_all_count(request)
+                if self.is_unfiltered(request, queryset):
+                    result_count = all_count
+                else:
+                    with statement_timeout(get_timeout('count', searching),
+                                           using):
+                        result_count = queryset.count()
+            except QueryTimeout:
+                degraded = True
         has_add_permission = self.permission_helper.has_add_permission(user)
-        paginator = Paginator(queryset, self.items_per_page)
+        if result_count is None:
+            paginator = UncountedPaginator(queryset, self.items_per_page)
+        else:
+            paginator = CountedPaginator(
+                queryset, self.items_per_page, result_count)
 
-        try:
-            page_obj = paginator.page(self.page_num + 1)
-        except InvalidPage:
-            page_obj = paginator.page(1)
+        with timer.phase('page'):
+            try:
+                with statement_timeout(get_timeout('page', searching), using):
+                    try:
+                        page_obj = paginator.page(self.page_num + 1)
+                    except InvalidPage:
+                        page_obj = paginator.page(1)
+                    page_obj.object_list = list(page_obj.object_list)
+            except QueryTimeout:
+                degraded = True
+                page_obj = UncountedPage(
+                    [], self.page_num + 1, paginator, has_next=False)
+
+        if degraded:
+            self.degrade_listing(request)
+
+        with timer.phase('prefetch'):
+            self.model_admin.prefetch_for_index_view(request,
+                                                     page_obj.object_list)
 
         context = {
             'view': self,
             'all_count': all_count,
             'result_count': result_count,
+            'listing_degraded': degraded,
+            'show_listing': bool(all_count) or degraded,
             'paginator': paginator,
             'page_obj': page_obj,
             'object_list': page_obj.object_list,
@@ -681,14 +821,63 @@ class IndexView(WMABaseView):
         if self.is_pagemodel:
             allowed_parent_types = self.model.allowed_parent_page_types()
             user = request.user
-            valid_parents = self.permission_helper.get_valid_parent_pages(user)
-            valid_parent_count = valid_parents.count()
+            with timer.phase('parents'):
+                valid_parents = self.permission_helper.get_valid_parent_pages(
+                    user)
+                valid_parent_count = valid_parents.count()
             context.update({
                 'no_valid_parents': not valid_parent_count,
                 'required_parent_types': allowed_parent_types,
             })
         return context
 
+    def get_all_count(self, request):
+        """
+        Returns the number of objects in the listing before any filters or
+        search terms are applied, from a counter if the ModelAdmin's
+        `use_row_counter` attribute is set (see `wagtailmodeladmin.counters`)
+        """
+        if self.model_admin.use_row_counter:
+            check_counted(self.model)
+            return get_row_count(self.model)
+        return self.get_base_queryset(request).count()
+
+    def is_unfiltered(self, request, queryset):
+        """
+        Returns a boolean indicating whether `queryset` (the listing's
+        results) is certain to include every object counted by
+        `get_all_count()`, so that the results needn't be counted separately.
+        Subclasses that restrict the listing in `get_queryset()` should
+        return `False` when doing so.
+        """
+        if self.query or self.get_filters_params() or any(
+            not isinstance(spec, FieldListFilter)
+            for spec in self.filter_specs
+        ):
+            return False
+        # Anything else that narrows the base queryset adds a condition
+        base_queryset = self.get_base_queryset(request)
+        return (len(queryset.query.where.children) ==
+                len(base_queryset.query.where.children))
+
+    def degrade_listing(self, request):
+        """
+        Called when a query for the listing takes longer than its time limit
+        (see `wagtailmodeladmin.timeouts`). Leaves out filters whose choices
+        need another query of the whole table (unless they're in use), and
+        suggests narrowing the listing down.
+        """
+        self.filter_specs = [
+            spec for spec in self.filter_specs
+            if spec.used_parameters or
+            not isinstance(spec, AllValuesFieldListFilter)
+        ]
+        self.has_filters = bool(self.filter_specs)
+        messages.warning(request, _(
+            "Listing %s took too long, so some counts or results aren't "
+            "shown. Try searching, or choosing filters to narrow it down."
+        ) % self.model_name_plural.lower())
+
     def get(self, request, *args, **kwargs):
         context = self.get_context_data(request, *args, **kwargs)
         if request.session.get('return_to_index_url'):
@@ -706,6 +895,13 @@ class InspectView(ObjectSpecificView):
     def check_action_permitted(self):
         return self.permission_helper.has_list_permission(self.request.user)
 
+    def get_instance_queryset(self):
+        qs = super(InspectView, self).get_instance_queryset()
+        select_related = self.model_admin.get_inspect_view_select_related()
+        if select_related:
+            qs = qs.select_related(*select_related)
+        return qs
+
     @method_decorator(login_required)
     def dispatch(self, request, *args, **kwargs):
         if not self.check_action_permitted():
@@ -736,46 +932,31 @@ class InspectView(ObjectSpecificView):
             label = field_name
         return label.capitalize()
 
-    def get_field_display_value(self, field_name, field=None):
-        """ Return a display value for a field """
-
+    def get_field_display_value(self, field_name, field=None,
+                                display_type=False):
         """
-        Firstly, check for a 'get_fieldname_display' property/method on
-        the model, and return the value of that, if present.
+        Return a display value for a field. `display_type` is the value
+        returned by `helpers.get_field_display_type` for the field (which is
+        determined here if not supplied).
         """
-        val_funct = getattr(self.instance, 'get_%s_display' % field_name, None)
-        if val_funct is not None:
+        if display_type is False:
+            display_type = get_field_display_type(self.model, field_name,
+                                                  field)
+
+        if display_type == 'choices':
+            # Use the 'get_fieldname_display' property/method on the model
+            val_funct = getattr(self.instance, 'get_%s_display' % field_name)
             if callable(val_funct):
                 return val_funct()
             return val_funct
 
-        """
-        Secondly, if we have a real field, we can try to display something
-        more useful for it.
-        """
-        if field is not None:
-            try:
-                field_type = field.get_internal_type()
-                if (
-                    field_type == 'ForeignKey' and
-                    field.related_model == get_image_model()
-                ):
-                    # The field is an image
-                    return self.get_image_field_display(field_name, field)
-
-                if (
-                    field_type == 'ForeignKey' and
-                    field.related_model == Document
-                ):
-                    # The field is a document
-                    return self.get_document_field_display(field_name, field)
-
-            except AttributeError:
-                pass
+        if display_type == 'image':
+            return self.get_image_field_display(field_name, field)
 
-        """
-        Resort to getting the value of 'field_name' from the instance.
-        """
+        if display_type == 'document':
+            return self.get_document_field_display(field_name, field)
+
+        # Resort to getting the value of 'field_name' from the instance
         return getattr(self.instance, field_name,
                        self.model_admin.get_empty_value_display())
 
@@ -783,7 +964,8 @@ class InspectView(ObjectSpecificView):
         """ Render an image """
         image = getattr(self.instance, field_name)
         if image:
-            fltr, _ = Filter.objects.get_or_create(spec='max-400x400')
+            fltr = get_image_filter(
+                self.model_admin.inspect_view_image_filter_spec)
             rendition = image.get_rendition(fltr)
             return rendition.img_tag
         return self.model_admin.get_empty_value_display()
@@ -797,7 +979,7 @@ class InspectView(ObjectSpecificView):
                     document.url,
                     document.title,
                     document.file_extension.upper(),
-                    filesizeformat(document.file.size),
+                    filesizeformat(get_document_file_size(document)),
                 )
             )
         return self.model_admin.get_empty_value_display()
@@ -816,14 +998,27 @@ class InspectView(ObjectSpecificView):
             'value': self.get_field_display_value(field_name, field),
         }
 
+    def get_dict_for_field_plan_item(self, item):
+        """
+        Return a dictionary containing `label` and `value` values to display
+        for an item from the model_admin class's `get_inspect_view_field_plan`
+        method.
+        """
+        field_name, field = item['name'], item['field']
+        return {
+            'label': self.get_field_label(field_name, field),
+            'value': self.get_field_display_value(
+                field_name, field, item['display_type']),
+        }
+
     def get_fields_dict(self):
         """
         Return a list of `label`/`value` dictionaries to represent the
         fiels named by the model_admin class's `get_inspect_view_fields` method
         """
         fields = []
-        for field_name in self.model_admin.get_inspect_view_fields():
-            fields.append(self.get_dict_for_field(field_name))
+        for item in self.model_admin.get_inspect_view_field_plan():
+            fields.append(self.get_dict_for_field_plan_item(item))
         return fields
 
     def get_buttons(self):
@@ -833,10 +1028,14 @@ class InspectView(ObjectSpecificView):
         return self.button_helper.get_buttons_for_inspect_view(self.instance)
 
     def get_context_data(self, **kwargs):
+        with self.timer.phase('fields'):
+            fields = self.get_fields_dict()
+        with self.timer.phase('buttons'):
+            buttons = self.get_buttons()
         return {
             'view': self,
-            'fields': self.get_fields_dict(),
-            'buttons': self.get_buttons(),
+            'fields': fields,
+            'buttons': buttons,
             'instance': self.instance,
         }
 
@@ -881,6 +1080,8 @@ class CreateView(WMAFormView):
 
 
 class ChooseParentView(WMABaseView):
+    parents_per_page = 50
+
     def dispatch(self, request, *args, **kwargs):
         if not self.permission_helper.has_add_permission(request.user):
             return permission_denied_response(request)
@@ -889,14 +1090,63 @@ class ChooseParentView(WMABaseView):
     def get_page_title(self):
         return _('Add %s') % self.model_name
 
+    @cached_property
+    def valid_parents(self):
+        return self.permission_helper.get_valid_parent_pages(
+            self.request.user)
+
+    def get_filter_form(self, request):
+        return ParentChooserFilterForm(request.GET or None)
+
     def get_form(self, request):
-        parents = self.permission_helper.get_valid_parent_pages(request.user)
-        return ParentChooserForm(parents, request.POST or None)
+        return ParentChooserForm(self.valid_parents, request.POST or None)
+
+    def get_query_string(self, page_number):
+        params = self.request.GET.copy()
+        params[PAGE_VAR] = page_number
+        return '?%s' % params.urlencode()
+
+    def get_context_data(self, request, form):
+        """
+        Only the current page of candidates (filtered using the filter form)
+        is offered as choices, so the whole set of valid parents is never
+        loaded
+        """
+        filter_form = self.get_filter_form(request)
+        parents = filter_form.filter_queryset(self.valid_parents)
+        paginator = Paginator(
+            parents.order_by('path').values_list('pk', flat=True),
+            self.parents_per_page)
+        with self.timer.phase('parents'):
+            try:
+                page_obj = paginator.page(request.GET.get(PAGE_VAR, 1))
+            except InvalidPage:
+                page_obj = paginator.page(1)
+            form.fields['parent_page'].queryset = self.valid_parents.filter(
+                pk__in=list(page_obj.object_list)).order_by('path')
+        previous_page_url = next_page_url = None
+        if page_obj.has_previous():
+            previous_page_url = self.get_query_string(
+                page_obj.previous_page_number())
+        if page_obj.has_next():
+            next_page_url = self.get_query_string(
+                page_obj.next_page_number())
+        return {
+            'view': self,
+            'form': form,
+            'filter_form': filter_form,
+            'paginator': paginator,
+            'page_obj': page_obj,
+            'previous_page_url': previous_page_url,
+            'next_page_url': next_page_url,
+        }
 
     def get(self, request, *args, **kwargs):
         form = self.get_form(request)
-        context = {'view': self, 'form': form}
-        return render(request, self.get_template(), context)
+        context = self.get_context_data(request, form)
+        with self.timer.phase('render'):
+            template = get_cached_template(self.get_template())
+            return HttpResponse(template.render(context, request))
 
     def post(self, request, *args, **kargs):
         form = self.get_form(request)
@@ -904,8 +1154,10 @@ class ChooseParentView(WMABaseView):
             parent = form.cleaned_data['parent_page']
             return redirect(PAGES_CREATE_URL_NAME, self.opts.app_label,
                             self.opts.model_name, quote(parent.pk))
-        context = {'view': self, 'form': form}
-        return render(request, self.get_template(), context)
+        context = self.get_context_data(request, form)
+        with self.timer.phase('render'):
+            template = get_cached_template(self.get_template())
+            return HttpResponse(template.render(context, request))
 
     def get_template(self):
         return self.model_admin.get_choose_parent_template()
@@ -920,11 +1172,13 @@ class EditView(ObjectSpecificView, CreateView):
 
     @method_decorator(login_required)
     def dispatch(self, request, *args, **kwargs):
-        if not self.check_action_permitted():
-            return permission_denied_response(request)
         if self.is_pagemodel:
+            # Wagtail's edit view checks permissions itself, so there's no
+            # need to fetch the page here
             self.prime_session_for_redirection()
             return redirect(PAGES_EDIT_URL_NAME, self.object_id)
+        if not self.check_action_permitted():
+            return permission_denied_response(request)
         return super(CreateView, self).dispatch(request, *args, **kwargs)
 
     def get_meta_title(self):
@@ -947,6 +1201,9 @@ class EditView(ObjectSpecificView, CreateView):
 
 class ConfirmDeleteView(ObjectSpecificView):
     page_title = _('Delete')
+    protected_objects_sample_size = 10
+    delete_impact_cache_timeout = 10
+    job_action = 'wagtailmodeladmin.jobs.delete_object'
 
     def check_action_permitted(self):
         user = self.request.user
@@ -954,11 +1211,13 @@ class ConfirmDeleteView(ObjectSpecificView):
 
     @method_decorator(login_required)
     def dispatch(self, request, *args, **kwargs):
-        if not self.check_action_permitted():
-            return permission_denied_response(request)
         if self.is_pagemodel:
+            # Wagtail's delete view checks permissions itself, so there's no
+            # need to fetch the page here
             self.prime_session_for_redirection()
             return redirect(PAGES_DELETE_URL_NAME, self.object_id)
+        if not self.check_action_permitted():
+            return permission_denied_response(request)
         return super(ConfirmDeleteView, self).dispatch(request, *args,
                                                        **kwargs)
 
@@ -977,12 +1236,193 @@ class ConfirmDeleteView(ObjectSpecificView):
     def delete_instance(self):
         self.instance.delete()
 
+    def should_delete_in_background(self):
+        """
+        Return a boolean indicating whether deletion should be queued as a
+        background job (see `wagtailmodeladmin.jobs`) rather than run within
+        the request. It is, where the ModelAdmin has `jobs_enabled`, and at
+        least `delete_job_threshold` objects would be deleted along with this
+        view's instance.
+        """
+        if not self.model_admin.jobs_enabled:
+            return False
+        impact = self.get_delete_impact()
+        if impact['truncated']:
+            return True
+        deleted_count = sum(count for model_key, count in impact['deleted'])
+        return deleted_count >= self.model_admin.delete_job_threshold
+
+    def get_job_label(self):
+        return _("Deletion of %(model_name)s '%(instance)s'") % {
+            'model_name': self.model_name.lower(), 'instance': self.instance}
+
+    def get_delete_impact_cache_key(self):
+        return 'wagtailmodeladmin:delete_impact:%s.%s:%s' % (
+            self.opts.app_label, self.opts.model_name, self.instance.pk)
+
+    def get_delete_impact(self):
+        """
+        Return a dictionary of counts for objects of each model that would be
+        deleted ('deleted'), have a reference cleared ('updated') or prevent
+        deletion ('protected') if this view's instance were deleted. Counts
+        are calculated with aggregate queries by `CountingCollector`, and
+        cached for `delete_impact_cache_timeout` seconds, so that reloading
+        the confirmation page doesn't recalculate them. Cached counts aren't
+        updated when related objects change, so the timeout is kept short,
+        and any POST request (whether or not deletion succeeds) removes them
+        from the cache.
+        """
+        cache_key = self.get_delete_impact_cache_key()
+        impact = cache.get(cache_key)
+        if impact is None:
+            using = router.db_for_write(self.model, instance=self.instance)
+            queryset = self.model._base_manager.using(using).filter(
+                pk=self.instance.pk)
+            with self.timer.phase('delete_impact'):
+                impact = CountingCollector(using).count(queryset).as_dict()
+            cache.set(cache_key, impact, self.delete_impact_cache_timeout)
+        return impact
+
+    def get_delete_impact_display(self, impact=None):
+        """
+        Return a list of `label`/`items` dictionaries describing the impact of
+        deleting this view's instance, for display on the confirmation page
+        """
+        if impact is None:
+            impact = self.get_delete_impact()
+        groups = (
+            ('deleted', _('The following will also be deleted:')),
+            ('updated', _('References to it will be removed from:')),
+        )
+        display = []
+        for key, label in groups:
+            items = []
+            for model_key, count in impact[key]:
+                opts = apps.get_model(model_key)._meta
+                verbose_name = (
+                    opts.verbose_name if count == 1 else
+                    opts.verbose_name_plural)
+                items.append({
+                    'verbose_name': force_text(verbose_name),
+                    'count': count,
+                })
+            if items:
+                display.append({'label': label, 'items': items})
+        return display
+
+    def get_protecting_relations(self):
+        """
+        Return the reverse relations to this view's model (from ForeignKey or
+        OneToOneField fields on other models) that use `on_delete=PROTECT`,
+        and would therefore prevent the instance from being deleted.
+        """
+        return [
+            rel for rel in self.opts.get_fields(include_hidden=True)
+            if rel.auto_created and not rel.concrete and
+            (rel.one_to_many or rel.one_to_one) and
+            rel.on_delete == models.PROTECT
+        ]
+
+    def get_related_index_url(self, rel):
+        """
+        Return a URL for the index view of the model on the other side of
+        `rel` (if it has a registered ModelAdmin), filtered to show only the
+        objects that reference this view's instance.
+        """
+        from .options import get_registered_modeladmin
+        related_opts = rel.related_model._meta
+        model_admin = get_registered_modeladmin(related_opts.app_label,
+                                                related_opts.model_name)
+        if model_admin is None:
+            return None
+        field = rel.field
+        value = getattr(self.instance, field.foreign_related_fields[0].attname)
+        return '%s?%s' % (model_admin.get_index_url(),
+                          urlencode({field.attname: value}))
+
+    def get_protected_objects_report(self):
+        """
+        Return a list of dictionaries describing the objects that reference
+        this view's instance through PROTECT relations. Rather than loading
+        every referencing object, a single COUNT query is run for each
+        relation, plus a query for a small sample of objects (limited to
+        `protected_objects_sample_size`) where any exist.
+        """
+        report = []
+        for rel in self.get_protecting_relations():
+            related_model = rel.related_model
+            qs = related_model._default_manager.filter(
+                **{rel.field.name: self.instance})
+            count = qs.count()
+            if not count:
+                continue
+            sample = list(qs[:self.protected_objects_sample_size])
+            report.append({
+                'verbose_name': capfirst(force_text(
+                    related_model._meta.verbose_name_plural)),
+                'count': count,
+                'sample': sample,
+                'remaining_count': count - len(sample),
+                'url': self.get_related_index_url(rel),
+            })
+        return report
+
+    def get_protected_objects_report_from_error(self, error):
+        """
+        Return a report in the same format as `get_protected_objects_report`
+        from a `ProtectedError` raised when attempting deletion (i.e. where
+        a protected relation is found further along the cascade). Django
+        raises the error with a queryset of the protected objects, which is
+        counted and sampled, rather than loaded in full.
+        """
+        objects = error.protected_objects
+        size = self.protected_objects_sample_size
+        if isinstance(objects, models.QuerySet):
+            related_model = objects.model
+            count = objects.count()
+            sample = list(objects[:size])
+        else:
+            objects = list(objects)
+            if not objects:
+                return []
+            related_model = objects[0].__class__
+            count = len(objects)
+            sample = objects[:size]
+        return [{
+            'verbose_name': capfirst(force_text(
+                related_model._meta.verbose_name_plural)),
+            'count': count,
+            'sample': sample,
+            'remaining_count': count - len(sample),
+            'url': None,
+        }]
+
     def get(self, request, *args, **kwargs):
-        context = {'view': self, 'instance': self.instance}
+        impact = self.get_delete_impact()
+        context = {
+            'view': self,
+            'instance': self.instance,
+            'delete_impact': self.get_delete_impact_display(impact),
+            'delete_impact_truncated': impact['truncated'],
+        }
         return self.render_to_response(context)
 
     def post(self, request, *args, **kwargs):
-        if request.POST:
+        cache.delete(self.get_delete_impact_cache_key())
+        # Check for protected relations up front (with bounded queries), so
+        # that Django's deletion collector never has to load every protected
+        # object into memory
+        protected_objects = self.get_protected_objects_report()
+        if not protected_objects and self.should_delete_in_background():
+            job = self.model_admin.enqueue_job(
+                request, self.job_action, label=self.get_job_label(),
+                object_id=force_text(self.instance.pk))
+            messages.success(
+                request,
+                _("{model} '{instance}' has been queued for deletion.").format(
+                    model=self.model_name, instance=self.instance))
+            return redirect(self.model_admin.get_job_url(job))
+        if not protected_objects:
             try:
                 self.delete_instance()
                 messages.success(
@@ -990,32 +1430,43 @@ class ConfirmDeleteView(ObjectSpecificView):
                     _("{model} '{instance}' deleted.").format(
                         model=self.model_name, instance=self.instance))
                 return redirect(self.get_index_url)
-            except models.ProtectedError:
-                messages.error(
-                    request, _(
-                        "{model} '{instance}' could not be deleted."
-                    ).format(model=self.model_name, instance=self.instance))
-
-                linked_objects = []
-                for rel in self.model._meta.get_all_related_objects():
-                    if rel.on_delete == models.PROTECT:
-                        qs = getattr(self.instance, rel.get_accessor_name())
-                        for obj in qs.all():
-                            linked_objects.append(obj)
-
-                context = {
-                    'view': self,
-                    'instance': self.instance,
-                    'error_protected': True,
-                    'linked_objects': linked_objects,
-                }
+            except models.ProtectedError as e:
+                protected_objects = (
+                    self.get_protected_objects_report_from_error(e))
+
+        messages.error(
+            request, _(
+                "{model} '{instance}' could not be deleted."
+            ).format(model=self.model_name, instance=self.instance))
+        linked_objects = []
+        for item in protected_objects:
+            linked_objects.extend(item['sample'])
+        context = {
+            'view': self,
+            'instance': self.instance,
+            'error_protected': True,
+            'protected_objects': protected_objects,
+            'linked_objects': linked_objects,
+        }
         return self.render_to_response(context)
 
     def get_template_names(self):
         return self.model_admin.get_confirm_delete_template()
 
 
-class UnpublishRedirectView(ObjectSpecificView):
+class PageRedirectView(ObjectSpecificView):
+    """
+    Base class for views that check permissions for a page, before
+    redirecting to one of Wagtail's page views. Only the non-specific `Page`
+    is needed to check permissions, so that is fetched instead of the
+    specific page (which could involve loading a lot of content).
+    """
+
+    def get_instance_queryset(self):
+        return Page.objects.all()
+
+
+class UnpublishRedirectView(PageRedirectView):
     def check_action_permitted(self):
         user = self.request.user
         return self.permission_helper.can_unpublish_object(user, self.instance)
@@ -1028,7 +1479,7 @@ class UnpublishRedirectView(ObjectSpecificView):
         return redirect(PAGES_UNPUBLISH_URL_NAME, self.object_id)
 
 
-class CopyRedirectView(ObjectSpecificView):
+class CopyRedirectView(PageRedirectView):
     def check_action_permitted(self):
         user = self.request.user
         return self.permission_helper.can_copy_object(user, self.instance)
@@ -1039,3 +1490,90 @@ class CopyRedirectView(ObjectSpecificView):
             return permission_denied_response(request)
         self.prime_session_for_redirection()
         return redirect(PAGES_COPY_URL_NAME, self.object_id)
+
+
+class ExportView(WMABaseView):
+    """
+    Queues an export of the index view's results (using any filters, search
+    terms and ordering supplied in the query string) as a background job,
+    then redirects to the job's status page.
+    """
+    job_action = 'wagtailmodeladmin.jobs.export_csv'
+
+    @method_decorator(login_required)
+    def dispatch(self, request, *args, **kwargs):
+        if not self.permission_helper.allow_list_view(request.user):
+            return permission_denied_response(request)
+        return super(ExportView, self).dispatch(request, *args, **kwargs)
+
+    def get_job_label(self):
+        return _('Export of %s') % self.model_name_plural.lower()
+
+    def post(self, request, *args, **kwargs):
+        # Every value is kept for parameters given more than once, so that
+        # the export matches the listing
+        job = self.model_admin.enqueue_job(
+            request, self.job_action, label=self.get_job_label(),
+            query=dict(request.GET.lists()))
+        messages.success(request, _("Your export has been queued."))
+        return redirect(self.model_admin.get_job_url(job))
+
+
+class JobStatusView(WMABaseView):
+    """
+    Displays the progress of a job queued for this view's model. Users can
+    only view jobs that they queued themselves, unless they are superusers.
+    """
+    page_title = _('Job status')
+    object_id = None
+
+    def __init__(self, model_admin, object_id):
+        super(JobStatusView, self).__init__(model_admin)
+        self.object_id = object_id
+
+    @cached_property
+    def job(self):
+        qs = ModelAdminJob.objects.for_model(self.model)
+        return get_object_or_404(qs, pk=self.object_id)
+
+    def check_action_permitted(self):
+        user = self.request.user
+        if not self.permission_helper.allow_list_view(user):
+            return False
+        return user.is_superuser or self.job.user_id == user.pk
+
+    @method_decorator(login_required)
+    def dispatch(self, request, *args, **kwargs):
+        if not self.check_action_permitted():
+            return permission_denied_response(request)
+        return super(JobStatusView, self).dispatch(request, *args, **kwargs)
+
+    def get_page_subtitle(self):
+        return self.job
+
+    def get_download_url(self):
+        return reverse(get_url_name(self.opts, 'job_download'),
+                       args=(self.job.pk,))
+
+    def get(self, request, *args, **kwargs):
+        context = {'view': self, 'job': self.job}
+        return self.render_to_response(context)
+
+    def get_template_names(self):
+        return self.model_admin.get_job_status_template()
+
+
+class JobDownloadView(JobStatusView):
+    """
+    Serves the file created by a completed job
+    """
+
+    def get(self, request, *args, **kwargs):
+        job = self.job
+        if job.status != job.STATUS_COMPLETE or not job.result_file:
+            raise Http404
+        f = job.result_file.storage.open(job.result_file.name, 'rb')
+        response = FileResponse(f, content_type='application/octet-stream')
+        response['Content-Disposition'] = 'attachment; filename="%s"' % (
+            job.result_file.name.rsplit('/', 1)[-1])
+        return response
@@ -0,0 +1,52 @@
+from wagtail.wagtailcore import hooks
+
+from .dispatch import ModelAdminURLDispatcher
+from .helpers import PermissionHelper
+from .options import ModelAdmin, wagtailmodeladmin_register
+from .models import ProfileReport
+from .profiling import can_profile_views, profiling_enabled
+
+
+@hooks.register('register_admin_urls')
+def register_modeladmin_dispatcher():
+    return [ModelAdminURLDispatcher()]
+
+
+class ProfileReportPermissionHelper(PermissionHelper):
+    """
+    Profile reports are created by profiling views, so can only be viewed
+    and deleted, by the superusers who are allowed to profile views
+    """
+
+    def has_add_permission(self, user):
+        return False
+
+    def has_edit_permission(self, user):
+        return False
+
+    def has_delete_permission(self, user):
+        return can_profile_views(user)
+
+    def has_list_permission(self, user):
+        return can_profile_views(user)
+
+
+class ProfileReportAdmin(ModelAdmin):
+    model = ProfileReport
+    menu_icon = 'time'
+    add_to_settings_menu = True
+    list_display = ('view_name', 'path', 'duration_ms', 'query_count',
+                    'user', 'created_at')
+    list_filter = ('view_name',)
+    list_select_related = ('user',)
+    search_fields = ('view_name', 'path')
+    inspect_view_enabled = True
+    inspect_view_fields = ('view_name', 'path', 'user', 'status_code',
+                           'duration', 'query_count', 'peak_memory',
+                           'created_at')
+    inspect_template_name = 'wagtailmodeladmin/profile_report.html'
+    permission_helper_class = ProfileReportPermissionHelper
+
+
+if profiling_enabled():
+    wagtailmodeladmin_register(ProfileReportAdmin)